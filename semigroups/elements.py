@@ -6,6 +6,10 @@ This module contains classes for representing elements of semigroups.
 # pylint: disable = len-as-condition
 
 import libsemigroups
+from semigroups.semiring import (Integers, MaxPlusSemiring, MinPlusSemiring,
+                                 SemiringWithThresholdABC,
+                                 TropicalMaxPlusSemiring,
+                                 TropicalMinPlusSemiring, NaturalSemiring)
 
 class Transformation(libsemigroups.TransformationNC):
     r'''
@@ -325,6 +329,9 @@ class BooleanMat(libsemigroups.BooleanMatNC):
     These can be entered as True, False or 1, 0. The *degree* of the matrix
     is defined to be the number of rows.
 
+    The rows of a boolean matrix of degree at most 64 are stored as 64-bit
+    words, and the rows of a product are computed a word at a time.
+
     Args:
         args (lists):   The rows of the matrix as lists.
 
@@ -366,12 +373,9 @@ class BooleanMat(libsemigroups.BooleanMatNC):
             raise TypeError('the items in the arguments must all be '
                             ' bools or all be 0 or 1')
 
-        if isinstance(args[0][0], bool):
-            self._rows = [row[:] for row in args]
-        else:
-            self._rows = [[bool(x) for x in row] for row in args]
-
-        libsemigroups.BooleanMatNC.__init__(self, self._rows)
+        # the rows are only stored by Python if they are asked for, see rows
+        self._rows = None
+        libsemigroups.BooleanMatNC.__init__(self, args)
 
     def __getitem__(self, i):
         n = self.degree()
@@ -398,13 +402,185 @@ class BooleanMat(libsemigroups.BooleanMatNC):
             >>> BooleanMat([True, False], [True, True]).rows()
             [[True, False], [True, True]]
         '''
+        if self._rows is None:
+            self._rows = self._unpack_rows()
+        return self._rows
+
+
+class Matrix(libsemigroups.MatrixNC):
+    # pylint: disable = non-parent-init-called
+    '''
+    A *matrix over a semiring* is a square matrix whose entries belong to a
+    semiring, and which are multiplied using the addition and multiplication
+    of the semiring. The *degree* of the matrix is defined to be the number of
+    rows.
+
+    The entries are stored as 64-bit integers, see
+    :meth:`SemiringABC.to_ints`, and so multiplying matrices over
+    :class:`Integers`, :class:`MaxPlusSemiring`, :class:`MinPlusSemiring` or
+    :class:`NaturalSemiring` raises OverflowError if an entry of the product,
+    or an intermediate sum or product, is not a finite 64-bit integer.
+
+    Args:
+        semiring (SemiringABC): The semiring, which must be an instance of
+                                :class:`Integers`, :class:`MaxPlusSemiring`,
+                                :class:`MinPlusSemiring`,
+                                :class:`TropicalMaxPlusSemiring`,
+                                :class:`TropicalMinPlusSemiring` or
+                                :class:`NaturalSemiring`.
+        rows (list):    The rows of the matrix as lists of elements of the
+                        semiring.
+
+    Raises:
+        TypeError:  If the semiring is not one of the above, if the rows are
+                    not lists, or if any entry is not of the type of the
+                    elements of the semiring.
+
+        ValueError: If the number of rows does not equal the length of every
+                    row, if any entry does not belong to the semiring, or if
+                    any entry is not a 64-bit integer, see
+                    :meth:`SemiringABC.to_ints`.
+
+    Example:
+        >>> from semigroups import Matrix, MaxPlusSemiring
+        >>> Matrix(MaxPlusSemiring(), [[0, -float('inf')], [1, 2]])
+        Matrix(MaxPlusSemiring(), [[0, -inf], [1, 2]])
+    '''
+
+    def __init__(self, semiring, rows=None):
+        if isinstance(semiring, libsemigroups.ElementABC):
+            # construct an uninitialised Matrix, see new_from_handle
+            libsemigroups.ElementABC.__init__(self)
+            self.semiring = semiring.semiring
+            self._rows = None
+            return
+        params = _semiring_params(semiring)
+        if not (isinstance(rows, list)
+                and all(isinstance(row, list) for row in rows)):
+            raise TypeError('the second argument (rows) must be a list of '
+                            + 'lists')
+        n = len(rows)
+        if n == 0:
+            raise ValueError('there must be at least 1 row')
+        elif not all(len(row) == n for row in rows):
+            raise ValueError('the rows must have length equal to the number '
+                             + 'of rows')
+        flat = semiring.to_ints([x for row in rows for x in row])
+
+        self.semiring = semiring
+        self._rows = [row[:] for row in rows]
+        libsemigroups.MatrixNC.__init__(self, flat, *params)
+
+    def __mul__(self, other):
+        # semirings are interned, and so equal semirings are identical
+        if not (isinstance(other, Matrix) and self.semiring is other.semiring):
+            raise TypeError('the arguments must be matrices over the same '
+                            + 'semiring')
+        return libsemigroups.ElementABC.__mul__(self, other)
+
+    def __getitem__(self, i):
+        return self.rows()[i]
+
+    def __repr__(self):
+        return 'Matrix(%r, %s)' % (self.semiring, self.rows())
+
+    def closure(self):
+        r'''
+        Function for finding the *Kleene closure* :math:`I + A + A ^ 2 +
+        \cdots` of a matrix :math:`A` over a max-plus, min-plus or tropical
+        semiring. The entries of the closure are the greatest, or least, sums
+        of the weights of the paths between the vertices of the weighted
+        directed graph with adjacency matrix :math:`A`.
+
+        The closure is found by the Floyd-Warshall-Kleene algorithm.
+
+        Returns:
+            Matrix: The closure of the matrix.
+
+        Raises:
+            TypeError:  If the semiring of the matrix is not one of the above.
+            ValueError: If the closure does not exist, since the graph has a
+                        cycle of positive weight over the max-plus semiring,
+                        or of negative weight over the min-plus semiring.
+
+        Example:
+            >>> from semigroups import Matrix, MinPlusSemiring
+            >>> inf = float('inf')
+            >>> Matrix(MinPlusSemiring(),
+            ...        [[inf, 2, 9], [inf, inf, 3], [inf, inf, inf]]).closure()
+            Matrix(MinPlusSemiring(), [[0, 2, 5], [inf, 0, 3], [inf, inf, 0]])
+        '''
+        if not isinstance(self.semiring, (MaxPlusSemiring, MinPlusSemiring,
+                                          TropicalMaxPlusSemiring,
+                                          TropicalMinPlusSemiring)):
+            raise TypeError('the closure is only defined for matrices over '
+                            + 'max-plus, min-plus and tropical semirings')
+        return libsemigroups.MatrixNC.closure(self)
+
+    def index_period(self):
+        r'''
+        Function for finding the index and period of a matrix over a tropical
+        or natural semiring, which are the least positive integers :math:`i`
+        and :math:`p` such that :math:`A ^ {i + p} = A ^ i`.
+
+        Returns:
+            tuple: The index and the period of the matrix.
+
+        Raises:
+            TypeError:  If the semiring of the matrix is not a tropical or
+                        natural semiring, since the powers of a matrix over
+                        any other semiring need not be periodic.
+
+        Example:
+            >>> from semigroups import Matrix, NaturalSemiring
+            >>> Matrix(NaturalSemiring(2, 3), [[0, 2], [1, 0]]).index_period()
+            (2, 4)
+        '''
+        if not isinstance(self.semiring, SemiringWithThresholdABC):
+            raise TypeError('the index and period are only defined for '
+                            + 'matrices over tropical and natural semirings')
+        return libsemigroups.MatrixNC.index_period(self)
+
+    def rows(self):
+        '''
+        Function for finding the rows of a matrix over a semiring.
+
+        Returns:
+            list: The rows of the matrix.
+
+        Raises:
+            TypeError:  If any argument is given.
+
+        Example:
+            >>> from semigroups import Matrix, NaturalSemiring
+            >>> Matrix(NaturalSemiring(2, 3), [[1, 4], [0, 2]]).rows()
+            [[1, 4], [0, 2]]
+        '''
         if self._rows is None:
             n = self.degree()
-            flat = [x for x in self]
-            assert len(flat) == n ** 2
+            flat = self.semiring._from_ints(list(self))
             self._rows = [flat[i:i + n] for i in range(0, n ** 2, n)]
         return self._rows
 
+def _semiring_params(semiring):
+    '''
+    Returns the arguments of MatrixNC.__init__ which determine the given
+    semiring.
+    '''
+    if isinstance(semiring, Integers):
+        return ('integers', 0, 0)
+    elif isinstance(semiring, MaxPlusSemiring):
+        return ('max_plus', 0, 0)
+    elif isinstance(semiring, MinPlusSemiring):
+        return ('min_plus', 0, 0)
+    elif isinstance(semiring, TropicalMaxPlusSemiring):
+        return ('tropical_max_plus', semiring.threshold(), 0)
+    elif isinstance(semiring, TropicalMinPlusSemiring):
+        return ('tropical_min_plus', semiring.threshold(), 0)
+    elif isinstance(semiring, NaturalSemiring):
+        return ('natural', semiring.threshold(), semiring.period())
+    raise TypeError('the first argument (semiring) must be a semiring over '
+                    + 'which there are native matrices')
 
 class PBR(libsemigroups.PBRNC):
 
@@ -7,10 +7,12 @@
 
 from libc.stdint cimport uint16_t
 from libc.stdint cimport uint32_t
+from libc.stdint cimport int64_t, uint64_t
 from libcpp.vector cimport vector
 from libcpp.pair cimport pair
 from libcpp cimport bool
 from libcpp.string cimport string
+from libcpp.memory cimport shared_ptr
 
 cdef extern from "<libsemigroups/recvec.h>" namespace "libsemigroups":
     cdef cppclass RecVec[T]:
@@ -21,9 +23,9 @@ cdef extern from "<libsemigroups/recvec.h>" namespace "libsemigroups":
 cdef extern from "<libsemigroups/elements.h>" namespace "libsemigroups":
     cdef cppclass Element:
         Element* identity()
-        void redefine(Element *, Element *)
-        bool operator==(Element&)
-        bool operator<(Element&)
+        void redefine(Element *, Element *) except +
+        bool operator==(Element&) except +
+        bool operator<(Element&) except +
         Element* really_copy()
         void really_delete()
         int degree()
@@ -61,28 +63,38 @@ cdef extern from "<libsemigroups/elements.h>" namespace "libsemigroups":
         vector[vector[uint32_t]].iterator end()
 
 cdef extern from "libsemigroups_cpp.h" namespace "libsemigroups":
+    cdef cppclass PythonBatch:
+        PythonBatch(multiply_many, hash_many) except +
+        void add_generator(value)
     cdef cppclass PythonElement(Element):
         object get_value()
         PythonElement(value) except +
+        PythonElement(value, shared_ptr[PythonBatch],
+                      size_t complexity) except +
+        size_t complexity()
+        Element* unbatched_copy()
 
 cdef extern from "<libsemigroups/semigroups.h>" namespace "libsemigroups":
     cdef cppclass Semigroup:
         # ctypedef pos_t # can't declare it here; this is private!
         Semigroup(vector[Element*]) except +
-        int size()
-        int nridempotents()
-        Element* at(size_t pos)  # pos_t
+        int size() except +
+        int nridempotents() except +
+        Element* at(size_t pos) except +  # pos_t
         void set_report(bool val)
         int current_max_word_length()
-        int current_position(Element* x)
-        int position(Element* x)
+        size_t current_size()
+        size_t current_nrrules()
+        size_t nrgens()
+        int current_position(Element* x) except +
+        int position(Element* x) except +
         bool is_done()
         bool is_begun()
-        bool test_membership(Element* x)
-        vector[size_t]* factorisation(size_t pos)
-        void enumerate(size_t limit)
-        RecVec[size_t]* right_cayley_graph()
-        RecVec[size_t]* left_cayley_graph()
+        bool test_membership(Element* x) except +
+        vector[size_t]* factorisation(size_t pos) except +
+        void enumerate(size_t limit) except +
+        RecVec[size_t]* right_cayley_graph() except +
+        RecVec[size_t]* left_cayley_graph() except +
 
 cdef extern from "<libsemigroups/cong.h>" namespace "libsemigroups":
     cdef cppclass Congruence:
@@ -90,12 +102,56 @@ cdef extern from "<libsemigroups/cong.h>" namespace "libsemigroups":
                    size_t, 
                    vector[pair[vector[size_t],vector[size_t]]],
                    vector[pair[vector[size_t],vector[size_t]]]) except +
+        Congruence(string,
+                   Semigroup*,
+                   vector[pair[vector[size_t],vector[size_t]]]) except +
         int nr_classes()
-        int word_to_class_index(vector[size_t] word)
+        int word_to_class_index(vector[size_t] word) nogil
         void set_report(bool val)
         void set_max_threads(size_t nr_threads)
+        void force_tc()
+        void force_tc_prefill()
+        void force_kbp()
+        void force_kbfp()
 
 cdef extern from "<libsemigroups/rws.h>" namespace "libsemigroups":
     cdef cppclass RWS:
         RWS(vector[pair[vector[size_t],vector[size_t]]]) except +
-        bool is_confluent()
+        bool is_confluent() except +
+        void knuth_bendix() except +
+        size_t nr_rules()
+        vector[pair[string, string]] rules() except +
+        string rewrite(string) nogil
+        void add_rule(string, string) except +
+        void set_max_rules(size_t)
+        void set_max_overlap(size_t)
+
+cdef extern from "libsemigroups_cpp.h" namespace "libsemigroups":
+    void knuth_bendix_with_timeout(RWS*, double) nogil except +
+    Element* element_power(Element*, size_t) except +
+    void index_period(Element*, size_t&, size_t&) except +
+    BooleanMat* boolean_mat_closure(BooleanMat*) except +
+    cdef cppclass FpQuotient:
+        FpQuotient(Congruence*, size_t) except +
+        size_t nr_classes()
+        size_t nrgens()
+        size_t right(size_t, size_t)
+        size_t product(size_t, size_t) nogil
+        size_t generator(size_t) nogil
+        size_t multiply(size_t, size_t) nogil
+        size_t power(size_t, size_t)
+    cdef cppclass PackedBooleanMat(Element):
+        PackedBooleanMat(vector[uint64_t]) except +
+        bool get(size_t, size_t)
+        uint64_t row(size_t)
+        PackedBooleanMat* closure() except +
+    cdef cppclass SemiringMatrix(Element):
+        SemiringMatrix(vector[int64_t], int, int64_t, int64_t) except +
+        int64_t get(size_t, size_t)
+        vector[int64_t].iterator begin()
+        vector[int64_t].iterator end()
+        SemiringMatrix* closure() except +
+    cdef cppclass FpElement(Element):
+        FpElement(size_t, shared_ptr[FpQuotient])
+        size_t class_index()
+        vector[size_t] representative()
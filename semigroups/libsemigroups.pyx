@@ -28,9 +28,108 @@ from libcpp cimport bool
 from libcpp.string cimport string
 from libcpp.pair cimport pair
 from libc.stdint cimport uint32_t
+from libc.stdint cimport int64_t, uint64_t, INT64_MAX, INT64_MIN
+from libcpp.memory cimport shared_ptr
 
 from cysignals.signals cimport sig_on, sig_off
 
+import sys
+from timeit import default_timer
+
+# Opt-in instrumentation of the binding layer, see set_profiling. When
+# profiling is off, the only cost at each instrumented call site is checking
+# the C-level flag _profiling.
+cdef bint _profiling = False
+cdef dict _counters = {'elements_allocated': 0, 'elements_deleted': 0}
+
+cdef inline double _start():
+    if _profiling:
+        return default_timer()
+    return 0
+
+cdef _record_call(name, double start, size_t nbytes=0):
+    cdef double elapsed = default_timer() - start
+    if name not in _counters:
+        _counters[name] = {'calls': 0, 'bytes_copied': 0, 'time': 0.0}
+    entry = _counters[name]
+    entry['calls'] += 1
+    entry['bytes_copied'] += nbytes
+    entry['time'] += elapsed
+
+cdef inline void _allocated(size_t nr):
+    if _profiling:
+        _counters['elements_allocated'] += nr
+
+cdef inline void _deleted(size_t nr):
+    if _profiling:
+        _counters['elements_deleted'] += nr
+
+def set_profiling(val):
+    '''
+    Turns the instrumentation of the binding layer on or off.
+
+    When profiling is on, the main entry points of this module (products of
+    elements, the copying of elements out of libsemigroups, enumeration,
+    factorisation, and the conversion of Cayley graphs) record the number of
+    times they are called, the time spent in them, and the number of bytes
+    they copy into Python objects. The number of C++ elements allocated and
+    deleted by the bindings is also recorded. The counters can be retrieved
+    with :func:`profiling_counters`.
+
+    Args:
+        val (bool): Whether to turn profiling on or off.
+
+    Raises:
+        TypeError: If val is not True or False.
+
+    Examples:
+        >>> import libsemigroups
+        >>> from semigroups import Transformation
+        >>> libsemigroups.reset_profiling_counters()
+        >>> libsemigroups.set_profiling(True)
+        >>> x = Transformation([1, 0]) * Transformation([0, 0])
+        >>> libsemigroups.set_profiling(False)
+        >>> libsemigroups.profiling_counters()['__mul__']['calls']
+        1
+    '''
+    global _profiling
+    if val != True and val != False:
+        raise TypeError('the argument must be True or False')
+    _profiling = val
+
+def is_profiling():
+    '''
+    Returns whether the instrumentation of the binding layer is on.
+
+    Returns:
+        bool: ``True`` if profiling is on, ``False`` otherwise.
+    '''
+    return _profiling
+
+def profiling_counters():
+    '''
+    Returns the counters recorded since they were last reset.
+
+    The returned dictionary has keys ``'elements_allocated'`` and
+    ``'elements_deleted'``, whose values are the numbers of C++ elements
+    allocated and deleted by the bindings, and a key for every entry point
+    called while profiling was on, whose value is a dictionary with keys
+    ``'calls'``, ``'time'`` (in seconds) and ``'bytes_copied'``.
+
+    Returns:
+        dict: A copy of the counters.
+    '''
+    return {key: (dict(val) if isinstance(val, dict) else val)
+            for key, val in _counters.items()}
+
+def reset_profiling_counters():
+    '''
+    Resets all of the counters returned by :func:`profiling_counters`.
+    '''
+    _counters.clear()
+    _counters['elements_allocated'] = 0
+    _counters['elements_deleted'] = 0
+
 cdef class ElementABC:
     '''
     An abstract base class for handles to libsemigroups elements.
@@ -44,28 +143,56 @@ cdef class ElementABC:
         self._handle = NULL
 
     cdef new_from_handle(self, libsemigroups.Element* handle):
+        cdef double start = _start()
         cdef ElementABC result = self.__class__(self)
         result._handle = handle[0].really_copy()
+        _allocated(1)
+        if _profiling:
+            _record_call('new_from_handle', start)
         return result
 
     def __dealloc__(self):
         if self._handle != NULL:
             self._handle[0].really_delete()
             del self._handle
+            _deleted(1)
+
+    cdef size_t _nbytes(self):
+        # An estimate of the memory used by the C++ element wrapped by self
+        return sizeof(libsemigroups.Element)
+
+    cdef int _resolve(self) except -1:
+        # Sets _handle if a subclass only sets it when it is first required,
+        # see FpElementNC, and is called before _handle is used.
+        return 0
 
     def __mul__(ElementABC self, ElementABC other):
         if not isinstance(self, type(other)):
             raise TypeError('Elements must be same type')
-        elif self.degree() != other.degree():
+        self._resolve()
+        other._resolve()
+        if self.degree() != other.degree():
             raise ValueError('Element degrees must be equal')
+        cdef double start = _start()
         cdef libsemigroups.Element* product = self._handle.identity()
-        product.redefine(self._handle, other._handle)
-        return self.new_from_handle(product)
+        _allocated(1)
+        try:
+            product.redefine(self._handle, other._handle)
+            result = self.new_from_handle(product)
+        finally:
+            product.really_delete()
+            del product
+            _deleted(1)
+        if _profiling:
+            _record_call('__mul__', start)
+        return result
 
     def __richcmp__(ElementABC self, ElementABC other, int op):
         if not isinstance(self, type(other)):
             raise TypeError('the arguments (elements) must be same type')
-        elif op == 0:
+        self._resolve()
+        other._resolve()
+        if op == 0:
             return self._handle[0] < other._handle[0]
         elif op == 1:
             return (self._handle[0] < other._handle[0]
@@ -80,27 +207,89 @@ cdef class ElementABC:
         elif op == 5:
             return not self._handle[0] < other._handle[0]
 
-    # TODO avoid creating new elements for every product here
     def __pow__(self, n, modulo):
+        return self.power(n)
+
+    def power(self, n):
+        '''
+        Function for finding a power of an element.
+
+        The power is found by repeated squaring in the C++ library, which
+        computes every product in one of two temporary elements, rather than
+        in a new element.
+
+        Args:
+            n (int):    The exponent, which must be non-negative.
+
+        Returns:
+            Element: The n-th power of the element, which is the identity if
+            n is 0.
+
+        Raises:
+            TypeError:  If n is not an int.
+            ValueError: If n is negative.
+
+        Example:
+            >>> from semigroups import Transformation
+            >>> Transformation([1, 2, 3, 0]).power(3)
+            Transformation([3, 0, 1, 2])
+        '''
         message = 'the argument (power) must be a non-negative integer'
         if not isinstance(n, int):
             raise TypeError(message)
         elif n < 0:
             raise ValueError(message)
+        self._resolve()
+        cdef double start = _start()
+        cdef libsemigroups.Element* power = libsemigroups.element_power(
+            self._handle, n)
+        _allocated(1)
+        try:
+            result = self.new_from_handle(power)
+        finally:
+            power.really_delete()
+            del power
+            _deleted(1)
+        if _profiling:
+            _record_call('power', start)
+        return result
 
-        if n == 0:
-            return self.identity()
-        g = self
-        if n % 2 == 1:
-            x = self  # x = x * g
-        else:
-            x = self.identity()
-        while n > 1:
-            g *= g
-            n //= 2
-            if n % 2 == 1:
-                x *= g
-        return x
+    def index_period(self):
+        '''
+        Function for finding the index and period of an element.
+
+        The *index* and *period* of an element :math:`x` are the least
+        positive integers :math:`i` and :math:`p` such that :math:`x ^ {i + p}
+        = x ^ i`. They are found by Brent's cycle detection algorithm in the
+        C++ library, which stores only three powers of the element at a time.
+
+        The powers of the element must eventually be periodic, as they are
+        if the element belongs to a finite semigroup, and so this is not
+        defined for a :class:`PythonElementNC`. The computation can be
+        interrupted.
+
+        Returns:
+            tuple: The index and the period of the element.
+
+        Raises:
+            TypeError:  If any argument is given.
+
+        Example:
+            >>> from semigroups import Transformation
+            >>> Transformation([1, 2, 2]).index_period()
+            (2, 1)
+        '''
+        self._resolve()
+        cdef size_t index = 0, period = 0
+        cdef double start = _start()
+        sig_on()
+        try:
+            libsemigroups.index_period(self._handle, index, period)
+        finally:
+            sig_off()
+        if _profiling:
+            _record_call('index_period', start)
+        return (index, period)
 
     def degree(self):
         '''
@@ -124,6 +313,7 @@ cdef class ElementABC:
             >>> PartialPerm([1, 2, 5], [2, 3, 5], 6).degree()
             6
         '''
+        self._resolve()
         return self._handle.degree()
 
     def identity(self):
@@ -147,14 +337,19 @@ cdef class ElementABC:
             >>> PartialPerm([0, 2], [1, 2], 3).identity()
             PartialPerm([0, 1, 2], [0, 1, 2], 3)
         '''
+        self._resolve()
         cdef libsemigroups.Element* identity = self._handle.identity()
+        _allocated(1)
         out = self.new_from_handle(identity)
         identity[0].really_delete()
+        del identity
+        _deleted(1)
         return out
 
 cdef class TransformationNC(ElementABC):
     def __init__(self, images):
         self._handle = new libsemigroups.Transformation[uint16_t](images)
+        _allocated(1)
 
     def __iter__(self):
         cdef libsemigroups.Element* e = self._handle
@@ -162,9 +357,14 @@ cdef class TransformationNC(ElementABC):
         for x in e2[0]:
             yield x
 
+    cdef size_t _nbytes(self):
+        return (sizeof(libsemigroups.Transformation[uint16_t])
+                + self._handle.degree() * sizeof(uint16_t))
+
 cdef class PartialPermNC(ElementABC):
     def __init__(self, images):
         self._handle = new libsemigroups.PartialPerm[uint16_t](images)
+        _allocated(1)
 
     def __iter__(self):
         cdef libsemigroups.Element* e = self._handle
@@ -172,6 +372,10 @@ cdef class PartialPermNC(ElementABC):
         for x in e2[0]:
             yield x
 
+    cdef size_t _nbytes(self):
+        return (sizeof(libsemigroups.PartialPerm[uint16_t])
+                + self._handle.degree() * sizeof(uint16_t))
+
     def rank(self):
         '''
         Method for finding the rank of the partial permutation.
@@ -197,6 +401,7 @@ cdef class PartialPermNC(ElementABC):
 cdef class BipartitionNC(ElementABC):
     def __init__(self, blocks_lookup):
         self._handle = new libsemigroups.Bipartition(blocks_lookup)
+        _allocated(1)
 
     def __iter__(self):
         cdef libsemigroups.Element* e = self._handle
@@ -204,6 +409,10 @@ cdef class BipartitionNC(ElementABC):
         for x in e2[0]:
             yield x
 
+    cdef size_t _nbytes(self):
+        return (sizeof(libsemigroups.Bipartition)
+                + 2 * self._handle.degree() * sizeof(uint32_t))
+
     def nr_blocks(self):
         '''Method for finding the number of blocks of a bipartition.
 
@@ -262,19 +471,162 @@ cdef class BipartitionNC(ElementABC):
         e2 = <libsemigroups.Bipartition *>e
         return e2.is_transverse_block(index)
 
+# The maximum degree of a BooleanMatNC whose rows are stored as 64-bit words,
+# see PackedBooleanMat
+cdef size_t _MAX_PACKED_DEGREE = 64
+
 cdef class BooleanMatNC(ElementABC):
+    '''
+    A class for handles to libsemigroups boolean matrices.
+
+    A matrix of degree at most 64 is a PackedBooleanMat, whose rows are 64-bit
+    words, and otherwise it is a BooleanMat. The degree determines the type,
+    and so the matrices of any degree are all of the same type.
+    '''
     def __init__(self, rows):
-        self._handle = new libsemigroups.BooleanMat(rows)
+        cdef vector[uint64_t] packed
+        cdef uint64_t word
+        cdef size_t j
+        if len(rows) <= _MAX_PACKED_DEGREE:
+            packed.reserve(len(rows))
+            for row in rows:
+                word = 0
+                for j, x in enumerate(row):
+                    if x:
+                        word |= (<uint64_t> 1) << (63 - j)
+                packed.push_back(word)
+            self._handle = new libsemigroups.PackedBooleanMat(packed)
+        else:
+            self._handle = new libsemigroups.BooleanMat(rows)
+        _allocated(1)
+
+    cdef bint _is_packed(self):
+        return self._handle.degree() <= _MAX_PACKED_DEGREE
 
     def __iter__(self): # iterate through values in the matrix
+        for row in self._unpack_rows():
+            for x in row:
+                yield x
+
+    def _unpack_rows(self):
+        # Returns the rows of the matrix as lists of bools
         cdef libsemigroups.Element* e = self._handle
+        cdef size_t n = e.degree()
+        cdef size_t i, j
+        cdef uint64_t word
+        if self._is_packed():
+            out = []
+            for i in range(n):
+                word = (<libsemigroups.PackedBooleanMat *>e).row(i)
+                out.append([(word >> (63 - j)) & 1 != 0 for j in range(n)])
+            return out
         e2 = <libsemigroups.BooleanMat *>e
+        flat = [x for x in e2[0]]
+        return [flat[i:i + n] for i in range(0, n * n, n)]
+
+    def closure(self):
+        '''
+        Function for finding the reflexive transitive closure of a boolean
+        matrix, which is the sum of all of its powers.
+
+        The closure is found by Warshall's algorithm, with the rows of the
+        matrix stored as 64-bit words.
+
+        Returns:
+            BooleanMat: The matrix whose entry in row i and column j is True
+            if and only if j is reachable from i in the directed graph with
+            adjacency matrix the given matrix.
+
+        Raises:
+            TypeError:  If any argument is given.
+
+        Example:
+            >>> from semigroups import BooleanMat
+            >>> BooleanMat([[0, 1, 0], [0, 0, 1], [0, 0, 0]]).closure()
+            BooleanMat([[1, 1, 1], [0, 1, 1], [0, 0, 1]])
+        '''
+        cdef libsemigroups.Element* e = self._handle
+        cdef libsemigroups.Element* closure
+        if self._is_packed():
+            closure = (<libsemigroups.PackedBooleanMat *>e).closure()
+        else:
+            closure = libsemigroups.boolean_mat_closure(
+                <libsemigroups.BooleanMat *>e)
+        _allocated(1)
+        try:
+            result = self.new_from_handle(closure)
+        finally:
+            closure.really_delete()
+            del closure
+            _deleted(1)
+        return result
+
+    cdef size_t _nbytes(self):
+        if self._is_packed():
+            return (sizeof(libsemigroups.PackedBooleanMat)
+                    + self._handle.degree() * sizeof(uint64_t))
+        return (sizeof(libsemigroups.BooleanMat)
+                + (self._handle.degree() ** 2 + 7) // 8)
+
+# The entries of a MatrixNC which represent infinity and minus infinity, see
+# libsemigroups::POSITIVE_INFINITY and libsemigroups::NEGATIVE_INFINITY
+POSITIVE_INFINITY = INT64_MAX
+NEGATIVE_INFINITY = INT64_MIN
+
+# The kinds of semiring over which there are MatrixNC objects, see
+# SemiringMatrix::kind_t in libsemigroups_cpp.h
+cdef dict _semiring_kinds = {'integers': 0,
+                             'max_plus': 1,
+                             'min_plus': 2,
+                             'tropical_max_plus': 3,
+                             'tropical_min_plus': 4,
+                             'natural': 5}
+
+cdef class MatrixNC(ElementABC):
+    '''
+    A class for handles to libsemigroups matrices over semirings.
+
+    The argument kind is one of 'integers', 'max_plus', 'min_plus',
+    'tropical_max_plus', 'tropical_min_plus' or 'natural', and entries is an
+    iterable of the ints which are the entries of the matrix row by row, where
+    infinity and minus infinity are POSITIVE_INFINITY and NEGATIVE_INFINITY.
+    The entries are stored in a single buffer, and the products are computed
+    by a loop which is specialised for every kind of semiring.
+    '''
+    def __init__(self, entries, kind, threshold=0, period=0):
+        if kind not in _semiring_kinds:
+            raise ValueError('unknown semiring %s' % kind)
+        self._handle = new libsemigroups.SemiringMatrix(
+            entries, _semiring_kinds[kind], threshold, period)
+        _allocated(1)
+
+    def __iter__(self): # iterate through values in the matrix
+        cdef libsemigroups.Element* e = self._handle
+        e2 = <libsemigroups.SemiringMatrix *>e
         for x in e2[0]:
             yield x
 
+    cdef size_t _nbytes(self):
+        return (sizeof(libsemigroups.SemiringMatrix)
+                + self._handle.degree() ** 2 * sizeof(int64_t))
+
+    def closure(self):
+        cdef libsemigroups.Element* e = self._handle
+        cdef libsemigroups.Element* closure = (
+            (<libsemigroups.SemiringMatrix *>e).closure())
+        _allocated(1)
+        try:
+            result = self.new_from_handle(closure)
+        finally:
+            closure.really_delete()
+            del closure
+            _deleted(1)
+        return result
+
 cdef class PBRNC(ElementABC):
     def __init__(self, adj):
         self._handle = new libsemigroups.PBR(adj)
+        _allocated(1)
 
     def __iter__(self):
         cdef libsemigroups.Element* e = self._handle
@@ -282,6 +634,12 @@ cdef class PBRNC(ElementABC):
         for x in e2[0]:
             yield x
 
+    cdef size_t _nbytes(self):
+        cdef size_t out = sizeof(libsemigroups.PBR)
+        for adj in self:
+            out += sizeof(vector[uint32_t]) + len(adj) * sizeof(uint32_t)
+        return out
+
 cdef class PythonElementNC(ElementABC):
     '''
     A class for handles to libsemigroups elements that themselves wrap
@@ -326,9 +684,40 @@ cdef class PythonElementNC(ElementABC):
             >>> sys.getrefcount(s)
             2
     '''
-    def __init__(self, value):
-        if value is not None:
+    def __init__(self, value, PythonBatchNC batch=None, complexity=None):
+        cdef shared_ptr[libsemigroups.PythonBatch] batch_handle
+        if callable(complexity):
+            # the hint is found once, and is inherited by the products
+            complexity = complexity(value)
+        if not (complexity is None
+                or (isinstance(complexity, int)
+                    and complexity is not True and complexity > 0)):
+            raise TypeError('the argument (complexity) must be None, a '
+                            + 'positive integer, or a callable returning a '
+                            + 'positive integer')
+        elif batch is None and complexity is None:
             self._handle = new libsemigroups.PythonElement(value)
+        else:
+            if batch is not None:
+                batch._handle.get().add_generator(value)
+                batch_handle = batch._handle
+            self._handle = new libsemigroups.PythonElement(
+                value, batch_handle, 1 if complexity is None else complexity)
+        _allocated(1)
+
+    cdef new_from_handle(self, libsemigroups.Element* handle):
+        # The new element is constructed without calling __init__, which would
+        # wrap the value in another PythonElement. It does not belong to the
+        # batch of handle, if any, since only the values of the elements of a
+        # semigroup are registered with its batch, see PythonBatchNC.
+        cdef double start = _start()
+        cdef PythonElementNC result = type(self).__new__(type(self))
+        result._handle = (
+            <libsemigroups.PythonElement*> handle).unbatched_copy()
+        _allocated(1)
+        if _profiling:
+            _record_call('new_from_handle', start)
+        return result
 
     def get_value(self):
         '''
@@ -339,6 +728,101 @@ cdef class PythonElementNC(ElementABC):
     def __repr__(self):
         return repr(self.get_value())
 
+    def complexity(self):
+        '''
+        Returns the cost hint for multiplying the wrapped Python object.
+
+        libsemigroups uses the complexity of elements to decide whether it is
+        cheaper to compute a product of elements of a semigroup directly, or
+        by tracing a path in its Cayley graph. By default, the complexity of
+        a Python object is 1. A hint given when the element is constructed,
+        either a positive integer or a callable which takes the wrapped
+        object and returns a positive integer, is used instead. The callable
+        is called once, when the element is constructed, and products
+        inherit the hint of their left factor.
+
+        :class:`Semigroup` uses the attribute ``semigroup_complexity`` of the
+        type of its generators, if there is such an attribute, which is
+        either a positive integer or a callable which is called once with the
+        first generator.
+
+        Returns:
+            int: The complexity of the element.
+
+        Examples:
+            >>> from libsemigroups import PythonElementNC
+            >>> PythonElementNC(2).complexity()
+            1
+            >>> PythonElementNC(2, complexity=10).complexity()
+            10
+            >>> PythonElementNC(2, complexity=lambda x: 3 * x).complexity()
+            6
+        '''
+        return (<libsemigroups.PythonElement *>self._handle).complexity()
+
+    def index_period(self):
+        '''
+        The index and period are not defined for a PythonElementNC, since the
+        powers of a Python object need not be periodic, and the
+        multiplication of Python objects cannot be interrupted safely.
+
+        Raises:
+            TypeError:  Always.
+        '''
+        raise TypeError('the index and period are not defined for Python '
+                        + 'elements')
+
+    cdef size_t _nbytes(self):
+        return (sizeof(libsemigroups.PythonElement)
+                + sys.getsizeof(self.get_value()))
+
+cdef class PythonBatchNC:
+    '''
+    A class for computing the products of Python objects required by the
+    enumeration of a semigroup in batches.
+
+    By default, every product of Python objects computed during the
+    enumeration of a semigroup is a separate call to the interpreter. If the
+    generators of a semigroup are wrapped with a batch, using
+    ``PythonElementNC(value, batch)``, then the products of all of the
+    elements found so far by a generator are computed by a single call
+    ``multiply_many(xs, ys)``, which must return the list
+    ``[x * y for x, y in zip(xs, ys)]``. If ``hash_many`` is given, then the
+    hash values of these products are computed by a single call
+    ``hash_many(products)``, which must return the list
+    ``[hash(x) for x in products]``.
+
+    :class:`Semigroup` uses a batch automatically when the type of its
+    generators has a ``multiply_many`` attribute (and optionally a
+    ``hash_many`` attribute).
+
+    Args:
+        multiply_many (callable): Computes a list of products.
+        hash_many (callable): Computes a list of hash values, or ``None``.
+
+    Examples:
+        >>> from semigroups import Semigroup
+        >>> class Mod5(int):
+        ...     def __mul__(self, other):
+        ...         return Mod5(int(self) * int(other) % 5)
+        ...     @staticmethod
+        ...     def multiply_many(xs, ys):
+        ...         return [Mod5(int(x) * int(y) % 5) for x, y in zip(xs, ys)]
+        >>> Semigroup(Mod5(2)).size()
+        4
+    '''
+    cdef shared_ptr[libsemigroups.PythonBatch] _handle
+
+    def __init__(self, multiply_many, hash_many=None):
+        if not callable(multiply_many):
+            raise TypeError('the first argument (multiply_many) must be '
+                            + 'callable')
+        elif hash_many is not None and not callable(hash_many):
+            raise TypeError('the second argument (hash_many) must be '
+                            + 'callable or None')
+        self._handle.reset(new libsemigroups.PythonBatch(multiply_many,
+                                                         hash_many))
+
 
 # TODO Currently there seems to be no point in putting this into semigrp.py
 # since almost every method has no checks but just calls the corresponding
@@ -348,13 +832,18 @@ cdef class SemigroupNC:
     # holds a pointer to the C++ instance which we're wrapping
     cdef libsemigroups.Semigroup* _handle
     cdef ElementABC _an_element
+    cdef double _enumerate_time
+    # the number of idempotents, or None if it has not been computed, see stats
+    cdef object _nr_idempotents
 
     def __cinit__(self):
         self._handle = NULL
+        self._enumerate_time = 0
 
     def __init__(self, gens):
         cdef vector[libsemigroups.Element *] cpp_gens
         for g in gens:
+            (<ElementABC>g)._resolve()
             cpp_gens.push_back((<ElementABC>g)._handle)
         self._handle = new libsemigroups.Semigroup(cpp_gens)
         self._an_element = gens[0]
@@ -362,6 +851,13 @@ cdef class SemigroupNC:
     def __dealloc__(self):
         del self._handle
 
+    cdef libsemigroups.Semigroup* _semigroup(self) except NULL:
+        # Returns the C++ semigroup, which is constructed by __init__, or when
+        # it is first required by a subclass, see FpSemigroupNC._semigroup.
+        if self._handle == NULL:
+            raise ValueError('the semigroup has not been initialised')
+        return self._handle
+
     def current_max_word_length(self):
         '''
         Let :math:`X` be a set (*alphabet*). A *short-lex order* on :math:`X`
@@ -398,7 +894,7 @@ cdef class SemigroupNC:
             >>> S.current_max_word_length()
             2
         '''
-        return self._handle.current_max_word_length()
+        return self._semigroup().current_max_word_length()
 
     def size(self):
         '''
@@ -419,7 +915,10 @@ cdef class SemigroupNC:
             5
         '''
         # Plausibly wrap in sig_off / sig_on
-        return self._handle.size()
+        start = default_timer()
+        out = self._semigroup().size()
+        self._enumerate_time += default_timer() - start
+        return out
 
     def nridempotents(self):
         r'''
@@ -449,7 +948,11 @@ cdef class SemigroupNC:
             >>> Transformation([0, 0]) ** 2
             Transformation([0, 0])
         '''
-        return self._handle.nridempotents()
+        start = default_timer()
+        out = self._semigroup().nridempotents()
+        self._enumerate_time += default_timer() - start
+        self._nr_idempotents = out
+        return out
 
     def is_done(self):
         '''
@@ -475,7 +978,63 @@ cdef class SemigroupNC:
             True
         '''
 
-        return self._handle.is_done()
+        return self._semigroup().is_done()
+
+    def stats(self):
+        '''
+        Returns a snapshot of the progress and memory use of the enumeration
+        of a semigroup, without enumerating any further.
+
+        The returned dictionary has the following keys:
+
+        * ``'nr_elements'``: the number of elements enumerated so far, this is
+          also the number of reduced words found so far, since every element
+          has a unique reduced word;
+        * ``'nr_rules'``: the number of relations found so far;
+        * ``'max_word_length'``: the length of the longest reduced word found
+          so far;
+        * ``'nr_idempotents'``: the number of idempotents if it has already
+          been computed by :meth:`nridempotents`, and ``None`` otherwise;
+        * ``'element_bytes'``: an estimate of the number of bytes used by the
+          elements enumerated so far;
+        * ``'cayley_graph_bytes'``: the number of bytes used by the left and
+          right Cayley graphs;
+        * ``'enumerate_time'``: the time, in seconds, spent enumerating the
+          semigroup;
+        * ``'is_done'``: whether the semigroup is fully enumerated.
+
+        Returns:
+            dict: The statistics of the semigroup.
+
+        Raises:
+            TypeError:  If any arguments are passed.
+
+        Examples:
+            >>> from semigroups import Semigroup, Transformation
+            >>> S = Semigroup(Transformation([1, 0]), Transformation([0, 0]))
+            >>> S.stats()['nr_idempotents'] is None
+            True
+            >>> S.size()
+            4
+            >>> S.stats()['nr_idempotents'] is None
+            True
+            >>> S.nridempotents()
+            3
+            >>> stats = S.stats()
+            >>> stats['nr_elements'], stats['nr_idempotents']
+            (4, 3)
+        '''
+        cdef libsemigroups.Semigroup* semigroup = self._semigroup()
+        nr_elements = semigroup.current_size()
+        return {'nr_elements': nr_elements,
+                'nr_rules': semigroup.current_nrrules(),
+                'max_word_length': semigroup.current_max_word_length(),
+                'nr_idempotents': self._nr_idempotents,
+                'element_bytes': nr_elements * self._an_element._nbytes(),
+                'cayley_graph_bytes': 2 * nr_elements * semigroup.nrgens()
+                                      * sizeof(size_t),
+                'enumerate_time': self._enumerate_time,
+                'is_done': semigroup.is_done()}
 
     def is_begun(self):
         '''
@@ -498,7 +1057,7 @@ cdef class SemigroupNC:
             >>> S.is_begun()
             True
         '''
-        return self._handle.is_begun()
+        return self._semigroup().is_begun()
 
     #TODO Replace with position
     def current_position(self, ElementABC x):
@@ -527,13 +1086,15 @@ cdef class SemigroupNC:
             5
         '''
 
-        pos = self._handle.current_position(x._handle)
+        x._resolve()
+        pos = self._semigroup().current_position(x._handle)
         if pos == -1:
             return None # TODO Ok?
         return pos
 
     def __contains__(self, ElementABC x):
-        return self._handle.test_membership(x._handle)
+        x._resolve()
+        return self._semigroup().test_membership(x._handle)
 
     def set_report(self, val):
         #FIXME val not appearing as arg in documentation
@@ -557,9 +1118,9 @@ cdef class SemigroupNC:
             2
         '''
         if val == True:
-            self._handle.set_report(1)
+            self._semigroup().set_report(1)
         else:
-            self._handle.set_report(0)
+            self._semigroup().set_report(0)
 
     def factorisation(self, ElementABC x):
         r'''
@@ -589,13 +1150,17 @@ cdef class SemigroupNC:
             >>> S[1] * S[0] * S[2] * S[1] * S[0] * S[2] * S[1] * S[0] * S[2] * S[1]
             Transformation([0, 0, 0, 0, 0])
         '''
-        pos = self._handle.position(x._handle)
+        cdef double start = _start()
+        x._resolve()
+        pos = self._semigroup().position(x._handle)
         if pos == -1:
             return None # TODO Ok?
-        cdef vector[size_t]* c_word = self._handle.factorisation(pos)
+        cdef vector[size_t]* c_word = self._semigroup().factorisation(pos)
         assert c_word != NULL
         py_word = [letter for letter in c_word[0]]
         del c_word
+        if _profiling:
+            _record_call('factorisation', start, len(py_word) * sizeof(size_t))
         return py_word
 
     def enumerate(self, limit = 18446744073709551615):
@@ -622,7 +1187,11 @@ cdef class SemigroupNC:
             >>> S.is_done()
             False
         '''
-        self._handle.enumerate(limit)
+        cdef double start = default_timer()
+        self._semigroup().enumerate(limit)
+        self._enumerate_time += default_timer() - start
+        if _profiling:
+            _record_call('enumerate', start)
 
     cdef new_from_handle(self, libsemigroups.Element* handle):
         return self._an_element.new_from_handle(handle)
@@ -645,7 +1214,7 @@ cdef class SemigroupNC:
             (1-0j)
         '''
         cdef libsemigroups.Element* element
-        element = self._handle.at(pos)
+        element = self._semigroup().at(pos)
         if element == NULL:
             return None
         else:
@@ -669,7 +1238,7 @@ cdef class SemigroupNC:
         cdef size_t pos = 0
         cdef libsemigroups.Element* element
         while True:
-            element = self._handle.at(pos)
+            element = self._semigroup().at(pos)
             if element == NULL:
                 break
             else:
@@ -677,7 +1246,9 @@ cdef class SemigroupNC:
             pos += 1
 
     def right_cayley_graph(self):
-        cdef libsemigroups.RecVec[size_t]* c_graph = self._handle.right_cayley_graph()
+        cdef double start = _start()
+        cdef libsemigroups.RecVec[size_t]* c_graph = (
+            self._semigroup().right_cayley_graph())
         adjacencies_list = []
         for i in range(c_graph[0].nr_rows()):
             adjacencies_list.append([])
@@ -685,10 +1256,16 @@ cdef class SemigroupNC:
                 x = c_graph.get(i, j)
                 adjacencies_list[-1].append(x)
 
+        if _profiling:
+            _record_call('right_cayley_graph', start,
+                         c_graph[0].nr_rows() * c_graph[0].nr_cols()
+                         * sizeof(size_t))
         return adjacencies_list
 
     def left_cayley_graph(self):
-        cdef libsemigroups.RecVec[size_t]* c_graph = self._handle.left_cayley_graph()
+        cdef double start = _start()
+        cdef libsemigroups.RecVec[size_t]* c_graph = (
+            self._semigroup().left_cayley_graph())
         adjacencies_list = []
         for i in range(c_graph[0].nr_rows()):
             adjacencies_list.append([])
@@ -696,38 +1273,281 @@ cdef class SemigroupNC:
                 x = c_graph.get(i, j)
                 adjacencies_list[-1].append(x)
 
+        if _profiling:
+            _record_call('left_cayley_graph', start,
+                         c_graph[0].nr_rows() * c_graph[0].nr_cols()
+                         * sizeof(size_t))
         return adjacencies_list
 
+# The letters of a rewriting system are the characters with codes 1, 2, ...,
+# see RWS::uint_to_rws_letter
+cdef size_t _MAX_RWS_LETTERS = 255
+
+# The strategies for computing the congruence defining an FpSemigroupNC, see
+# FpSemigroupNC.__init__
+STRATEGIES = ('race', 'todd_coxeter', 'todd_coxeter_prefill', 'knuth_bendix',
+              'p')
+
+cpdef bint _is_parsed(word) except -1:
+    # Returns True if word is a list of pairs, as returned by semifp._parse,
+    # rather than a string or a list of letter indices.
+    return (isinstance(word, list) and len(word) > 0
+            and isinstance(word[0], tuple))
+
 cdef class FpSemigroupNC(SemigroupNC):
     cdef libsemigroups.Congruence* _congruence
+    # the semigroup on which _congruence is defined, if any, see add_relation
+    cdef libsemigroups.Semigroup* _base
     cdef libsemigroups.RWS* _rws
+    # _byte_lookup[c] is the index in the alphabet of the letter with code c,
+    # or -1, and _letter_lookup is used for letters with codes >= 256
+    cdef long _byte_lookup[256]
+    cdef dict _letter_lookup
+    # the elements of the semigroup, see _get_quotient
+    cdef shared_ptr[libsemigroups.FpQuotient] _quotient
+    cdef vector[pair[vector[size_t], vector[size_t]]] _rels
+    cdef str _strategy
+    cdef double _congruence_time
+    cdef size_t _nr_letters
+
+    cdef _init_lookup(self):
+        cdef size_t i
+        for i in range(256):
+            self._byte_lookup[i] = -1
+        self._letter_lookup = {}
+        if isinstance(self.alphabet, int):
+            # the letters are the integers 0, 1, ..., and words are lists
+            return
+        for i, letter in enumerate(self.alphabet):
+            if ord(letter) < 256:
+                self._byte_lookup[ord(letter)] = i
+            else:
+                self._letter_lookup[letter] = i
+
+    cdef size_t _encode_letter(self, letter) except *:
+        cdef long out = -1
+        if ord(letter) < 256:
+            out = self._byte_lookup[ord(letter)]
+        else:
+            out = self._letter_lookup.get(letter, -1)
+        if out < 0:
+            raise ValueError('the letter %s does not belong to the '
+                             % letter + 'alphabet')
+        return out
+
+    cdef vector[size_t] _encode(self, word) except *:
+        # The argument is either a string, a list of letter indices, or a list
+        # of pairs (x, n) as returned by semifp._parse, which is expanded
+        # without constructing the corresponding string.
+        cdef vector[size_t] out
+        cdef const unsigned char* buf
+        cdef size_t i
+        cdef long letter
+        if isinstance(word, list):
+            if _is_parsed(word):
+                self._expand_into(word, out)
+            else:
+                out = word
+                for i in range(out.size()):
+                    if out[i] >= self._nr_letters:
+                        raise ValueError('the letter %d does not belong to '
+                                         % out[i] + 'the alphabet')
+            return out
+        try:
+            data = word.encode('latin-1')
+        except UnicodeError:
+            data = None
+        if data is not None:
+            buf = data
+            out.reserve(len(data))
+            for i in range(len(data)):
+                letter = self._byte_lookup[buf[i]]
+                if letter < 0:
+                    raise ValueError('the letter %s does not belong to the '
+                                     % chr(buf[i]) + 'alphabet')
+                out.push_back(letter)
+        else:
+            for c in word:
+                out.push_back(self._encode_letter(c))
+        return out
+
+    cdef int _expand_into(self, list pairs, vector[size_t]& out) except -1:
+        cdef size_t start, end, i, k, power, letter
+        for base, n in pairs:
+            power = n
+            if isinstance(base, list):
+                start = out.size()
+                self._expand_into(base, out)
+                end = out.size()
+                if power == 0:
+                    out.resize(start)
+                    continue
+                out.reserve(start + power * (end - start))
+                for k in range(1, power):
+                    for i in range(start, end):
+                        out.push_back(out[i])
+            else:
+                letter = self._encode_letter(base)
+                out.resize(out.size() + power, letter)
+        return 0
+
+    cdef size_t _class_index(self, libsemigroups.FpQuotient* quotient,
+                             word) except *:
+        # Returns the class of a word, as accepted by _encode, or NO_CLASS if
+        # it is empty. The powers in a list of pairs are computed by repeated
+        # squaring in the quotient, rather than by expanding them.
+        cdef size_t out = <size_t> -1
+        cdef vector[size_t] letters
+        cdef size_t i, x
+        if not _is_parsed(word):
+            letters = self._encode(word)
+            for i in range(letters.size()):
+                out = quotient.multiply(out, quotient.generator(letters[i]))
+            return out
+        for base, power in word:
+            if isinstance(base, list):
+                x = self._class_index(quotient, base)
+            else:
+                x = quotient.generator(self._encode_letter(base))
+            out = quotient.multiply(out, quotient.power(x, power))
+        return out
+
+    cdef string _to_rws_word(self, word) except *:
+        self._check_rws()
+        cdef vector[size_t] letters = self._encode(word)
+        cdef string out
+        cdef size_t i
+        out.reserve(letters.size())
+        for i in range(letters.size()):
+            out.push_back(<char> (letters[i] + 1))
+        return out
+
+    cdef _from_rws_word(self, string word):
+        cdef size_t i
+        alphabet = self.alphabet
+        if isinstance(alphabet, int):
+            return [<unsigned char> word[i] - 1 for i in range(word.size())]
+        return ''.join([alphabet[<unsigned char> word[i] - 1]
+                        for i in range(word.size())])
+
+    cdef int _check_rws(self) except -1:
+        # The letters of a rewriting system are characters, and so there is no
+        # rewriting system if there are too many generators, see __init__.
+        if self._rws == NULL:
+            raise ValueError('there is no rewriting system for a finitely '
+                             'presented semigroup with more than %d '
+                             'generators' % _MAX_RWS_LETTERS)
+        return 0
 
     def __convert_word(self, word):
-        return [self.alphabet.index(i) for i in word]
+        return self._encode(word)
 
     def __convert_rel(self, rel):
         return [self.__convert_word(w) for w in rel]
 
-    def __init__(self, nrgens, rels):
-        rels = [self.__convert_rel(rel) for rel in rels]
-        self._congruence = new libsemigroups.Congruence("twosided",
-                                                        nrgens,
-                                                        [],
-                                                        rels)
-        self._rws = new libsemigroups.RWS(rels)
+    cdef libsemigroups.Congruence* _new_congruence(self, strategy) except NULL:
+        # Returns a new congruence defining the semigroup, which is computed
+        # using the given strategy, see __init__.
+        if strategy not in STRATEGIES:
+            raise ValueError('unknown strategy %s' % strategy)
+        cdef libsemigroups.Congruence* cong
+        cong = new libsemigroups.Congruence("twosided",
+                                            self._nr_letters,
+                                            [],
+                                            self._rels)
+        if strategy == 'todd_coxeter':
+            cong.force_tc()
+        elif strategy == 'todd_coxeter_prefill':
+            cong.force_tc_prefill()
+        elif strategy == 'knuth_bendix':
+            cong.force_kbfp()
+        elif strategy == 'p':
+            cong.force_kbp()
+        return cong
+
+    def __init__(self, nrgens, rels, strategy='race'):
+        '''
+        The argument strategy is the method used to compute the congruence
+        defining the semigroup, one of:
+
+        * ``'race'``: run all of the methods below in parallel, and use the
+          first to finish;
+        * ``'todd_coxeter'``: Todd-Coxeter coset enumeration;
+        * ``'todd_coxeter_prefill'``: Todd-Coxeter coset enumeration, with
+          the table prefilled by a Froidure-Pin enumeration;
+        * ``'knuth_bendix'``: Knuth-Bendix completion followed by a
+          Froidure-Pin enumeration;
+        * ``'p'``: Knuth-Bendix completion followed by the enumeration of the
+          pairs of related elements.
+        '''
+        self._nr_letters = nrgens
+        self._init_lookup()
+        self._rels = [self.__convert_rel(rel) for rel in rels]
+        self._congruence = self._new_congruence(strategy)
+        self._strategy = strategy
+        if nrgens <= _MAX_RWS_LETTERS:
+            self._rws = new libsemigroups.RWS(self._rels)
 
     def __dealloc__(self):
         del self._congruence
+        del self._base
         del self._rws
 
-    def size(self):
+    cdef libsemigroups.Semigroup* _semigroup(self) except NULL:
+        # The semigroup generated by the elements of the quotient is only
+        # constructed when it is first required, since this requires the
+        # congruence, see semifp.FpSemigroup._init_semigroup.
+        if self._handle == NULL:
+            self._init_semigroup()
+        return SemigroupNC._semigroup(self)
+
+    cdef shared_ptr[libsemigroups.FpQuotient] _get_quotient(self) except *:
+        # The multiplication of the elements of the semigroup is found from the
+        # congruence the first time that this is called.
+        if self._quotient.get() == NULL:
+            sig_on()
+            try:
+                self._quotient.reset(new libsemigroups.FpQuotient(
+                    self._congruence, self._nr_letters))
+            finally:
+                sig_off()
+        return self._quotient
+
+    def size(self, strategy=None):
+        '''
+        Returns the number of elements of the semigroup.
+
+        If strategy is not None, then the size is computed using a new
+        congruence and the given strategy, see __init__, and the congruence
+        used by the other methods is not computed.
+        '''
+        cdef libsemigroups.Congruence* cong = self._congruence
+        if strategy is not None:
+            cong = self._new_congruence(strategy)
+        start = default_timer()
         sig_on()
         try:
-            return self._congruence.nr_classes()
+            return cong.nr_classes()
         finally:
             sig_off()
+            if strategy is None:
+                self._congruence_time += default_timer() - start
+            else:
+                del cong
         # FIXME must actually kill off the nr_classes process safely
 
+    def stats(self):
+        '''
+        Returns the statistics of the semigroup, see
+        :meth:`SemigroupNC.stats`, together with the strategy used to compute
+        the congruence defining the semigroup (key ``'strategy'``), and the
+        time, in seconds, spent computing it (key ``'congruence_time'``).
+        '''
+        out = SemigroupNC.stats(self) if self._handle != NULL else {}
+        out['strategy'] = self._strategy
+        out['congruence_time'] = self._congruence_time
+        return out
+
     def set_report(self, val):
         '''
         Sets whether or not to report data when running certain
@@ -776,7 +1596,349 @@ cdef class FpSemigroupNC(SemigroupNC):
         Returns:
             bool: True for confluent, False otherwise.
         '''
+        self._check_rws()
+        return self._rws.is_confluent()
+
+    def knuth_bendix(self, max_rules=None, max_overlap=None, timeout=None):
+        '''
+        Runs the Knuth-Bendix completion procedure on the rewriting system
+        defined by the relations of a finitely presented semigroup.
+
+        The procedure stops when the rewriting system is confluent, or when
+        one of the given limits is reached, whichever happens first.
+
+        Args:
+            max_rules (int): the number of rules after which to stop, or
+                ``None`` for no limit.
+            max_overlap (int): the maximum length of overlaps of left hand
+                sides of rules to be considered, or ``None`` for no limit.
+            timeout (float): the number of seconds after which to stop, or
+                ``None`` for no limit.
+
+        Returns:
+            bool: True if the rewriting system is now confluent, False
+            otherwise.
+        '''
+        self._check_rws()
+        self._rws.set_max_rules(<size_t> -1 if max_rules is None
+                                else max_rules)
+        self._rws.set_max_overlap(<size_t> -1 if max_overlap is None
+                                  else max_overlap)
+        cdef double seconds
+        if timeout is None:
+            sig_on()
+            try:
+                self._rws.knuth_bendix()
+            finally:
+                sig_off()
+        else:
+            seconds = timeout
+            with nogil:
+                libsemigroups.knuth_bendix_with_timeout(self._rws, seconds)
         return self._rws.is_confluent()
 
+    def rules(self):
+        '''
+        Returns the current rules of the rewriting system defined by the
+        relations of a finitely presented semigroup.
+
+        Returns:
+            list: the rules, as pairs of words over the alphabet.
+        '''
+        self._check_rws()
+        return [[self._from_rws_word(rule.first),
+                 self._from_rws_word(rule.second)]
+                for rule in self._rws.rules()]
+
+    def rewrite(self, word):
+        '''
+        Rewrites a word using the current rules of the rewriting system
+        defined by the relations of a finitely presented semigroup.
+
+        Args:
+            word (str): the word to be rewritten.
+
+        Returns:
+            str: the rewritten word.
+        '''
+        return self.rewrite_many([word])[0]
+
+    def rewrite_many(self, words):
+        '''
+        Rewrites a list of words using the current rules of the rewriting
+        system defined by the relations of a finitely presented semigroup.
+
+        The words are encoded first, and then they are all rewritten without
+        holding the GIL.
+
+        Args:
+            words (list): the words to be rewritten.
+
+        Returns:
+            list: the rewritten words.
+        '''
+        cdef vector[string] c_words
+        cdef size_t i
+        c_words.reserve(len(words))
+        for word in words:
+            c_words.push_back(self._to_rws_word(word))
+        with nogil:
+            for i in range(c_words.size()):
+                c_words[i] = self._rws.rewrite(c_words[i])
+        return [self._from_rws_word(c_words[i])
+                for i in range(c_words.size())]
+
+    def add_relation(self, lhs, rhs):
+        '''
+        Adds the relation lhs = rhs, where lhs and rhs are non-empty words as
+        accepted by word_to_class_index_many, to the presentation of the
+        semigroup.
+
+        If the quotient has been found, and the semigroup generated by its
+        elements constructed, then the new congruence is the congruence
+        generated by the relation on that semigroup, and so its Todd-Coxeter
+        table is prefilled with the current one. Otherwise the new congruence
+        is computed from the presentation. The relation is added to the rules
+        of the rewriting system, which is completed again by knuth_bendix.
+
+        The semigroup generated by the elements of the quotient is deleted,
+        and is constructed again when it is next required, see _semigroup,
+        and the statistics of the semigroup are reset, see stats.
+        '''
+        cdef pair[vector[size_t], vector[size_t]] rel
+        rel.first = self._encode(lhs)
+        rel.second = self._encode(rhs)
+        if self._rws != NULL:
+            self._rws.add_rule(self._to_rws_word(lhs), self._to_rws_word(rhs))
+        self._rels.push_back(rel)
+
+        cdef vector[pair[vector[size_t], vector[size_t]]] extra
+        cdef libsemigroups.Congruence* cong
+        if self._handle != NULL and self._quotient.get() != NULL:
+            extra.push_back(rel)
+            cong = new libsemigroups.Congruence("twosided", self._handle,
+                                                extra)
+            cong.force_tc_prefill()
+            del self._congruence
+            del self._base
+            self._base = self._handle
+        else:
+            cong = self._new_congruence(self._strategy)
+            del self._congruence
+            del self._base
+            self._base = NULL
+            del self._handle
+        self._congruence = cong
+        self._handle = NULL
+        self._quotient.reset()
+        self._enumerate_time = 0
+        self._nr_idempotents = None
+        self._congruence_time = 0
+
     def word_to_class_index(self, word):
-        return self._congruence.word_to_class_index(self.__convert_word(word))
+        return self.word_to_class_index_many([word])[0]
+
+    def word_to_class_index_many(self, words):
+        '''
+        Returns the list of the class indices of the given words.
+
+        The class indices are found in the quotient built from the
+        congruence, see FpQuotient, and so the powers in the words are
+        computed by repeated squaring, rather than by expanding them. The
+        words without powers are encoded first, and then their class indices
+        are all found without holding the GIL.
+
+        Args:
+            words (list): the words, as strings over the alphabet, or lists
+                returned by semifp._parse.
+
+        Returns:
+            list: the class indices of the words, where the class index of
+            the empty word is ``None``.
+        '''
+        cdef libsemigroups.FpQuotient* quotient = self._get_quotient().get()
+        cdef vector[vector[size_t]] c_words
+        cdef vector[size_t] positions
+        cdef vector[size_t] c_out
+        cdef size_t i, j, index
+        out = []
+        for word in words:
+            if _is_parsed(word):
+                index = self._class_index(quotient, word)
+                out.append(None if index == <size_t> -1 else index)
+            else:
+                positions.push_back(len(out))
+                c_words.push_back(self._encode(word))
+                out.append(None)
+        c_out.resize(c_words.size())
+        with nogil:
+            for i in range(c_words.size()):
+                index = <size_t> -1
+                for j in range(c_words[i].size()):
+                    index = quotient.multiply(
+                        index, quotient.generator(c_words[i][j]))
+                c_out[i] = index
+        for i in range(c_words.size()):
+            if c_out[i] != <size_t> -1:
+                j = positions[i]
+                out[j] = c_out[i]
+        return out
+
+    def right_cayley_graph(self):
+        '''
+        Returns the right Cayley graph of the semigroup, as found from the
+        congruence defining it.
+
+        Returns:
+            list: the list whose i-th entry is the list of the class indices
+            of the products of the class with index i by the generators.
+        '''
+        cdef libsemigroups.FpQuotient* quotient = self._get_quotient().get()
+        cdef size_t n = quotient.nr_classes()
+        cdef size_t nrgens = quotient.nrgens()
+        cdef size_t c, a
+        cdef double start = _start()
+        out = [[quotient.right(c, a) for a in range(nrgens)]
+               for c in range(n)]
+        if _profiling:
+            _record_call('right_cayley_graph', start,
+                         n * nrgens * sizeof(size_t))
+        return out
+
+    def left_cayley_graph(self):
+        '''
+        Returns the left Cayley graph of the semigroup, as found from the
+        congruence defining it.
+
+        Returns:
+            list: the list whose i-th entry is the list of the class indices
+            of the products of the generators by the class with index i.
+        '''
+        cdef libsemigroups.FpQuotient* quotient = self._get_quotient().get()
+        cdef size_t n = quotient.nr_classes()
+        cdef size_t nrgens = quotient.nrgens()
+        cdef size_t c, a
+        cdef double start = _start()
+        out = [[quotient.product(quotient.generator(a), c)
+                for a in range(nrgens)] for c in range(n)]
+        if _profiling:
+            _record_call('left_cayley_graph', start,
+                         n * nrgens * sizeof(size_t))
+        return out
+
+    def multiplication_table(self):
+        '''
+        Returns the multiplication table of the semigroup, as found from the
+        congruence defining it.
+
+        Returns:
+            list: the list whose i-th entry is the list of the class indices
+            of the products of the class with index i by the classes with
+            index 0, 1, and so on.
+        '''
+        cdef libsemigroups.FpQuotient* quotient = self._get_quotient().get()
+        cdef size_t n = quotient.nr_classes()
+        cdef vector[size_t] table
+        cdef size_t x, y
+        table.resize(n * n)
+        with nogil:
+            for x in range(n):
+                for y in range(n):
+                    table[x * n + y] = quotient.product(x, y)
+        return [[table[x * n + y] for y in range(n)] for x in range(n)]
+
+    def equal_many(self, pairs):
+        '''
+        Returns the list of whether or not the words in each of the given
+        pairs represent the same element.
+
+        Args:
+            pairs (list): the pairs of words, as strings over the alphabet.
+
+        Returns:
+            list: ``True`` for every pair of equal words, ``False`` otherwise.
+        '''
+        indices = self.word_to_class_index_many([w for pair in pairs
+                                                 for w in pair])
+        return [indices[i] == indices[i + 1]
+                for i in range(0, len(indices), 2)]
+
+cdef class FpElementNC(ElementABC):
+    '''
+    A handle to an element of a finitely presented semigroup, represented by
+    the index of its class in the congruence defining the semigroup.
+
+    The product of two elements is computed by following the short-lex least
+    word in the class of the right factor in the right Cayley graph of the
+    semigroup, which is found, once and for all, from the congruence.
+
+    The argument word is a word as accepted by
+    FpSemigroupNC.word_to_class_index_many, whose class index is only found
+    when the element is first multiplied or compared, since this requires the
+    congruence.
+    '''
+    cdef FpSemigroupNC _semigroup
+    # the word representing the element, until its class index is found
+    cdef object _word
+
+    def __init__(self, FpSemigroupNC semigroup, word):
+        self._semigroup = semigroup
+        self._word = word
+
+    cdef new_from_handle(self, libsemigroups.Element* handle):
+        # The new element is constructed without calling __init__, since its
+        # class index is already known.
+        cdef double start = _start()
+        cdef FpElementNC result = type(self).__new__(type(self))
+        result._semigroup = self._semigroup
+        result._handle = handle[0].really_copy()
+        _allocated(1)
+        if _profiling:
+            _record_call('new_from_handle', start)
+        return result
+
+    cdef int _resolve(self) except -1:
+        cdef shared_ptr[libsemigroups.FpQuotient] quotient
+        cdef size_t index
+        if self._handle != NULL:
+            return 0
+        quotient = self._semigroup._get_quotient()
+        index = self._semigroup._class_index(quotient.get(), self._word)
+        if index == <size_t> -1:
+            raise ValueError('the empty word does not represent an element '
+                             + 'of an FpSemigroup')
+        self._handle = new libsemigroups.FpElement(index, quotient)
+        _allocated(1)
+        self._word = None
+        return 0
+
+    def semigroup(self):
+        '''
+        Returns the finitely presented semigroup to which the element belongs.
+        '''
+        return self._semigroup
+
+    def class_index(self):
+        '''
+        Returns the class index of the element, see
+        :meth:`FpSemigroup.word_to_class_index`, or ``None`` if the element is
+        the identity returned by :meth:`identity`, which does not belong to
+        the semigroup.
+        '''
+        self._resolve()
+        cdef size_t index
+        index = (<libsemigroups.FpElement *>self._handle).class_index()
+        if index == <size_t> -1:
+            return None
+        return index
+
+    def representative(self):
+        '''
+        Returns the short-lex least word in the class of the element, as a
+        list of the indices of the generators.
+        '''
+        self._resolve()
+        return (<libsemigroups.FpElement *>self._handle).representative()
+
+    cdef size_t _nbytes(self):
+        return sizeof(libsemigroups.FpElement)
@@ -1,4 +1,754 @@
 #include "libsemigroups_cpp.h"
 #include <Python.h>
 
-namespace libsemigroups {};
+#include <atomic>
+#include <chrono>
+#include <condition_variable>
+#include <limits>
+#include <mutex>
+#include <thread>
+
+namespace libsemigroups {
+
+  void knuth_bendix_with_timeout(RWS* rws, double seconds) {
+    std::atomic<bool>       killed(false);
+    std::mutex              mtx;
+    std::condition_variable cv;
+    bool                    finished = false;
+
+    std::thread watchdog([&]() {
+      std::unique_lock<std::mutex> lock(mtx);
+      if (!cv.wait_for(lock,
+                       std::chrono::duration<double>(seconds),
+                       [&finished]() { return finished; })) {
+        killed = true;
+      }
+    });
+    auto stop_watchdog = [&]() {
+      {
+        std::lock_guard<std::mutex> lock(mtx);
+        finished = true;
+      }
+      cv.notify_one();
+      watchdog.join();
+    };
+    try {
+      rws->knuth_bendix(killed);
+    } catch (...) {
+      stop_watchdog();
+      throw;
+    }
+    stop_watchdog();
+  }
+
+  const size_t FpQuotient::NO_CLASS;
+
+  const size_t   PackedBooleanMat::MAX_DEGREE;
+  const uint64_t PackedBooleanMat::TOP_BIT;
+
+  FpQuotient::FpQuotient(Congruence* cong, size_t nrgens)
+      : _nrgens(nrgens),
+        _gens(),
+        _table(),
+        _parent(),
+        _last(),
+        _length(),
+        _max_word_length(0) {
+    size_t n = cong->nr_classes();
+    _table.assign(n * nrgens, NO_CLASS);
+    _parent.assign(n, NO_CLASS);
+    _last.assign(n, 0);
+    _length.assign(n, 0);
+    std::vector<size_t> queue;
+    queue.reserve(n);
+
+    auto class_index = [&cong, &n](word_t const& w) {
+      size_t c = cong->word_to_class_index(w);
+      if (c >= n) {
+        throw std::runtime_error("FpQuotient: invalid class index");
+      }
+      return c;
+    };
+
+    // The classes are found in short-lex order of their least words, by a
+    // breadth first search of the right Cayley graph from the generators.
+    for (size_t a = 0; a < nrgens; ++a) {
+      size_t c = class_index(word_t({a}));
+      _gens.push_back(c);
+      if (_length[c] == 0) {
+        _last[c]   = a;
+        _length[c] = 1;
+        queue.push_back(c);
+      }
+    }
+    for (size_t i = 0; i < queue.size(); ++i) {
+      size_t c = queue[i];
+      word_t w = word(c);
+      w.push_back(0);
+      for (size_t a = 0; a < nrgens; ++a) {
+        w.back()               = a;
+        size_t d               = class_index(w);
+        _table[c * nrgens + a] = d;
+        if (_length[d] == 0) {
+          _parent[d] = c;
+          _last[d]   = a;
+          _length[d] = w.size();
+          queue.push_back(d);
+        }
+      }
+    }
+    if (!queue.empty()) {
+      _max_word_length = _length[queue.back()];
+    }
+  }
+
+  namespace {
+    // Deletes an element returned by identity or really_copy, so that the
+    // elements used as scratch space below are deleted even if redefine
+    // throws.
+    struct ElementDeleter {
+      void operator()(Element* x) const {
+        x->really_delete();
+        delete x;
+      }
+    };
+
+    typedef std::unique_ptr<Element, ElementDeleter> element_ptr;
+  }  // namespace
+
+  Element* element_power(Element const* x, size_t n) {
+    element_ptr out(x->identity());
+    if (n == 0) {
+      return out.release();
+    }
+    element_ptr base(x->really_copy());
+    element_ptr tmp(x->identity());
+    while (true) {
+      if (n & 1) {
+        tmp->redefine(out.get(), base.get());
+        std::swap(tmp, out);
+      }
+      n >>= 1;
+      if (n == 0) {
+        break;
+      }
+      tmp->redefine(base.get(), base.get());
+      std::swap(tmp, base);
+    }
+    return out.release();
+  }
+
+  void index_period(Element const* x, size_t& index, size_t& period) {
+    element_ptr tortoise(x->really_copy());
+    element_ptr hare(x->really_copy());
+    element_ptr tmp(x->really_copy());
+    // Replaces y by the next power of x
+    auto next = [&x, &tmp](element_ptr& y) {
+      tmp->redefine(y.get(), x);
+      std::swap(tmp, y);
+    };
+
+    // The hare moves one power at a time, and the tortoise jumps to the hare
+    // whenever the number of steps since its last jump is a power of 2, until
+    // they meet, and then the number of steps is the period.
+    size_t limit = 1;
+    period       = 1;
+    next(hare);
+    while (!(*tortoise == *hare)) {
+      if (period == limit) {
+        tortoise->copy(hare.get());
+        limit *= 2;
+        period = 0;
+      }
+      next(hare);
+      ++period;
+    }
+
+    // The tortoise and the hare, which is period powers ahead, move together
+    // from x until they meet at the first power in the cycle.
+    tortoise->copy(x);
+    hare->copy(x);
+    for (size_t i = 0; i < period; ++i) {
+      next(hare);
+    }
+    index = 1;
+    while (!(*tortoise == *hare)) {
+      next(tortoise);
+      next(hare);
+      ++index;
+    }
+  }
+
+  void boolean_closure(std::vector<uint64_t>& rows, size_t n) {
+    static const uint64_t TOP_BIT = static_cast<uint64_t>(1) << 63;
+    size_t const          m       = (n == 0 ? 0 : rows.size() / n);
+    for (size_t k = 0; k < n; ++k) {
+      uint64_t const  mask = TOP_BIT >> (k % 64);
+      uint64_t const* rk   = &rows[k * m];
+      for (size_t i = 0; i < n; ++i) {
+        uint64_t* ri = &rows[i * m];
+        if (ri[k / 64] & mask) {
+          for (size_t w = 0; w < m; ++w) {
+            ri[w] |= rk[w];
+          }
+        }
+      }
+    }
+    for (size_t i = 0; i < n; ++i) {
+      rows[i * m + i / 64] |= TOP_BIT >> (i % 64);
+    }
+  }
+
+  BooleanMat* boolean_mat_closure(BooleanMat* x) {
+    size_t const          n = x->degree();
+    size_t const          m = (n + 63) / 64;
+    std::vector<uint64_t> rows(n * m, 0);
+    auto                  it = x->begin();
+    for (size_t i = 0; i < n; ++i) {
+      for (size_t j = 0; j < n; ++j, ++it) {
+        if (*it) {
+          rows[i * m + j / 64] |= static_cast<uint64_t>(1) << (63 - j % 64);
+        }
+      }
+    }
+    boolean_closure(rows, n);
+    std::vector<std::vector<bool>> out(n, std::vector<bool>(n, false));
+    for (size_t i = 0; i < n; ++i) {
+      for (size_t j = 0; j < n; ++j) {
+        out[i][j] = (rows[i * m + j / 64] >> (63 - j % 64)) & 1;
+      }
+    }
+    return new BooleanMat(out);
+  }
+
+  namespace {
+    // The entries of a SemiringMatrix which represent infinity and minus
+    // infinity, see SemiringABC.to_ints
+    int64_t const PLUS_INF  = std::numeric_limits<int64_t>::max();
+    int64_t const MINUS_INF = std::numeric_limits<int64_t>::min();
+
+    // The sum and product of 64-bit integers, which throw std::overflow_error
+    // rather than overflowing.
+    void throw_overflow() {
+      throw std::overflow_error(
+          "SemiringMatrix: an entry of the product is not a 64-bit integer");
+    }
+
+    int64_t checked_add(int64_t x, int64_t y) {
+      int64_t z;
+      if (__builtin_add_overflow(x, y, &z)) {
+        throw_overflow();
+      }
+      return z;
+    }
+
+    int64_t checked_mul(int64_t x, int64_t y) {
+      int64_t z;
+      if (__builtin_mul_overflow(x, y, &z)) {
+        throw_overflow();
+      }
+      return z;
+    }
+
+    // Returns the finite entry x, and throws std::overflow_error if x is the
+    // entry which represents an infinity.
+    int64_t checked_finite(int64_t x, int64_t infinity) {
+      if (x == infinity) {
+        throw_overflow();
+      }
+      return x;
+    }
+
+    // The semirings over which there are SemiringMatrix objects, every one of
+    // which is passed by value to the templates below, so that its addition
+    // and multiplication are inlined in their loops. The entries of the
+    // products over the integers, max-plus, min-plus and natural semirings
+    // are checked for overflow, since the integers in these semirings are
+    // unbounded, or the threshold and period are arbitrary.
+    struct IntegersKernel {
+      int64_t zero() const {
+        return 0;
+      }
+      int64_t one() const {
+        return 1;
+      }
+      int64_t plus(int64_t x, int64_t y) const {
+        return checked_add(x, y);
+      }
+      int64_t prod(int64_t x, int64_t y) const {
+        return checked_mul(x, y);
+      }
+    };
+
+    struct MaxPlusKernel {
+      int64_t zero() const {
+        return MINUS_INF;
+      }
+      int64_t one() const {
+        return 0;
+      }
+      int64_t plus(int64_t x, int64_t y) const {
+        return std::max(x, y);
+      }
+      int64_t prod(int64_t x, int64_t y) const {
+        return (x == MINUS_INF || y == MINUS_INF
+                    ? MINUS_INF
+                    : checked_finite(checked_add(x, y), MINUS_INF));
+      }
+    };
+
+    struct MinPlusKernel {
+      int64_t zero() const {
+        return PLUS_INF;
+      }
+      int64_t one() const {
+        return 0;
+      }
+      int64_t plus(int64_t x, int64_t y) const {
+        return std::min(x, y);
+      }
+      int64_t prod(int64_t x, int64_t y) const {
+        return (x == PLUS_INF || y == PLUS_INF
+                    ? PLUS_INF
+                    : checked_finite(checked_add(x, y), PLUS_INF));
+      }
+    };
+
+    struct TropicalMaxPlusKernel {
+      int64_t threshold;
+      int64_t zero() const {
+        return MINUS_INF;
+      }
+      int64_t one() const {
+        return 0;
+      }
+      int64_t plus(int64_t x, int64_t y) const {
+        return std::max(x, y);
+      }
+      int64_t prod(int64_t x, int64_t y) const {
+        // the finite entries are at most threshold, and non-negative, and so
+        // threshold - y does not overflow
+        return (x == MINUS_INF || y == MINUS_INF
+                    ? MINUS_INF
+                    : (x > threshold - y ? threshold : x + y));
+      }
+    };
+
+    struct TropicalMinPlusKernel {
+      int64_t threshold;
+      int64_t zero() const {
+        return PLUS_INF;
+      }
+      int64_t one() const {
+        return 0;
+      }
+      int64_t plus(int64_t x, int64_t y) const {
+        return std::min(x, y);
+      }
+      int64_t prod(int64_t x, int64_t y) const {
+        return (x == PLUS_INF || y == PLUS_INF
+                    ? PLUS_INF
+                    : (x > threshold - y ? threshold : x + y));
+      }
+    };
+
+    struct NaturalKernel {
+      int64_t threshold;
+      int64_t period;
+      int64_t reduce(int64_t x) const {
+        return (x > threshold ? threshold + (x - threshold) % period : x);
+      }
+      int64_t zero() const {
+        return 0;
+      }
+      int64_t one() const {
+        return 1;
+      }
+      int64_t plus(int64_t x, int64_t y) const {
+        return reduce(checked_add(x, y));
+      }
+      int64_t prod(int64_t x, int64_t y) const {
+        return reduce(checked_mul(x, y));
+      }
+    };
+
+    // Sets c to the product of the matrices a and b of degree n, which are
+    // stored row by row. Row i of c is the sum of the rows k of b multiplied
+    // by the entries a[i * n + k], where the rows k such that this entry is
+    // zero are skipped, since zero is absorbing, and the innermost loop runs
+    // over consecutive entries of b and c.
+    template <typename S>
+    void semiring_product(S const&       sr,
+                          int64_t const* a,
+                          int64_t const* b,
+                          int64_t*       c,
+                          size_t         n) {
+      int64_t const zero = sr.zero();
+      std::fill(c, c + n * n, zero);
+      for (size_t i = 0; i < n; ++i) {
+        int64_t* ci = c + i * n;
+        for (size_t k = 0; k < n; ++k) {
+          int64_t const aik = a[i * n + k];
+          if (aik == zero) {
+            continue;
+          }
+          int64_t const* bk = b + k * n;
+          for (size_t j = 0; j < n; ++j) {
+            ci[j] = sr.plus(ci[j], sr.prod(aik, bk[j]));
+          }
+        }
+      }
+    }
+
+    // Returns the Kleene star 1 + a + a ^ 2 + ... of an element a of a
+    // max-plus, min-plus or tropical semiring sr, where bounded is true if sr
+    // is tropical. If 1 + a = 1, then the star is 1. Otherwise, the sum does
+    // not converge, unless sr is tropical, in which case the powers of a are
+    // eventually constant, and their limit is found by repeated squaring.
+    template <typename S>
+    int64_t semiring_star(S const& sr, int64_t a, bool bounded) {
+      if (sr.plus(sr.one(), a) == sr.one()) {
+        return sr.one();
+      } else if (!bounded) {
+        throw std::invalid_argument(
+            "the closure of the matrix does not exist");
+      }
+      int64_t b = sr.prod(a, a);
+      while (b != a) {
+        a = b;
+        b = sr.prod(a, a);
+      }
+      return sr.plus(sr.one(), a);
+    }
+
+    // Replaces the matrix d of degree n, which is stored row by row, by its
+    // Kleene closure, see SemiringMatrix::closure.
+    template <typename S>
+    void semiring_closure(S const&              sr,
+                          std::vector<int64_t>& d,
+                          size_t                n,
+                          bool                  bounded) {
+      std::vector<int64_t> col(n);
+      std::vector<int64_t> row(n);
+      int64_t const        zero = sr.zero();
+
+      // After step k, d[i * n + j] is the sum of the weights of the paths of
+      // positive length from i to j whose intermediate vertices are less
+      // than or equal to k.
+      for (size_t k = 0; k < n; ++k) {
+        int64_t const s = semiring_star(sr, d[k * n + k], bounded);
+        for (size_t i = 0; i < n; ++i) {
+          col[i] = d[i * n + k];
+          row[i] = sr.prod(s, d[k * n + i]);
+        }
+        for (size_t i = 0; i < n; ++i) {
+          if (col[i] == zero) {
+            continue;
+          }
+          int64_t* di = &d[i * n];
+          for (size_t j = 0; j < n; ++j) {
+            di[j] = sr.plus(di[j], sr.prod(col[i], row[j]));
+          }
+        }
+      }
+      for (size_t i = 0; i < n; ++i) {
+        d[i * n + i] = sr.plus(d[i * n + i], sr.one());
+      }
+    }
+  }  // namespace
+
+  SemiringMatrix::SemiringMatrix(std::vector<int64_t> const& entries,
+                                 int                         kind,
+                                 int64_t                     threshold,
+                                 int64_t                     period)
+      : Element(),
+        _entries(entries),
+        _degree(0),
+        _kind(static_cast<kind_t>(kind)),
+        _threshold(threshold),
+        _period(period) {
+    while (_degree * _degree < entries.size()) {
+      ++_degree;
+    }
+    if (_degree == 0 || _degree * _degree != entries.size()) {
+      throw std::invalid_argument(
+          "SemiringMatrix: the number of entries must be a positive square");
+    } else if (kind < INTEGERS || kind > NATURAL) {
+      throw std::invalid_argument("SemiringMatrix: unknown kind of semiring");
+    } else if (kind == NATURAL && period <= 0) {
+      throw std::invalid_argument(
+          "SemiringMatrix: the period must be positive");
+    }
+  }
+
+  Element* SemiringMatrix::identity() const {
+    int64_t zero, one;
+    switch (_kind) {
+      case MAX_PLUS:
+      case TROPICAL_MAX_PLUS:
+        zero = MINUS_INF;
+        one  = 0;
+        break;
+      case MIN_PLUS:
+      case TROPICAL_MIN_PLUS:
+        zero = PLUS_INF;
+        one  = 0;
+        break;
+      default:
+        zero = 0;
+        one  = 1;
+    }
+    SemiringMatrix* out = new SemiringMatrix(*this);
+    std::fill(out->_entries.begin(), out->_entries.end(), zero);
+    for (size_t i = 0; i < _degree; ++i) {
+      out->_entries[i * _degree + i] = one;
+    }
+    out->reset_hash_value();
+    return out;
+  }
+
+  void SemiringMatrix::redefine(Element const* x, Element const* y) {
+    int64_t const* a = static_cast<SemiringMatrix const*>(x)->_entries.data();
+    int64_t const* b = static_cast<SemiringMatrix const*>(y)->_entries.data();
+    size_t const   n = _degree;
+    // The product is computed in tmp if this is one of its factors
+    std::vector<int64_t> tmp;
+    int64_t*             c = _entries.data();
+    if (x == this || y == this) {
+      tmp.resize(n * n);
+      c = tmp.data();
+    }
+    switch (_kind) {
+      case INTEGERS:
+        semiring_product(IntegersKernel(), a, b, c, n);
+        break;
+      case MAX_PLUS:
+        semiring_product(MaxPlusKernel(), a, b, c, n);
+        break;
+      case MIN_PLUS:
+        semiring_product(MinPlusKernel(), a, b, c, n);
+        break;
+      case TROPICAL_MAX_PLUS:
+        semiring_product(TropicalMaxPlusKernel{_threshold}, a, b, c, n);
+        break;
+      case TROPICAL_MIN_PLUS:
+        semiring_product(TropicalMinPlusKernel{_threshold}, a, b, c, n);
+        break;
+      case NATURAL:
+        semiring_product(NaturalKernel{_threshold, _period}, a, b, c, n);
+        break;
+    }
+    if (!tmp.empty()) {
+      _entries.swap(tmp);
+    }
+    reset_hash_value();
+  }
+
+  SemiringMatrix* SemiringMatrix::closure() const {
+    std::unique_ptr<SemiringMatrix> out(new SemiringMatrix(*this));
+    switch (_kind) {
+      case MAX_PLUS:
+        semiring_closure(MaxPlusKernel(), out->_entries, _degree, false);
+        break;
+      case MIN_PLUS:
+        semiring_closure(MinPlusKernel(), out->_entries, _degree, false);
+        break;
+      case TROPICAL_MAX_PLUS:
+        semiring_closure(
+            TropicalMaxPlusKernel{_threshold}, out->_entries, _degree, true);
+        break;
+      case TROPICAL_MIN_PLUS:
+        semiring_closure(
+            TropicalMinPlusKernel{_threshold}, out->_entries, _degree, true);
+        break;
+      default:
+        throw std::invalid_argument(
+            "the closure is only defined over the max-plus, min-plus and "
+            "tropical semirings");
+    }
+    out->reset_hash_value();
+    return out.release();
+  }
+
+  namespace {
+    // Clears the Python error set by a call in a batch, if any, if it is a
+    // TypeError or ValueError, which are raised if multiply_many or hash_many
+    // returns something other than a list of the right length, so that the
+    // batch falls back to computing the products one at a time. Any other
+    // error, such as a KeyboardInterrupt or MemoryError, is left set and a
+    // std::runtime_error is thrown, so that it is re-raised, as in
+    // PythonElement::redefine.
+    void clear_batch_error(char const* what) {
+      if (PyErr_Occurred() == nullptr) {
+        return;
+      } else if (PyErr_ExceptionMatches(PyExc_TypeError)
+                 || PyErr_ExceptionMatches(PyExc_ValueError)) {
+        PyErr_Clear();
+        return;
+      }
+      throw std::runtime_error(what);
+    }
+  }  // namespace
+
+  PythonBatch::PythonBatch(PyObject* multiply_many, PyObject* hash_many)
+      : _multiply_many(multiply_many),
+        _hash_many(hash_many == Py_None ? nullptr : hash_many) {
+    Py_INCREF(_multiply_many);
+    Py_XINCREF(_hash_many);
+  }
+
+  PythonBatch::~PythonBatch() {
+    for (auto& kv : _pending) {
+      for (PyObject* p : kv.second.products) {
+        Py_DECREF(p);
+      }
+      Py_DECREF(kv.first);
+    }
+    for (auto& kv : _hashes) {
+      Py_DECREF(kv.first);
+    }
+    for (PyObject* x : _values) {
+      Py_DECREF(x);
+    }
+    Py_DECREF(_multiply_many);
+    Py_XDECREF(_hash_many);
+  }
+
+  void PythonBatch::add_generator(PyObject* y) {
+    if (_pending.find(y) == _pending.end()) {
+      Py_INCREF(y);
+      _pending.emplace(y, Pending{0, std::deque<PyObject*>()});
+    }
+    register_value(y);
+  }
+
+  void PythonBatch::register_value(PyObject* x) {
+    if (x != Py_None && _registered.emplace(x, _values.size()).second) {
+      Py_INCREF(x);
+      _values.push_back(x);
+    }
+  }
+
+  PyObject* PythonBatch::product(PyObject* x, PyObject* y) {
+    auto it = _pending.find(y);
+    auto jt = _registered.find(x);
+    if (it == _pending.end() || jt == _registered.end()) {
+      return nullptr;
+    }
+    Pending& pending = it->second;
+    size_t   i       = jt->second;
+    if (i < pending.first) {
+      // The product was either already requested, or not required when the
+      // products after it were computed.
+      return nullptr;
+    } else if (i >= pending.first + pending.products.size()) {
+      release_front(pending, pending.first + pending.products.size());
+      if (!multiply_batch(y, pending, i)) {
+        return nullptr;
+      }
+    }
+    release_front(pending, i);
+    // Every product is only requested once during an enumeration, and so the
+    // reference is handed over to the caller.
+    PyObject* out = pending.products.front();
+    pending.products.pop_front();
+    pending.first++;
+    return out;
+  }
+
+  void PythonBatch::release_front(Pending& pending, size_t first) {
+    for (; pending.first < first; pending.first++) {
+      PyObject* p = pending.products.front();
+      pending.products.pop_front();
+      auto it = _hashes.find(p);
+      if (it != _hashes.end()) {
+        Py_DECREF(it->first);
+        _hashes.erase(it);
+      }
+      Py_DECREF(p);
+    }
+  }
+
+  bool PythonBatch::hash(PyObject* x, size_t& hv) {
+    auto it = _hashes.find(x);
+    if (it == _hashes.end()) {
+      return false;
+    }
+    hv = it->second;
+    Py_DECREF(it->first);
+    _hashes.erase(it);
+    return true;
+  }
+
+  bool PythonBatch::multiply_batch(PyObject* y,
+                                   Pending&  pending,
+                                   size_t    first) {
+    size_t    last = _values.size();
+    PyObject* xs   = PyList_New(last - first);
+    PyObject* ys   = PyList_New(last - first);
+    if (xs == nullptr || ys == nullptr) {
+      Py_XDECREF(xs);
+      Py_XDECREF(ys);
+      throw std::runtime_error("PythonBatch: cannot allocate a batch");
+    }
+    for (size_t i = first; i < last; ++i) {
+      Py_INCREF(_values[i]);
+      PyList_SET_ITEM(xs, i - first, _values[i]);
+      Py_INCREF(y);
+      PyList_SET_ITEM(ys, i - first, y);
+    }
+    PyObject* products
+        = PyObject_CallFunctionObjArgs(_multiply_many, xs, ys, nullptr);
+    Py_DECREF(xs);
+    Py_DECREF(ys);
+    PyObject* seq = nullptr;
+    if (products != nullptr) {
+      seq = PySequence_Fast(products, "multiply_many must return a sequence");
+      Py_DECREF(products);
+    }
+    if (seq == nullptr
+        || static_cast<size_t>(PySequence_Fast_GET_SIZE(seq)) != last - first) {
+      // Fall back to computing the products one at a time
+      Py_XDECREF(seq);
+      clear_batch_error("PythonBatch: multiply_many failed");
+      return false;
+    }
+    pending.first = first;
+    for (size_t i = first; i < last; ++i) {
+      PyObject* p = PySequence_Fast_GET_ITEM(seq, i - first);
+      Py_INCREF(p);
+      pending.products.push_back(p);
+    }
+
+    if (_hash_many != nullptr) {
+      PyObject* hashes = PyObject_CallFunctionObjArgs(_hash_many, seq, nullptr);
+      PyObject* hseq   = nullptr;
+      if (hashes != nullptr) {
+        hseq = PySequence_Fast(hashes, "hash_many must return a sequence");
+        Py_DECREF(hashes);
+      }
+      if (hseq != nullptr
+          && static_cast<size_t>(PySequence_Fast_GET_SIZE(hseq))
+                 == last - first) {
+        for (size_t i = first; i < last; ++i) {
+          PyObject*  p  = PySequence_Fast_GET_ITEM(seq, i - first);
+          Py_ssize_t hv = PyNumber_AsSsize_t(
+              PySequence_Fast_GET_ITEM(hseq, i - first), nullptr);
+          if (hv == -1 && PyErr_Occurred()) {
+            break;
+          }
+          if (_hashes.find(p) == _hashes.end()) {
+            Py_INCREF(p);
+            _hashes.emplace(p, static_cast<size_t>(hv));
+          }
+        }
+      }
+      Py_XDECREF(hseq);
+    }
+    Py_DECREF(seq);
+    // The hash values which are not known are computed one at a time
+    clear_batch_error("PythonBatch: hash_many failed");
+    return true;
+  }
+
+};  // namespace libsemigroups
@@ -1,8 +1,486 @@
 #include <Python.h>
+#include <libsemigroups/cong.h>
+#include <libsemigroups/rws.h>
 #include <libsemigroups/semigroups.h>
 
+#include <algorithm>
+#include <cstdint>
+#include <deque>
+#include <functional>
+#include <memory>
+#include <stdexcept>
+#include <unordered_map>
+#include <unordered_set>
+#include <utility>
+#include <vector>
+
 namespace libsemigroups {
 
+  // Runs the Knuth-Bendix completion procedure on rws, and stops it if it has
+  // not finished after the given number of seconds.
+  void knuth_bendix_with_timeout(RWS* rws, double seconds);
+
+  // Computes the products (and optionally the hash values) required by the
+  // enumeration of a semigroup of Python objects in batches.
+  //
+  // The right operands of the products computed during the enumeration are
+  // the generators, which are registered with add_generator, and the left
+  // operands are the elements stored by the semigroup, which are registered
+  // (by PythonElement::really_copy) when they are found, and which are
+  // multiplied by every generator in the order in which they are registered.
+  // The copies of elements returned to Python do not belong to the batch (see
+  // PythonElement::unbatched_copy), and so are never registered.
+  // When the product of a registered element x by a generator y is not yet
+  // known, the products by y of x and of the elements registered after x are
+  // computed by a single call to multiply_many, and their hash values by a
+  // single call to hash_many (if any). The products of y by elements
+  // registered before x are not required any more, and are released.
+  //
+  // Every PyObject* stored in a PythonBatch is a reference owned by it.
+  class PythonBatch {
+   public:
+    PythonBatch(PyObject* multiply_many, PyObject* hash_many);
+    ~PythonBatch();
+
+    void add_generator(PyObject* y);
+    void register_value(PyObject* x);
+
+    // Returns a new reference to the product of x and y, or NULL if it is
+    // not possible to compute it in a batch. If multiply_many or hash_many
+    // raises an error other than a TypeError or ValueError, then the error is
+    // left set and a std::runtime_error is thrown.
+    PyObject* product(PyObject* x, PyObject* y);
+
+    // Returns true and sets hv to the hash value of x if it was computed
+    // with the product x in a batch, and false otherwise.
+    bool hash(PyObject* x, size_t& hv);
+
+   private:
+    // The products by a generator of the registered elements with indices in
+    // _values from first, which have been computed but not yet requested.
+    struct Pending {
+      size_t                first;
+      std::deque<PyObject*> products;
+    };
+
+    // Computes the products by y of the elements with indices from first
+    bool multiply_batch(PyObject* y, Pending& pending, size_t first);
+    // Releases the products in pending with indices less than first
+    void release_front(Pending& pending, size_t first);
+
+    PyObject*                                 _multiply_many;
+    PyObject*                                 _hash_many;
+    std::vector<PyObject*>                    _values;
+    std::unordered_map<PyObject*, size_t>     _registered;
+    std::unordered_map<PyObject*, Pending>    _pending;
+    std::unordered_map<PyObject*, size_t>     _hashes;
+  };
+
+  // The finitely presented semigroup defined by a congruence on a free
+  // semigroup, represented by the right Cayley graph of the classes of the
+  // congruence, and the short-lex least word in every class.
+  //
+  // The congruence must have finitely many classes, and is only used by the
+  // constructor. The classes are indexed as by
+  // Congruence::word_to_class_index. The least words are stored as a prefix
+  // tree: the least word in a class is the least word in the class _parent
+  // followed by the letter _last.
+  class FpQuotient {
+   public:
+    // The class of the empty word, which is not a class of the congruence
+    static const size_t NO_CLASS = static_cast<size_t>(-1);
+
+    FpQuotient(Congruence* cong, size_t nrgens);
+
+    size_t nr_classes() const {
+      return _parent.size();
+    }
+
+    size_t nrgens() const {
+      return _nrgens;
+    }
+
+    // Returns the class of the a-th generator
+    size_t generator(size_t a) const {
+      return _gens[a];
+    }
+
+    // Returns the class of the product of the class c by the a-th generator
+    size_t right(size_t c, size_t a) const {
+      return _table[c * _nrgens + a];
+    }
+
+    // Returns the class of the product of the classes x and y
+    size_t product(size_t x, size_t y) const {
+      if (_parent[y] == NO_CLASS) {
+        return right(x, _last[y]);
+      }
+      word_t w = word(y);
+      for (size_t a : w) {
+        x = right(x, a);
+      }
+      return x;
+    }
+
+    // Returns the class of the product of the classes x and y, either of
+    // which may be NO_CLASS
+    size_t multiply(size_t x, size_t y) const {
+      if (x == NO_CLASS) {
+        return y;
+      } else if (y == NO_CLASS) {
+        return x;
+      }
+      return product(x, y);
+    }
+
+    // Returns the class of the n-th power of the class x, computed by
+    // repeated squaring
+    size_t power(size_t x, size_t n) const {
+      size_t out = NO_CLASS;
+      while (n > 0) {
+        if (n & 1) {
+          out = multiply(out, x);
+        }
+        n >>= 1;
+        if (n > 0) {
+          x = multiply(x, x);
+        }
+      }
+      return out;
+    }
+
+    word_t word(size_t c) const {
+      word_t w(_length[c]);
+      for (size_t i = _length[c]; i > 0; --i) {
+        w[i - 1] = _last[c];
+        c        = _parent[c];
+      }
+      return w;
+    }
+
+    size_t max_word_length() const {
+      return _max_word_length;
+    }
+
+   private:
+    size_t              _nrgens;
+    std::vector<size_t> _gens;
+    std::vector<size_t> _table;
+    std::vector<size_t> _parent;
+    std::vector<size_t> _last;
+    std::vector<size_t> _length;
+    size_t              _max_word_length;
+  };
+
+  // A libsemigroups element representing an element of the finitely
+  // presented semigroup _quotient by the index of its class.
+  //
+  // The identity of an FpElement has class FpQuotient::NO_CLASS, and is only
+  // used by libsemigroups as an identity for the products of elements, it
+  // does not belong to the semigroup.
+  class FpElement : public Element {
+   public:
+    FpElement(size_t index, std::shared_ptr<FpQuotient> quotient)
+        : Element(), _index(index), _quotient(quotient) {}
+
+    size_t class_index() const {
+      return _index;
+    }
+
+    word_t representative() const {
+      return (_index == FpQuotient::NO_CLASS ? word_t()
+                                             : _quotient->word(_index));
+    }
+
+    bool operator==(Element const& that) const override {
+      FpElement const& other = static_cast<FpElement const&>(that);
+      return _index == other._index && _quotient == other._quotient;
+    }
+
+    bool operator<(Element const& that) const override {
+      return _index < static_cast<FpElement const&>(that)._index;
+    }
+
+    // The number of steps in the right Cayley graph required to compute a
+    // product with this on the right
+    size_t complexity() const override {
+      return std::max(_quotient->max_word_length(), static_cast<size_t>(1));
+    }
+
+    size_t degree() const override {
+      return 0;
+    }
+
+    void cache_hash_value() const override {
+      this->_hash_value = _index;
+    }
+
+    Element* identity() const override {
+      return new FpElement(FpQuotient::NO_CLASS, _quotient);
+    }
+
+    Element* really_copy(size_t increase_deg_by = 0) const override {
+      return new FpElement(_index, _quotient);
+    }
+
+    void copy(Element const* x) override {
+      FpElement const* y = static_cast<FpElement const*>(x);
+      _index             = y->_index;
+      _quotient          = y->_quotient;
+      reset_hash_value();
+    }
+
+    void really_delete() override {
+      _quotient.reset();
+    }
+
+    void redefine(Element const* x, Element const* y) override {
+      FpElement const* xx = static_cast<FpElement const*>(x);
+      FpElement const* yy = static_cast<FpElement const*>(y);
+      // The elements of a semigroup to which a relation has been added
+      // belong to a new quotient, see FpSemigroupNC.add_relation
+      if (xx->_quotient != _quotient || yy->_quotient != _quotient) {
+        throw std::invalid_argument(
+            "FpElement: the elements do not belong to the same quotient");
+      }
+      size_t i = xx->_index;
+      size_t j = yy->_index;
+      if (i == FpQuotient::NO_CLASS) {
+        _index = j;
+      } else if (j == FpQuotient::NO_CLASS) {
+        _index = i;
+      } else {
+        _index = _quotient->product(i, j);
+      }
+      reset_hash_value();
+    }
+
+   private:
+    size_t                      _index;
+    std::shared_ptr<FpQuotient> _quotient;
+  };
+
+  // Returns a new element equal to the n-th power of x, computed by repeated
+  // squaring in two scratch elements, rather than in a new element for every
+  // product.
+  Element* element_power(Element const* x, size_t n);
+
+  // Sets index and period to the least positive integers such that
+  // x ^ (index + period) = x ^ index, which are found by Brent's cycle
+  // detection algorithm using three scratch elements, rather than by storing
+  // the powers of x. The powers of x must eventually be periodic, as they are
+  // if x belongs to a finite semigroup.
+  void index_period(Element const* x, size_t& index, size_t& period);
+
+  // Replaces the rows of a boolean matrix of degree n, every one of which is
+  // stored in rows.size() / n consecutive 64-bit words, by the rows of its
+  // reflexive transitive closure, which are found by Warshall's algorithm.
+  // The entry in column j of a row is bit 63 - j % 64 of its word j / 64.
+  void boolean_closure(std::vector<uint64_t>& rows, size_t n);
+
+  // Returns a new boolean matrix equal to the reflexive transitive closure of
+  // x.
+  BooleanMat* boolean_mat_closure(BooleanMat* x);
+
+  // A boolean matrix of degree at most 64, whose rows are stored as 64-bit
+  // words. The entry in column j of a row is its bit 63 - j, so that the
+  // rows compare in the same order as the rows of a BooleanMat.
+  class PackedBooleanMat : public Element {
+   public:
+    static const size_t MAX_DEGREE = 64;
+
+    explicit PackedBooleanMat(std::vector<uint64_t> const& rows)
+        : Element(), _rows(rows) {}
+
+    bool get(size_t i, size_t j) const {
+      return (_rows[i] >> (63 - j)) & 1;
+    }
+
+    uint64_t row(size_t i) const {
+      return _rows[i];
+    }
+
+    // Returns a new matrix equal to the reflexive transitive closure of this
+    PackedBooleanMat* closure() const {
+      std::vector<uint64_t> rows(_rows);
+      boolean_closure(rows, rows.size());
+      return new PackedBooleanMat(rows);
+    }
+
+    bool operator==(Element const& that) const override {
+      return _rows == static_cast<PackedBooleanMat const&>(that)._rows;
+    }
+
+    bool operator<(Element const& that) const override {
+      return _rows < static_cast<PackedBooleanMat const&>(that)._rows;
+    }
+
+    // The number of rows combined for every row of a product
+    size_t complexity() const override {
+      return _rows.size();
+    }
+
+    size_t degree() const override {
+      return _rows.size();
+    }
+
+    void cache_hash_value() const override {
+      size_t seed = 0;
+      for (uint64_t r : _rows) {
+        seed ^= std::hash<uint64_t>()(r) + 0x9e3779b9 + (seed << 6)
+                + (seed >> 2);
+      }
+      this->_hash_value = seed;
+    }
+
+    Element* identity() const override {
+      std::vector<uint64_t> rows(_rows.size());
+      for (size_t i = 0; i < rows.size(); ++i) {
+        rows[i] = TOP_BIT >> i;
+      }
+      return new PackedBooleanMat(rows);
+    }
+
+    Element* really_copy(size_t increase_deg_by = 0) const override {
+      return new PackedBooleanMat(_rows);
+    }
+
+    void copy(Element const* x) override {
+      _rows = static_cast<PackedBooleanMat const*>(x)->_rows;
+      reset_hash_value();
+    }
+
+    void really_delete() override {}
+
+    // Row i of the product is the union of the rows of y indexed by the
+    // entries of row i of x, which are found one word at a time.
+    void redefine(Element const* x, Element const* y) override {
+      std::vector<uint64_t> const& a
+          = static_cast<PackedBooleanMat const*>(x)->_rows;
+      std::vector<uint64_t> tmp;
+      if (y == this) {
+        tmp = _rows;
+      }
+      std::vector<uint64_t> const& b
+          = (y == this ? tmp : static_cast<PackedBooleanMat const*>(y)->_rows);
+      size_t const n = a.size();
+      _rows.resize(n);
+      for (size_t i = 0; i < n; ++i) {
+        uint64_t r = a[i];
+        uint64_t c = 0;
+        while (r != 0) {
+          c |= b[63 - __builtin_ctzll(r)];
+          r &= r - 1;
+        }
+        _rows[i] = c;
+      }
+      reset_hash_value();
+    }
+
+   private:
+    static const uint64_t TOP_BIT = static_cast<uint64_t>(1) << 63;
+    std::vector<uint64_t> _rows;
+  };
+
+  // A square matrix over one of the semirings of semiring.py, whose entries
+  // are stored row by row in a single buffer of 64-bit integers, as returned
+  // by SemiringABC.to_ints. The semiring is determined by its kind, threshold
+  // and period, rather than by a pointer to a libsemigroups Semiring, and the
+  // products are computed by a loop which is compiled separately for every
+  // kind, so that no virtual function is called for every entry.
+  class SemiringMatrix : public Element {
+   public:
+    // The kinds of semiring, which are also the values of the dict
+    // _semiring_kinds in libsemigroups.pyx
+    enum kind_t {
+      INTEGERS          = 0,
+      MAX_PLUS          = 1,
+      MIN_PLUS          = 2,
+      TROPICAL_MAX_PLUS = 3,
+      TROPICAL_MIN_PLUS = 4,
+      NATURAL           = 5
+    };
+
+    // Throws std::invalid_argument if the number of entries is not a positive
+    // square, or if kind is not one of the above.
+    SemiringMatrix(std::vector<int64_t> const& entries,
+                   int                         kind,
+                   int64_t                     threshold,
+                   int64_t                     period);
+
+    int64_t get(size_t i, size_t j) const {
+      return _entries[i * _degree + j];
+    }
+
+    std::vector<int64_t>::iterator begin() {
+      return _entries.begin();
+    }
+
+    std::vector<int64_t>::iterator end() {
+      return _entries.end();
+    }
+
+    // Returns a new matrix equal to the Kleene closure I + x + x ^ 2 + ... of
+    // this over a max-plus, min-plus or tropical semiring, which is found by
+    // the Floyd-Warshall-Kleene algorithm. Throws std::invalid_argument if
+    // the semiring is not one of these, or if the sum does not converge, i.e.
+    // if this has a cycle of positive weight over the max-plus semiring, or of
+    // negative weight over the min-plus semiring.
+    SemiringMatrix* closure() const;
+
+    bool operator==(Element const& that) const override {
+      return _entries == static_cast<SemiringMatrix const&>(that)._entries;
+    }
+
+    bool operator<(Element const& that) const override {
+      return _entries < static_cast<SemiringMatrix const&>(that)._entries;
+    }
+
+    size_t complexity() const override {
+      return _degree * _degree * _degree;
+    }
+
+    size_t degree() const override {
+      return _degree;
+    }
+
+    void cache_hash_value() const override {
+      size_t seed = 0;
+      for (int64_t x : _entries) {
+        seed ^= std::hash<int64_t>()(x) + 0x9e3779b9 + (seed << 6)
+                + (seed >> 2);
+      }
+      this->_hash_value = seed;
+    }
+
+    Element* identity() const override;
+
+    Element* really_copy(size_t increase_deg_by = 0) const override {
+      return new SemiringMatrix(*this);
+    }
+
+    void copy(Element const* x) override {
+      SemiringMatrix const* y = static_cast<SemiringMatrix const*>(x);
+      _entries                = y->_entries;
+      _degree                 = y->_degree;
+      _kind                   = y->_kind;
+      _threshold              = y->_threshold;
+      _period                 = y->_period;
+      reset_hash_value();
+    }
+
+    void really_delete() override {}
+
+    void redefine(Element const* x, Element const* y) override;
+
+   private:
+    std::vector<int64_t> _entries;
+    size_t               _degree;
+    kind_t               _kind;
+    int64_t              _threshold;
+    int64_t              _period;
+  };
+
   /*
   class PythonElement: public Element {
    public:
@@ -10,12 +488,43 @@ namespace libsemigroups {
   };
   */
 
+  // A libsemigroups element wrapping a Python object.
+  //
+  // Every PythonElement owns a reference to its value _value, which is
+  // released by really_delete. Every reference returned by the Python C-API
+  // functions called below is either stored in _value or released. If a call
+  // to the Python C-API fails, then a std::runtime_error is thrown, and the
+  // Python error is left set, so that it is re-raised, rather than the
+  // std::runtime_error, when the C++ exception reaches the Cython layer.
   class PythonElement : public Element {
    private:
     PyObject* _value;  // TODO: make it private and provide a getter?
+    std::shared_ptr<PythonBatch> _batch;
+    // The cost hint for the product of this by another element, which is
+    // found once, when a generator is constructed, and inherited by the
+    // products, so that no Python code is called to find it.
+    size_t _complexity;
+
+    static void throw_python_error(char const* what) {
+      throw std::runtime_error(what);
+    }
 
    public:
-    explicit PythonElement(PyObject* value) : Element(), _value(value) {
+    explicit PythonElement(PyObject* value)
+        : Element(),
+          _value(value),
+          _batch(nullptr),
+          _complexity(1) {
+      Py_INCREF(value);
+    }
+
+    PythonElement(PyObject*                    value,
+                  std::shared_ptr<PythonBatch> batch,
+                  size_t                       complexity)
+        : Element(),
+          _value(value),
+          _batch(batch),
+          _complexity(complexity) {
       Py_INCREF(value);
     }
 
@@ -24,17 +533,28 @@ namespace libsemigroups {
     }
 
     bool operator==(Element const& that) const override {
-      return PyObject_RichCompareBool(
-          static_cast<PythonElement const&>(that)._value, this->_value, Py_EQ);
+      PyObject* other = static_cast<PythonElement const&>(that)._value;
+      if (other == _value) {
+        return true;
+      }
+      int result = PyObject_RichCompareBool(_value, other, Py_EQ);
+      if (result == -1) {
+        throw_python_error("PythonElement: comparison failed");
+      }
+      return result;
     }
 
     bool operator<(Element const& that) const override {
-      return PyObject_RichCompareBool(
-          static_cast<PythonElement const&>(that)._value, this->_value, Py_LT);
+      int result = PyObject_RichCompareBool(
+          _value, static_cast<PythonElement const&>(that)._value, Py_LT);
+      if (result == -1) {
+        throw_python_error("PythonElement: comparison failed");
+      }
+      return result;
     }
 
     size_t complexity() const override {
-      return 1;  // TODO
+      return _complexity;
     }
 
     size_t degree() const override {
@@ -42,41 +562,78 @@ namespace libsemigroups {
     }
 
     void cache_hash_value() const override {
-      this->_hash_value = PyObject_Hash(_value);
+      size_t hv;
+      if (_batch != nullptr && _batch->hash(_value, hv)) {
+        this->_hash_value = hv;
+      } else {
+        auto py_hv = PyObject_Hash(_value);
+        if (py_hv == -1 && PyErr_Occurred()) {
+          throw_python_error("PythonElement: the value is not hashable");
+        }
+        this->_hash_value = static_cast<size_t>(py_hv);
+      }
     }
 
     Element* identity() const override {
-      return new PythonElement(Py_None);
+      // The constructor acquires a reference to Py_None
+      return new PythonElement(Py_None, _batch, _complexity);
     }
 
     Element* really_copy(size_t increase_deg_by = 0) const override {
-      return new PythonElement(_value);
+      if (_batch != nullptr) {
+        _batch->register_value(_value);
+      }
+      return new PythonElement(_value, _batch, _complexity);
+    }
+
+    // Returns a copy of this which does not belong to the batch of this, so
+    // that its value is not registered, and the products of it are not
+    // computed in batches.
+    Element* unbatched_copy() const {
+      return new PythonElement(_value, nullptr, _complexity);
     }
 
     void copy(Element const* x) override {
-      _value = static_cast<PythonElement const*>(x)->_value;
+      PyObject* value = static_cast<PythonElement const*>(x)->_value;
+      Py_INCREF(value);
+      Py_DECREF(_value);
+      _value = value;
+      _batch      = static_cast<PythonElement const*>(x)->_batch;
+      _complexity = static_cast<PythonElement const*>(x)->_complexity;
       this->reset_hash_value();
     }
 
     void really_delete() override {
-      Py_DECREF(_value);
+      Py_CLEAR(_value);
       return;
     }
 
     void redefine(Element const* x, Element const* y) override {
-      PyObject* product;
+      PyObject* product;  // a new reference
       if (static_cast<const PythonElement*>(x)->_value == Py_None) {
         product = static_cast<const PythonElement*>(y)->_value;
+        Py_INCREF(product);
       } else if (static_cast<const PythonElement*>(y)->_value == Py_None) {
         product = static_cast<const PythonElement*>(x)->_value;
+        Py_INCREF(product);
       } else {
-        product
-          = PyNumber_Multiply(static_cast<const PythonElement*>(x)->_value,
-                              static_cast<const PythonElement*>(y)->_value);
+        product = nullptr;
+        if (_batch != nullptr) {
+          product
+              = _batch->product(static_cast<const PythonElement*>(x)->_value,
+                                static_cast<const PythonElement*>(y)->_value);
+        }
+        if (product == nullptr) {
+          product
+            = PyNumber_Multiply(static_cast<const PythonElement*>(x)->_value,
+                                static_cast<const PythonElement*>(y)->_value);
+          if (product == nullptr) {
+            throw_python_error("PythonElement: multiplication failed");
+          }
+        }
       }
-      Py_DECREF(_value);
+      Py_XDECREF(_value);
       _value = product;
-      Py_INCREF(_value);
       reset_hash_value();
     }
   };
@@ -1,9 +1,9 @@
 '''
 This module contains the classes FpSemigroup and FpMonoid.
 '''
-# pylint: disable = no-member, len-as-condition, invalid-name
+# pylint: disable = no-member, protected-access, len-as-condition, invalid-name
 import libsemigroups
-from semigroups.semigrp import Semigroup
+from semigroups.semigrp import Semigroup, _cayley_graph
 
 class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
     '''
@@ -11,38 +11,62 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
     a finite number of generators by a finitely generated congruence.
 
     Args:
-        alphabet (string): the generators of the finitely presented semigroup,
-            must be a string of distinct characters.
-
-        rels (list): the relations containing pairs of string which are
-            equivalent in the finitely presented semigroup
+        alphabet (string or int): the generators of the finitely presented
+            semigroup, must be a string of distinct characters, or the number
+            of generators, in which case the generators are ``0``, ``1``,
+            ...
+
+        rels (list): the relations containing pairs of words which are
+            equivalent in the finitely presented semigroup. A word is a
+            string over the alphabet, or a list of the indices of its letters
+            in the alphabet; if the alphabet is an int, then every word must
+            be a list.
+
+        strategy (string): the method used to compute the congruence defined
+            by the relations, one of ``'race'`` (the default), which runs
+            all of the following methods in parallel and uses the first to
+            finish, ``'todd_coxeter'``, ``'todd_coxeter_prefill'``,
+            ``'knuth_bendix'``, or ``'p'``.
 
     Raises:
-        TypeError: if the first argument is not a string or the second
-                   argument is not a list of pairs of strings.
+        TypeError: if the first argument is not a string or an int, the second
+                   argument is not a list of pairs of words, or the third
+                   argument is not a string.
 
-        ValueError: if the first arugment contains duplicates or the relations
-                    in the second argument reference a character not in the
-                    alphabet.
+        ValueError: if the first arugment contains duplicates or is negative,
+                    the relations in the second argument reference a letter
+                    not in the alphabet, or the third argument is not a
+                    strategy.
 
     Examples:
         >>> FpSemigroup('ab',
         ...             [['aa', 'a'], ['bbb', 'ab'], ['ab', 'ba']])
         <fp semigroup with 2 generators and 3 relations>
-
-    TODO:
-         edit normal_form method
+        >>> FpSemigroup(2, [[[0, 0], [0]], [[1, 1, 1], [0, 1]],
+        ...                 [[0, 1], [1, 0]]])
+        <fp semigroup with 2 generators and 3 relations>
     '''
-    def __init__(self, alphabet, rels):
+    def __init__(self, alphabet, rels, strategy='race'):
         # Check the alphabet
-        if not isinstance(alphabet, str):
-            raise TypeError('the first argument (alphabet) must be a string')
-        elif not all(alphabet.count(i) == 1 for i in alphabet):
-            raise ValueError('the first argument (alphabet) must be a '
-                             'duplicate-free string')
+        if isinstance(alphabet, int) and not isinstance(alphabet, bool):
+            if alphabet < 0:
+                raise ValueError('the first argument (alphabet) must be a '
+                                 'non-negative int')
+            self._letter_index = {}
+            self._alphabet_size = alphabet
+        elif not isinstance(alphabet, str):
+            raise TypeError('the first argument (alphabet) must be a string '
+                            'or an int')
+        else:
+            self._letter_index = {letter: i
+                                  for i, letter in enumerate(alphabet)}
+            if len(self._letter_index) != len(alphabet):
+                raise ValueError('the first argument (alphabet) must be a '
+                                 'duplicate-free string')
+            self._alphabet_size = len(alphabet)
 
         # Corner case
-        if len(alphabet) == 0 and not len(rels) == 0:
+        if self._alphabet_size == 0 and not len(rels) == 0:
             raise ValueError('the empty semigroup must not have'
                              + ' any relations')
         # Check the relations
@@ -50,56 +74,117 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
                 and all(isinstance(rel, list) for rel in rels)):
             raise TypeError('the second argument (relations) must be a ' +
                             'list of lists')
-        elif not all(len(rel) == 2 and isinstance(rel[0], str)
-                     and isinstance(rel[1], str) for rel in rels):
+        elif not all(len(rel) == 2 and isinstance(rel[0], (str, list))
+                     and isinstance(rel[1], (str, list)) for rel in rels):
             raise TypeError('the second argument (relations) must be a ' +
-                            'list of pairs of strings')
+                            'list of pairs of words')
 
-        self._pure_letter_alphabet = True
-        for i in alphabet:
-            if not i in ('abcdefghijklmnopqrstuvwxyz1' +
-                         'ABCDEFGHIJKLMNOPQRSTUVWXYZ'):
-                self._pure_letter_alphabet = False
-                break
+        _check_strategy(strategy)
 
-        for i, rel in enumerate(rels):
-            for j, word in enumerate(rel):
-                rels[i][j] = self._parse_word(word)
+        # brackets and powers are only parsed if they cannot be letters
+        self._pure_letter_alphabet = (isinstance(alphabet, str) and
+                                      all(letter.isalpha() or letter == '1'
+                                          for letter in alphabet))
 
         self.alphabet = alphabet
-        self.relations = rels
+        self.relations = [list(rel) for rel in rels]
+        # the relations are passed to FpSemigroupNC without expanding their
+        # powers, see _compress_word
+        self._compressed_relations = [[self._compress_word(word)
+                                       for word in rel] for rel in rels]
 
-        for rel in rels:
-            for word in rel:
-                self.check_word(word)
+        # the results of is_obviously_infinite and FpSemigroupNC.size are
+        # memoised, see _nr_classes
+        self._obviously_infinite = None
+        self._size = None
 
-        libsemigroups.FpSemigroupNC.__init__(self, len(alphabet), rels)
-        if not self.is_obviously_infinite():
-            Semigroup.__init__(self, *[_FPSOME(self, i) for i in self.alphabet])
+        self.strategy = strategy
+
+        libsemigroups.FpSemigroupNC.__init__(self, self._alphabet_size,
+                                             self._compressed_relations,
+                                             strategy)
+
+    def _init_semigroup(self):
+        '''
+        Constructs the semigroup generated by the elements represented by the
+        letters. This is called by FpSemigroupNC the first time that the
+        semigroup is required, rather than by __init__, since it requires the
+        congruence defining the semigroup.
+        '''
+        if self.is_obviously_infinite():
+            raise ValueError('given semigroup is infinite')
+        Semigroup.__init__(self, *[_FPSOME(self, [i])
+                                   for i in range(self._alphabet_size)])
 
     def _parse_word(self, word):
         '''
         Removes ^ and () from a given word.
         '''
         if self._pure_letter_alphabet:
-            return _remove_powers(_remove_brackets(word))
+            return _expand(_parse(word))
         return word
 
+    def _compress_word(self, word):
+        '''
+        Returns a representation of a given word, which is accepted by the
+        methods of FpSemigroupNC, after checking its letters.
+
+        If the alphabet consists of letters, then this is the list returned by
+        _parse, and the powers in the word are never expanded by Python. A
+        list of letter indices is returned as a new list.
+        '''
+        if isinstance(word, list):
+            self.check_word(word)
+            pairs = list(word)
+        elif self._pure_letter_alphabet:
+            pairs = _parse(word)
+            self.check_word(''.join(_letters(pairs)))
+        else:
+            self.check_word(word)
+            pairs = word
+        if len(pairs) == 0 and isinstance(self, FpMonoid):
+            # the identity is the last letter, see FpMonoid
+            return [self._alphabet_size - 1]
+        return pairs
+
+    def _letter_indices(self, word):
+        '''
+        Returns the indices of the letters in a word returned by
+        _compress_word.
+        '''
+        if libsemigroups._is_parsed(word):
+            word = _letters(word)
+        elif isinstance(word, list):
+            return word
+        return [self._letter_index[letter] for letter in word]
+
     def check_word(self, word):
         '''
-        Check if word is a valid word over the alphabet of this.
+        Check if word is a valid word over the alphabet of this, i.e. a
+        string over the alphabet, or a list of indices of letters.
         '''
+        if isinstance(word, list):
+            for letter in word:
+                if not isinstance(letter, int) or isinstance(letter, bool):
+                    raise TypeError('the letters of a list must be ints')
+                elif not 0 <= letter < self._alphabet_size:
+                    raise ValueError('the letter %d does not belong to the '
+                                     % letter + 'alphabet')
+            return
         if not isinstance(word, str):
-            raise TypeError('the argument must be a string')
+            raise TypeError('the argument must be a string or a list')
+        elif isinstance(self.alphabet, int):
+            raise TypeError('the argument must be a list, since the '
+                            + 'alphabet is an int')
         for letter in word:
-            if letter not in self.alphabet:
+            if letter not in self._letter_index:
                 raise ValueError('the letter %s' % letter
                                  + ' does not belong to the alphabet \'%s\''
                                  % self.alphabet)
 
     def __repr__(self):
         return ('<fp semigroup with %d generators and %d relations>'
-                % (len(self.alphabet), len(self.relations)))
+                % (self._alphabet_size, len(self.relations)))
 
     def factorisation(self, word):
         '''
@@ -121,17 +206,18 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
         '''
         if self.is_obviously_infinite():
             raise ValueError('given semigroup is infinite')
-        word = self._parse_word(word)
-        self.check_word(word)
-        Pyword = libsemigroups.PythonElementNC(_FPSOME(self, word))
-        return Semigroup.factorisation(self, Pyword)
+        return Semigroup.factorisation(self, _FPSOME(self, word))
 
     def normal_form(self, word):
-        #TODO change the way this works to not use factorisation.
         '''
         Converts a given word to a simple form which it is equivalent to in
         in semigroup.
 
+        The normal form of a word is the least equivalent word in the
+        short-lex order. If the semigroup is finite, then it is found from the
+        congruence defining the semigroup, and otherwise by rewriting the word
+        using the confluent rewriting system obtained by :meth:`knuth_bendix`.
+
         Args:
             word (str): word to be converted.
 
@@ -147,16 +233,141 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
             >>> S.normal_form('(a^1000)bb')
             'abb'
         '''
-        Factors = self.factorisation(word)
-        return ''.join(self.alphabet[i] for i in Factors)
+        if not self.is_obviously_infinite() and self.is_finite():
+            # the least word is known without expanding the given word
+            return _FPSOME(self, word).word
+        if not self.is_confluent():
+            self.knuth_bendix()
+        return self.rewrite(word)
+
+    def knuth_bendix(self, max_rules=None, max_overlap=None, timeout=None):
+        '''Runs the Knuth-Bendix completion procedure on the rewriting system
+        defined by the relations of a finitely presented semigroup.
+
+        The procedure stops when the rewriting system is confluent, or when
+        one of the given limits is reached, whichever happens first. It can be
+        run again later, with different limits, to continue the completion.
+
+        Args:
+            max_rules (int): the number of rules after which to stop, or
+                ``None`` (the default) for no limit.
+            max_overlap (int): the maximum length of overlaps of left hand
+                sides of rules to be considered, or ``None`` (the default) for
+                no limit.
+            timeout (float): the number of seconds after which to stop, or
+                ``None`` (the default) for no limit.
+
+        Returns:
+            bool: ``True`` if the rewriting system is now confluent,
+            ``False`` otherwise.
+
+        Raises:
+            TypeError: if any of the limits is not ``None`` or a number of the
+                       appropriate type.
+            ValueError: if any of the limits is not positive.
+
+        Examples:
+            >>> S = FpSemigroup('ab', [['aa', 'a'], ['bab', 'ab'],
+            ...                        ['ab', 'ba']])
+            >>> S.is_confluent()
+            False
+            >>> S.knuth_bendix()
+            True
+            >>> sorted(S.rules())
+            [['aa', 'a'], ['abb', 'ab'], ['ba', 'ab']]
+        '''
+        for name, limit in (('max_rules', max_rules),
+                            ('max_overlap', max_overlap)):
+            if limit is None:
+                continue
+            if not isinstance(limit, int):
+                raise TypeError('the argument (%s) must be an int or None'
+                                % name)
+            if limit <= 0:
+                raise ValueError('the argument (%s) must be positive' % name)
+        if timeout is not None:
+            if not isinstance(timeout, (int, float)):
+                raise TypeError('the argument (timeout) must be a number or '
+                                + 'None')
+            if timeout <= 0:
+                raise ValueError('the argument (timeout) must be positive')
+        return libsemigroups.FpSemigroupNC.knuth_bendix(self, max_rules,
+                                                        max_overlap, timeout)
+
+    def rewrite(self, word):
+        '''Rewrites a word using the current rules of the rewriting system
+        defined by the relations of a finitely presented semigroup.
+
+        If the rewriting system is confluent, see :meth:`knuth_bendix`, then
+        the rewritten word is the normal form of the given word.
+
+        Args:
+            word (str): word to be rewritten.
+
+        Returns:
+            str: the rewritten word.
+
+        Raises:
+            TypeError: if the argument is not a string.
+            ValueError: if the argument contains a character not in the
+                        alphabet of the FpSemigroup.
+
+        Examples:
+            >>> S = FpSemigroup('ab', [['aa', 'a'], ['bbb', 'ab'],
+            ...                        ['ab', 'ba']])
+            >>> S.rewrite('ba^10')
+            'ab'
+        '''
+        return self.rewrite_many([word])[0]
+
+    def rewrite_many(self, words):
+        '''Rewrites a list of words using the current rules of the rewriting
+        system defined by the relations of a finitely presented semigroup.
+
+        This is equivalent to, but faster than, calling :meth:`rewrite` for
+        every word.
+
+        Args:
+            words (list): strings to be rewritten.
+
+        Returns:
+            list: the rewritten words.
+
+        Raises:
+            TypeError: if the argument is not a list of strings.
+            ValueError: if any word contains a character not in the alphabet
+                        of the FpSemigroup.
+
+        Examples:
+            >>> S = FpSemigroup('ab', [['aa', 'a'], ['bbb', 'ab'],
+            ...                        ['ab', 'ba']])
+            >>> S.rewrite_many(['aaa', 'bab'])
+            ['a', 'ab']
+        '''
+        if not (isinstance(words, list)
+                and all(isinstance(word, (str, list)) for word in words)):
+            raise TypeError('the argument must be a list of words')
+        words = [self._compress_word(word) for word in words]
+        return libsemigroups.FpSemigroupNC.rewrite_many(self, words)
 
-    def size(self):
+    def size(self, strategy=None):
         '''
         Computes the number of elements of the finitely presented semigroup.
 
+        Args:
+            strategy (string): the method used to compute the size, see
+                :class:`FpSemigroup`, or ``None`` (the default) to use the
+                strategy given when the semigroup was constructed. Any other
+                strategy is run from scratch every time, which is useful for
+                finding the fastest strategy for a presentation.
+
         Returns:
             int: the size of the finitely presented semigroup.
 
+        Raises:
+            TypeError: if the argument is not a string or ``None``.
+            ValueError: if the argument is not a strategy.
+
         Examples:
             >>> FpSemigroup('ab',
             ...             [['aa', 'a'], ['bbb', 'ab'], ['ab', 'ba']]).size()
@@ -167,24 +378,47 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
             >>> FpMonoid('ab',
             ...          [['aa', 'a'], ['bbb', 'ab'], ['ab', 'ba']]).size()
             6
+            >>> FpSemigroup('ab', [['aa', 'a'], ['bbb', 'ab'], ['ab', 'ba']],
+            ...             'todd_coxeter').size('knuth_bendix')
+            5
         '''
+        if strategy is not None:
+            _check_strategy(strategy)
+            if strategy != self.strategy:
+                if self.is_obviously_infinite():
+                    return float('inf')
+                return libsemigroups.FpSemigroupNC.size(self, strategy)
         if not self.is_finite():
             return float('inf')
-        return libsemigroups.FpSemigroupNC.size(self)
+        return self._nr_classes()
+
+    def _nr_classes(self):
+        '''
+        Returns the number of classes of the congruence defining this, which is
+        only computed the first time this method is called.
+        '''
+        if self._size is None:
+            self._size = libsemigroups.FpSemigroupNC.size(self)
+        return self._size
 
     def __contains__(self, word):
-        if isinstance(word, libsemigroups.PythonElementNC):
-            if isinstance(word.get_value(), _FPSOME):
-                return word.get_value().FpS == self
-        if not isinstance(word, str):
+        if isinstance(word, _FPSOME):
+            return word.FpS is self
+        if isinstance(word, list):
+            try:
+                self.check_word(word)
+            except (TypeError, ValueError):
+                return False
+            return len(word) > 0 or isinstance(self, FpMonoid)
+        if not isinstance(word, str) or isinstance(self.alphabet, int):
             return False
-        word = self._parse_word(word)
-        if word == '':
+        if self._pure_letter_alphabet:
+            letters = _letters(_parse(word))
+        else:
+            letters = word
+        if len(letters) == 0:
             return isinstance(self, FpMonoid)
-        for letter in word:
-            if letter not in self.alphabet:
-                return False
-        return True
+        return all(letter in self._letter_index for letter in letters)
 
     def equal(self, word1, word2):
         '''
@@ -227,23 +461,21 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
             >>> FpSemigroup('ab', []).is_obviously_infinite()
             True
         '''
+        if self._obviously_infinite is None:
+            self._obviously_infinite = self._check_obviously_infinite()
+        return self._obviously_infinite
+
+    def _check_obviously_infinite(self):
         # Check if number of generators exceeds number of relations
-        if len(self.relations) < len(self.alphabet):
+        if len(self.relations) < self._alphabet_size:
             return True
 
         # Check if any generator belongs to no relation
-        for letter in self.alphabet:
-            stop = False
-            for rel in self.relations:
-                for word in rel:
-                    if letter in word:
-                        stop = True
-                        break
-                if stop:
-                    break
-            if not stop:
-                return True
-        return False
+        used = set()
+        for rel in self._compressed_relations:
+            for word in rel:
+                used.update(self._letter_indices(word))
+        return len(used) < self._alphabet_size
 
     def enumerate(self, limit):
         if not self.is_finite():
@@ -255,6 +487,81 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
             raise ValueError('given semigroup is infinite')
         return Semigroup.nridempotents(self)
 
+    def right_cayley_graph(self):
+        '''Returns the right Cayley graph of a finite finitely presented
+        semigroup.
+
+        The graph is found directly from the congruence defining the
+        semigroup, rather than by enumerating its elements, and its nodes are
+        the class indices of the elements, see :meth:`word_to_class_index`,
+        as are those of :meth:`left_cayley_graph`. The class indices are not
+        in general the positions of the elements, see
+        :meth:`current_position`.
+
+        Returns:
+            semigroups.cayley_graph.CayleyGraph: The right Cayley graph.
+
+        Raises:
+            ValueError: if the semigroup is infinite.
+
+        Examples:
+            >>> S = FpSemigroup('ab', [['aa', 'a'], ['bbb', 'b'],
+            ...                        ['ab', 'ba']])
+            >>> S.right_cayley_graph().nodes()
+            [0, 1, 2, 3, 4]
+        '''
+        if not self.is_finite():
+            raise ValueError('given semigroup is infinite')
+        return _cayley_graph(
+            libsemigroups.FpSemigroupNC.right_cayley_graph(self))
+
+    def left_cayley_graph(self):
+        '''Returns the left Cayley graph of a finite finitely presented
+        semigroup.
+
+        The graph is found directly from the congruence defining the
+        semigroup, and its nodes are the class indices of the elements, see
+        :meth:`right_cayley_graph`.
+
+        Returns:
+            semigroups.cayley_graph.CayleyGraph: The left Cayley graph.
+
+        Raises:
+            ValueError: if the semigroup is infinite.
+
+        Examples:
+            >>> S = FpSemigroup('a', [['aaa', 'a']])
+            >>> S.left_cayley_graph().edges()
+            [(0, 1), (1, 0)]
+        '''
+        if not self.is_finite():
+            raise ValueError('given semigroup is infinite')
+        return _cayley_graph(
+            libsemigroups.FpSemigroupNC.left_cayley_graph(self))
+
+    def multiplication_table(self):
+        '''Returns the multiplication table of a finite finitely presented
+        semigroup.
+
+        The entry in row ``i`` and column ``j`` of the table is the class
+        index of the product of the elements with class indices ``i`` and
+        ``j``, see :meth:`word_to_class_index`.
+
+        Returns:
+            list: the rows of the multiplication table.
+
+        Raises:
+            ValueError: if the semigroup is infinite.
+
+        Examples:
+            >>> S = FpSemigroup('a', [['aaa', 'a']])
+            >>> S.multiplication_table()
+            [[1, 0], [0, 1]]
+        '''
+        if not self.is_finite():
+            raise ValueError('given semigroup is infinite')
+        return libsemigroups.FpSemigroupNC.multiplication_table(self)
+
     def is_finite(self):
         '''Attempts to check if a finitely presented semigroup is finite.
 
@@ -271,7 +578,54 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
         '''
         if self.is_obviously_infinite():
             return False
-        return isinstance(libsemigroups.FpSemigroupNC.size(self), int)
+        return isinstance(self._nr_classes(), int)
+
+    def add_relation(self, lhs, rhs):
+        '''Adds a relation to the presentation of a finitely presented
+        semigroup.
+
+        If the semigroup is finite, then the congruence defining the semigroup
+        with the new relation is computed from its current elements, by a
+        coset enumeration whose table is prefilled with the current one,
+        rather than from scratch. The relation is also added to the rules of
+        the rewriting system, and so :meth:`knuth_bendix` continues from the
+        current rules.
+
+        Elements of the semigroup found before the relation was added cannot
+        be multiplied by elements found afterwards.
+
+        Args:
+            lhs (str): the left hand side of the relation.
+            rhs (str): the right hand side of the relation.
+
+        Raises:
+            TypeError: if either argument is not a word.
+            ValueError: if either argument contains a letter not in the
+                        alphabet, or is the empty word.
+
+        Examples:
+            >>> S = FpSemigroup('ab', [['aa', 'a'], ['bbb', 'b'],
+            ...                        ['ab', 'ba']])
+            >>> S.size()
+            5
+            >>> S.add_relation('bb', 'b')
+            >>> S.size()
+            3
+        '''
+        rel = []
+        for word in (lhs, rhs):
+            if not isinstance(word, (str, list)):
+                raise TypeError('the arguments must be strings or lists')
+            word = self._compress_word(word)
+            if len(word) == 0:
+                raise ValueError('the empty word does not represent an '
+                                 + 'element of an FpSemigroup')
+            rel.append(word)
+        libsemigroups.FpSemigroupNC.add_relation(self, *rel)
+        self.relations.append([lhs, rhs])
+        self._compressed_relations.append(rel)
+        self._obviously_infinite = None
+        self._size = None
 
     def word_to_class_index(self, word):
         '''Returns the class index of a given word.
@@ -300,11 +654,85 @@ class FpSemigroup(libsemigroups.FpSemigroupNC, Semigroup):
         '''
         if not self.is_finite():
             raise ValueError('given semigroup is infinite')
-        if not isinstance(word, str):
-            raise TypeError('given word is not a string')
-        word = self._parse_word(word)
-        self.check_word(word)
-        return libsemigroups.FpSemigroupNC.word_to_class_index(self, word)
+        if not isinstance(word, (str, list)):
+            raise TypeError('given word is not a string or a list')
+        return self._class_indices([word])[0]
+
+    def word_to_class_index_many(self, words):
+        '''Returns the class indices of a list of words.
+
+        This is equivalent to, but faster than, calling
+        :meth:`word_to_class_index` for every word, since the words are
+        encoded natively and resolved by a single call to the congruence.
+
+        Args:
+            words (list): strings whose class indices are to be returned.
+
+        Returns:
+            list: the class indices of the given words.
+
+        Raises:
+            TypeError: if the argument is not a list of strings.
+            ValueError: if any word contains a character not in the alphabet
+                        of the FpSemigroup.
+
+        Examples:
+            >>> S = FpSemigroup('ab',
+            ...                 [['aa', 'a'], ['bbb', 'ab'], ['ab', 'ba']])
+            >>> S.word_to_class_index_many(['a', 'b', 'aa'])
+            [0, 1, 0]
+        '''
+        if not self.is_finite():
+            raise ValueError('given semigroup is infinite')
+        if not (isinstance(words, list)
+                and all(isinstance(word, (str, list)) for word in words)):
+            raise TypeError('the argument must be a list of words')
+        return self._class_indices(words)
+
+    def _class_indices(self, words):
+        '''
+        Returns the class indices of a list of strings, which are computed
+        without expanding the powers in the strings.
+        '''
+        indices = libsemigroups.FpSemigroupNC.word_to_class_index_many(
+            self, [self._compress_word(word) for word in words])
+        if None in indices:
+            raise ValueError('the empty word does not represent an element '
+                             + 'of an FpSemigroup')
+        return indices
+
+    def equal_many(self, pairs):
+        '''Checks, for each pair in a list of pairs of words, if the words are
+        equivalent in a finitely presented semigroup.
+
+        This is equivalent to, but faster than, calling :meth:`equal` for
+        every pair.
+
+        Args:
+            pairs (list): pairs of strings to be compared.
+
+        Returns:
+            list: ``True`` for every pair of equivalent words, ``False``
+            otherwise.
+
+        Raises:
+            TypeError: if the argument is not a list of pairs of strings.
+            ValueError: if any word contains a character not in the alphabet
+                        of the FpSemigroup.
+
+        Examples:
+            >>> S = FpSemigroup('ab',[['a', 'aa'], ['b', 'bbb'], ['ab', 'ba']])
+            >>> S.equal_many([('b', 'b'), ('b', 'bb'), ('ab', 'ba^1000')])
+            [True, False, True]
+        '''
+        if not (isinstance(pairs, list)
+                and all(isinstance(pair, (list, tuple)) and len(pair) == 2
+                        for pair in pairs)):
+            raise TypeError('the argument must be a list of pairs of strings')
+        indices = self.word_to_class_index_many([word for pair in pairs
+                                                 for word in pair])
+        return [indices[i] == indices[i + 1]
+                for i in range(0, len(indices), 2)]
 
 class FpMonoid(FpSemigroup):
     '''
@@ -313,15 +741,21 @@ class FpMonoid(FpSemigroup):
     on the free monoid.
 
     Args:
-        alphabet (string): the generators of the finitely presented semigroup,
-            must be a string of distinct characters.
+        alphabet (string or int): the generators of the finitely presented
+            monoid, see :class:`FpSemigroup`. The identity is the letter
+            ``'1'`` of a string alphabet, and the letter ``n`` of an alphabet
+            ``n``.
+
+        rels (list): the relations containing pairs of words which are
+            equivalent in the finitely presented monoid, see
+            :class:`FpSemigroup`.
 
-        rels (list): the relations containing pairs of string which are
-            equivalent in the finitely presented semigroup
+        strategy (string): the method used to compute the congruence defined
+            by the relations, see :class:`FpSemigroup`.
 
     Raises:
-        TypeError: if the first argument is not a string or the second
-                   argument is not a list of pairs of strings.
+        TypeError: if the first argument is not a string or an int, or the
+                   second argument is not a list of pairs of words.
 
         ValueError: if the first arugment contains duplicates, if the first
                     argument contains a 1 or if the relations in the second
@@ -333,39 +767,59 @@ class FpMonoid(FpSemigroup):
         <fp monoid with 2 generators and 3 relations>
     '''
 
-    def __init__(self, alphabet, rels):
-        if '1' in alphabet:
-            raise ValueError('the first argument (alphabet) must '
-                             + 'not contain 1')
-        alphabet = alphabet[:]
-        rels = rels[:] + [['11', '1']]
-        for letter in alphabet:
-            rels.append([letter + '1', letter])
-            rels.append(['1' + letter, letter])
-        alphabet += '1'
-        FpSemigroup.__init__(self, alphabet, rels)
-
-    def is_obviously_infinite(self):
+    def __init__(self, alphabet, rels, strategy='race'):
+        # the identity is the last letter of the alphabet
+        if isinstance(alphabet, int) and not isinstance(alphabet, bool):
+            one = [alphabet]
+            letters = [[i] for i in range(alphabet)]
+            alphabet += 1
+        else:
+            if '1' in alphabet:
+                raise ValueError('the first argument (alphabet) must '
+                                 + 'not contain 1')
+            one = '1'
+            letters = list(alphabet)
+            alphabet += '1'
+        rels = rels[:] + [[one + one, one]]
+        for letter in letters:
+            rels.append([letter + one, letter])
+            rels.append([one + letter, letter])
+        FpSemigroup.__init__(self, alphabet, rels, strategy)
+
+    def _check_obviously_infinite(self):
         # Check if number of generators exceeds number of relations
         #(adjusted to ignore identity relations)
-        if len(self.relations) + 2 < len(self.alphabet) * 3:
+        if len(self.relations) + 2 < self._alphabet_size * 3:
             return True
-        FpSemigroup.is_obviously_infinite(self)
+        return FpSemigroup._check_obviously_infinite(self)
 
     def __repr__(self):
-        nrgens = len(self.alphabet) - 1
+        nrgens = self._alphabet_size - 1
         nrrels = len(self.relations) - 2 * nrgens - 1
         return ('<fp monoid with %d generators and %d relations>'
                 % (nrgens, nrrels))
 
-class _FPSOME(libsemigroups.ElementABC):
+def _check_strategy(strategy):
+    if not isinstance(strategy, str):
+        raise TypeError('the argument (strategy) must be a string')
+    elif strategy not in libsemigroups.STRATEGIES:
+        raise ValueError('the argument (strategy) must be one of %s'
+                         % ', '.join(map(repr, libsemigroups.STRATEGIES)))
+
+class _FPSOME(libsemigroups.FpElementNC):
     '''FpSemigroupElement Object
+
+    An element of a finite finitely presented semigroup, represented by the
+    index of its class in the congruence defining the semigroup, see
+    :meth:`FpSemigroup.word_to_class_index`. The class index is only found
+    when the element is first multiplied or compared.
+
     Examples:
         >>> FpS = FpSemigroup('ab',[['aa','a'],['bbb','ab'],['ab','ba']])
         >>> _FPSOME(FpS,'a')
         'a'
         >>> _FPSOME(FpS,'bab')
-        'bab'
+        'ab'
     '''
 
     def __init__(self, FpS, word):
@@ -381,156 +835,128 @@ class _FPSOME(libsemigroups.ElementABC):
             TypeError:  If 1st argument is not an FpSemigroup object or the
                         second argument is not a string or a list.
             ValueError: If the word contains a generator not n the alphabet
-                        of the given semigroup.
+                        of the given semigroup, the word is empty and the
+                        semigroup is not a monoid, or the given semigroup is
+                        obviously infinite.
         '''
-        if not isinstance(word, str):
-            raise TypeError('given word must be a string')
-        self.FpS = FpS
-        self.Repword = word
-
-        if word == '':
-            if isinstance(FpS, FpMonoid):
-                self.word = '1'
-                self.Repword = '1'
-            else:
-                self.word = ''
-        else:
-            self.word = _remove_powers(_remove_brackets(word))
-
-        self.FpS.check_word(self.word)
-
-    def __eq__(self, other):
-        if not (isinstance(other, _FPSOME) and
-                self.FpS is other.FpS):
-            return False
-        return (self.word_to_class_index() ==
-                other.word_to_class_index())
+        if not isinstance(FpS, FpSemigroup):
+            raise TypeError('the first argument must be an FpSemigroup')
+        if not isinstance(word, (str, list)):
+            raise TypeError('given word must be a string or a list')
+        if FpS.is_obviously_infinite():
+            raise ValueError('given semigroup is infinite')
+        word = FpS._compress_word(word)
+        if len(word) == 0:
+            raise ValueError('the empty word does not represent an element '
+                             + 'of an FpSemigroup')
+        libsemigroups.FpElementNC.__init__(self, FpS, word)
+
+    @property
+    def FpS(self):
+        '''
+        The finitely presented semigroup to which this element belongs.
+        '''
+        return self.semigroup()
 
-    def word_to_class_index(self):
-        return self.FpS.word_to_class_index(self.word)
+    @property
+    def word(self):
+        '''
+        The short-lex least word representing this element, which is a list
+        of ints if the alphabet of the semigroup is an int.
+        '''
+        if isinstance(self.FpS.alphabet, int):
+            return self.representative()
+        return ''.join(self.FpS.alphabet[i] for i in self.representative())
 
     def __hash__(self):
-        return self.word_to_class_index()
+        return hash(self.class_index())
 
     def identity(self):
-        return _FPSOME(self.FpS, '')
+        if isinstance(self.FpS, FpMonoid):
+            return _FPSOME(self.FpS, [self.FpS._alphabet_size - 1])
+        return libsemigroups.ElementABC.identity(self)
 
     def __mul__(self, other):
         if not (isinstance(other, _FPSOME) and
                 self.FpS is other.FpS):
             raise TypeError('given words are not members'+
                             ' of the same FpSemigroup')
-
-        return _FPSOME(self.FpS, self.word + other.word)
+        return libsemigroups.ElementABC.__mul__(self, other)
 
     def __repr__(self):
-        return '\'' + self.Repword + '\''
-
-def _remove_brackets(word):
-    # pylint: disable = too-many-branches
-    if word == '':
-        return ''
-
-    #if the number of left brackets is different from the number of right
-    #brackets they can't possibly pair up
-    if not word.count('(') == word.count(')'):
-        raise ValueError('invalid bracket structue')
-
-    #if the ^ is at the end of the string there is no exponent.
-    #if the ^ is at the start of the string there is no base.
-    if word[0] == '^' or word[-1] == '^':
-        raise ValueError('invalid power structure')
-
-    #checks that all ^s have an exponent.
-    for index, element in enumerate(word):
-        if element == '^':
-            if not word[index + 1] in '0123456789':
-                raise ValueError('invalid power structure')
-
-    #i acts as a pointer to positions in the string.
-    newword = ''
-    i = 0
-    while i < len(word):
-        #if there are no brackets the character is left as it is.
-        if word[i] != '(':
-            newword += word[i]
-        else:
-            lbracket = i
-            rbracket = -1
-            #tracks how 'deep' the position of i is in terms of nested
-            #brackets
-            nestcount = 0
-            i += 1
-            while i < len(word):
-                if word[i] == '(':
-                    nestcount += 1
-                elif word[i] == ')':
-                    if nestcount == 0:
-                        rbracket = i
-                        break
-                    else:
-                        nestcount -= 1
-                i += 1
+        word = self.word
+        if isinstance(word, list):
+            return repr(word)
+        return '\'' + word + '\''
 
-            #as i is always positive, if rbracket is -1 that means that
-            #the found left bracket has no corresponding right bracket.
-            #note: if this never occurs then every left bracket has a
-            #corresponding right bracket and as the number of each bracket
-            #is equal every right bracket has a corresponding left bracket
-            #and the bracket structure is valid.
-            if rbracket == -1:
-                raise ValueError('invalid bracket structure')
-
-            #if rbracket is not followed by ^ then the value inside the
-            #bracket is appended (recursion is used to remove any brackets
-            #in this value)
-            if rbracket + 1 == len(word):
-                newword += _remove_brackets(word[lbracket + 1:
-                                                 rbracket])
-            elif word[rbracket + 1] != '^':
-                newword += _remove_brackets(word[lbracket + 1:
-                                                 rbracket])
-            #if rbracket is followed by ^ then the value inside the
-            #bracket is appended the given number of times
-            else:
-                i += 2
-                while i < len(word):
-                    if word[i] in '0123456789':
-                        i += 1
-                    else:
-                        break
-                newword += (_remove_brackets(word[lbracket + 1:
-                                                  rbracket])
-                            * int(word[rbracket + 2:i]))
-                i -= 1
-        i += 1
-
-    return newword
+def _parse(word):
+    '''
+    Parses a word containing brackets and powers, such as ``'(ab^2)^10a'``,
+    in a single pass.
 
-def _remove_powers(word):
-    if word == '':
-        return ''
+    Returns:
+        list: the list of pairs ``(x, n)`` whose product of the ``x ** n`` is
+        the word, where ``x`` is a letter or another such list.
 
-    newword = ''
+    Raises:
+        ValueError: if the brackets or the powers in the word are invalid.
+    '''
+    # stack[-1] is the list of pairs of the innermost bracket being parsed
+    stack = [[]]
     i = 0
     while i < len(word):
-        #if last character reached there is no space for exponentiation.
-        if i == len(word) - 1:
-            newword += word[i]
-            i += 1
-        #if the character is not being powered then it is left as it is.
-        elif word[i + 1] != '^':
-            newword += word[i]
-            i += 1
+        char = word[i]
+        i += 1
+        if char == '(':
+            stack.append([])
+        elif char == ')':
+            if len(stack) == 1:
+                raise ValueError('invalid bracket structure')
+            group = _compress(stack.pop())
+            stack[-1].append((group, 1))
+        elif char == '^':
+            start = i
+            while i < len(word) and word[i] in '0123456789':
+                i += 1
+            if i == start or len(stack[-1]) == 0:
+                raise ValueError('invalid power structure')
+            base, power = stack[-1][-1]
+            stack[-1][-1] = (base, power * int(word[start:i]))
+        else:
+            stack[-1].append((char, 1))
+    if len(stack) != 1:
+        raise ValueError('invalid bracket structure')
+    return _compress(stack[0])
+
+def _compress(pairs):
+    # Merges the adjacent powers of the same letter in a list returned by
+    # _parse, and removes the powers of empty words.
+    out = []
+    for base, power in pairs:
+        if power == 0 or (isinstance(base, list) and len(base) == 0):
+            continue
+        elif out and isinstance(base, str) and out[-1][0] == base:
+            out[-1] = (base, out[-1][1] + power)
         else:
-            base_position = i
-            i += 2
-            if i < len(word):
-                #extracts the exponent from the string.
-                while word[i] in '0123456789':
-                    i += 1
-                    if i >= len(word):
-                        break
-            newword += (word[base_position] *
-                        int(word[base_position + 2:i]))
-    return newword
+            out.append((base, power))
+    return out
+
+def _expand(pairs):
+    '''
+    Returns the word represented by a list returned by _parse.
+    '''
+    return ''.join(base * power if isinstance(base, str)
+                   else _expand(base) * power for base, power in pairs)
+
+def _letters(pairs):
+    '''
+    Returns the list of the distinct letters of the word represented by a list
+    returned by _parse, in the order of their first occurrence.
+    '''
+    out, seen = [], set()
+    for base, _ in pairs:
+        for letter in (_letters(base) if isinstance(base, list) else [base]):
+            if letter not in seen:
+                seen.add(letter)
+                out.append(letter)
+    return out
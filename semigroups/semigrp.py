@@ -4,9 +4,9 @@ This module contains classes for representing semigroups.
 # pylint: disable = no-member, protected-access, invalid-name, len-as-condition
 
 import libsemigroups
-from semigroups.elements import Transformation
+from semigroups.elements import Transformation, Matrix
 from semigroups.cayley_graph import CayleyGraph
-from libsemigroups import ElementABC, PythonElementNC
+from libsemigroups import ElementABC, PythonElementNC, PythonBatchNC
 
 class Semigroup(libsemigroups.SemigroupNC):
     r'''
@@ -26,6 +26,8 @@ class Semigroup(libsemigroups.SemigroupNC):
 
     Raises:
         ValueError: If no arguments are given.
+        TypeError:  If the generators are not all of the same type, or are
+                    matrices over different semirings.
 
     Examples:
         >>> from semigroups import Semigroup, Transformation
@@ -51,18 +53,33 @@ class Semigroup(libsemigroups.SemigroupNC):
             raise ValueError('there must be at least 1 argument')
         elif not all(map(lambda elt: isinstance(elt, type(args[0])), args)):
             raise TypeError('generators must be of the same type')
+        elif isinstance(args[0], Matrix) and not all(
+                x.semiring is args[0].semiring for x in args):
+            # semirings are interned, and so equal semirings are identical
+            raise TypeError('generators must be matrices over the same '
+                            + 'semiring')
 
         err_msg = 'generators must have a multiplication defined on them'
         x = args[0]
+        batch, complexity = None, None
         if not isinstance(x, ElementABC):
             try:
                 x * x
             except:
                 raise TypeError(err_msg)
-
-        self.gens = [g if (isinstance(g, ElementABC) and str(type(g)) !=
-                           "<class 'semigroups.semifp._FPSOME'>")
-                     else PythonElementNC(g) for g in args]
+            # products of the generators are computed in batches if possible,
+            # see PythonBatchNC
+            if hasattr(type(x), 'multiply_many'):
+                batch = PythonBatchNC(type(x).multiply_many,
+                                      getattr(type(x), 'hash_many', None))
+            # the cost hint for products of the generators, which is found
+            # once for all of the generators, see PythonElementNC.complexity
+            complexity = getattr(type(x), 'semigroup_complexity', None)
+            if callable(complexity):
+                complexity = complexity(x)
+
+        self.gens = [g if isinstance(g, ElementABC)
+                     else PythonElementNC(g, batch, complexity) for g in args]
         libsemigroups.SemigroupNC.__init__(self, self.gens)
         self._done_commute_membership = False
 
@@ -95,14 +112,8 @@ class Semigroup(libsemigroups.SemigroupNC):
             [0, 1, 2, 3]
         '''
 
-        G = CayleyGraph()
-        G._adj_list = libsemigroups.SemigroupNC.right_cayley_graph(self)
-        for i, adjacencies in enumerate(G._adj_list):
-            G._add_node(i)
-        for i, adjacencies in enumerate(G._adj_list):
-            for j, adj in enumerate(adjacencies):
-                G._add_edge_with_label(j, (i, adj))
-        return G
+        return _cayley_graph(
+            libsemigroups.SemigroupNC.right_cayley_graph(self))
 
     def left_cayley_graph(self):
         r'''
@@ -134,14 +145,21 @@ class Semigroup(libsemigroups.SemigroupNC):
             ... [set([0]), set([2]), set([1, 3])])
             True
         '''
-        G = CayleyGraph()
-        G._adj_list = libsemigroups.SemigroupNC.left_cayley_graph(self)
-        for i, adjacencies in enumerate(G._adj_list):
-            G._add_node(i)
-        for i, adjacencies in enumerate(G._adj_list):
-            for j, adj in enumerate(adjacencies):
-                G._add_edge_with_label(j, (i, adj))
-        return G
+        return _cayley_graph(libsemigroups.SemigroupNC.left_cayley_graph(self))
+
+def _cayley_graph(adj_list):
+    '''
+    Returns the CayleyGraph with the given list of adjacencies, where the j-th
+    entry of the i-th adjacency is the target of the edge from i labelled j.
+    '''
+    G = CayleyGraph()
+    G._adj_list = adj_list
+    for i, adjacencies in enumerate(G._adj_list):
+        G._add_node(i)
+    for i, adjacencies in enumerate(G._adj_list):
+        for j, adj in enumerate(adjacencies):
+            G._add_edge_with_label(j, (i, adj))
+    return G
 
 def full_transformation_monoid(n):
     r'''
@@ -4,7 +4,65 @@ This module contains classes for semirings.
 # pylint: disable = no-member, protected-access, invalid-name
 # pylint: disable = too-few-public-methods
 
-class SemiringABC:
+import operator
+import sys
+import weakref
+from array import array
+from functools import reduce
+
+# The greatest and least 64-bit integers, which encode infinity and minus
+# infinity in the integer encoding of the elements of a semiring, see
+# SemiringABC.to_ints. These are libsemigroups.POSITIVE_INFINITY and
+# libsemigroups.NEGATIVE_INFINITY.
+_INT64_MAX = 2 ** 63 - 1
+_INT64_MIN = -2 ** 63
+
+# The typecode of the arrays of 64-bit integers returned by
+# SemiringABC.validate, since 'q' is not available in Python 2, where 'l' is
+# 64 bits on the supported platforms.
+_INT64_TYPECODE = 'q' if sys.version_info[0] >= 3 else 'l'
+
+def _check_int64(x):
+    # x if it is a 64-bit integer, see SemiringABC.plus_unchecked
+    if not _INT64_MIN <= x <= _INT64_MAX:
+        raise ValueError('the result is not a 64-bit integer')
+    return x
+
+def _int64_array(xs):
+    # the buffer of the 64-bit integers in the list xs, see
+    # SemiringABC.plus_many_unchecked
+    try:
+        return array(_INT64_TYPECODE, xs)
+    except OverflowError:
+        raise ValueError('the result is not a 64-bit integer')
+
+class _Interned(type):
+    '''
+    The metaclass of the semirings, which returns the same instance every time
+    a semiring is constructed from equal arguments of the same types, for as
+    long as that instance is alive.
+    '''
+    _instances = weakref.WeakValueDictionary()
+
+    def __call__(cls, *args, **kwargs):
+        if kwargs:
+            # normalise the arguments to those returned by _args, so that the
+            # key does not depend on how the arguments were given
+            args = type.__call__(cls, *args, **kwargs)._args()
+        key = (cls,) + tuple((type(arg), arg) for arg in args)
+        try:
+            return _Interned._instances[key]
+        except KeyError:
+            pass
+        except TypeError:
+            # an unhashable argument, which __init__ rejects
+            return type.__call__(cls, *args)
+        self = type.__call__(cls, *args)
+        _Interned._instances[key] = self
+        return self
+
+class SemiringABC(_Interned('_SemiringBase', (object,),
+                             {'__slots__': ('__weakref__',)})):
     r'''
     A *semiring* is a set :math:`R`, together with two binary operations,
     :math:`+` and :math:`\times`, such that :math:`(R, +)` is a commutative
@@ -28,9 +86,474 @@ class SemiringABC:
         TypeError:  If any argument is given.
     '''
 
+    # Semirings are interned, see _Interned, and so they are hashable and
+    # equal semirings are identical, and their attributes cannot be changed
+    # once they are set.
+    __slots__ = ()
+
+    # the elements of the semiring are of type _element_type, except possibly
+    # for _infinity, see _check_elements, which is encoded as the integer
+    # _sentinel, see to_ints
+    _element_type = int
+    _infinity = None
+    _sentinel = None
+
     def __init__(self):
-        self._minus_infinity = -float('inf')
-        self._plus_infinity = float('inf')
+        pass
+
+    def __setattr__(self, name, value):
+        try:
+            old = getattr(self, name)
+        except AttributeError:
+            object.__setattr__(self, name, value)
+        else:
+            if old != value:
+                raise AttributeError('semirings are immutable')
+
+    def __reduce__(self):
+        return (self.__class__, self._args())
+
+    def __repr__(self):
+        return '%s(%s)' % (self.__class__.__name__,
+                           ', '.join(map(repr, self._args())))
+
+    def _args(self):
+        # the arguments from which the semiring was constructed
+        return ()
+
+    def _bounds(self):
+        # the least and greatest elements of type _element_type, or None if
+        # there are no such elements
+        return None
+
+    def _check_elements(self, xs):
+        '''
+        Checks that every element of the list xs is an element of the
+        semiring. The types of the elements are checked once for every
+        distinct type, and their values by finding their minimum and maximum.
+        '''
+        types = set(map(type, xs))
+        if all(issubclass(cls, self._element_type) for cls in types):
+            finite = xs
+        else:
+            finite = [x for x in xs if isinstance(x, self._element_type)]
+            if (self._infinity is None or
+                    any(x != self._infinity for x in xs
+                        if not isinstance(x, self._element_type))):
+                raise TypeError
+        bounds = self._bounds()
+        if bounds is not None and len(finite) > 0:
+            if min(finite) < bounds[0] or max(finite) > bounds[1]:
+                raise ValueError
+
+    def _check_many(self, xs, ys):
+        '''
+        Returns the arguments of plus_many or prod_many as lists, after
+        checking that they have the same length and consist of elements of the
+        semiring.
+        '''
+        xs, ys = list(xs), list(ys)
+        if len(xs) != len(ys):
+            raise ValueError
+        self._check_elements(xs)
+        self._check_elements(ys)
+        return xs, ys
+
+    def plus_many(self, xs, ys):
+        '''
+        A function to find the sums of the pairs of elements in the same
+        positions of two sequences of elements of a semiring.
+
+        This is equivalent to, but faster than, calling ``plus`` for every
+        pair, since the arguments are validated once, and the sums are
+        computed in a single pass.
+
+        Args:
+            xs (list):  The elements to be added.
+            ys (list):  The elements to be added to those in xs.
+
+        Returns:
+            list:   The list whose i-th entry is the sum of xs[i] and ys[i].
+
+        Raises:
+            TypeError:  If any element of xs or ys is of the wrong type.
+            ValueError: If xs and ys have different lengths, or any element
+                        of them is not in the semiring.
+
+        Examples:
+            >>> from semigroups import MaxPlusSemiring
+            >>> MaxPlusSemiring().plus_many([1, -float('inf')], [0, 2])
+            [1, 2]
+        '''
+        xs, ys = self._check_many(xs, ys)
+        return self._plus_many(xs, ys)
+
+    def prod_many(self, xs, ys):
+        '''
+        A function to find the products of the pairs of elements in the same
+        positions of two sequences of elements of a semiring.
+
+        This is equivalent to, but faster than, calling ``prod`` for every
+        pair, since the arguments are validated once, and the products are
+        computed in a single pass.
+
+        Args:
+            xs (list):  The elements to be multiplied.
+            ys (list):  The elements by which to multiply those in xs.
+
+        Returns:
+            list:   The list whose i-th entry is the product of xs[i] and
+            ys[i].
+
+        Raises:
+            TypeError:  If any element of xs or ys is of the wrong type.
+            ValueError: If xs and ys have different lengths, or any element
+                        of them is not in the semiring.
+
+        Examples:
+            >>> from semigroups import MaxPlusSemiring
+            >>> MaxPlusSemiring().prod_many([1, -float('inf')], [0, 2])
+            [1, -inf]
+        '''
+        xs, ys = self._check_many(xs, ys)
+        return self._prod_many(xs, ys)
+
+    def sum(self, xs):
+        '''
+        A function to find the sum of a sequence of elements of a semiring.
+
+        Args:
+            xs (list):  The elements to be added.
+
+        Returns:
+            The sum of the elements of xs, which is the zero of the semiring
+            if xs is empty.
+
+        Raises:
+            TypeError:  If any element of xs is of the wrong type.
+            ValueError: If any element of xs is not in the semiring.
+
+        Examples:
+            >>> from semigroups import MinPlusSemiring
+            >>> MinPlusSemiring().sum([3, float('inf'), 2])
+            2
+        '''
+        xs = list(xs)
+        self._check_elements(xs)
+        if len(xs) == 0:
+            return self.zero()
+        return self._sum(xs)
+
+    def product(self, xs):
+        '''
+        A function to find the product of a sequence of elements of a
+        semiring.
+
+        Args:
+            xs (list):  The elements to be multiplied, in order.
+
+        Returns:
+            The product of the elements of xs, which is the one of the
+            semiring if xs is empty.
+
+        Raises:
+            TypeError:  If any element of xs is of the wrong type.
+            ValueError: If any element of xs is not in the semiring.
+
+        Examples:
+            >>> from semigroups import MinPlusSemiring
+            >>> MinPlusSemiring().product([3, 4, 2])
+            9
+        '''
+        xs = list(xs)
+        self._check_elements(xs)
+        if len(xs) == 0:
+            return self.one()
+        return self._product(xs)
+
+    def sentinel(self):
+        '''
+        A function to find the integer which encodes the infinite element of a
+        semiring, if any, in the integer encoding of its elements, see
+        :meth:`to_ints`.
+
+        Returns:
+            int or None:    The greatest 64-bit integer if the semiring
+            contains infinity, the least 64-bit integer if it contains minus
+            infinity, and None otherwise.
+
+        Raises:
+            TypeError:  If any argument is given.
+
+        Examples:
+            >>> from semigroups import MaxPlusSemiring, NaturalSemiring
+            >>> MaxPlusSemiring().sentinel()
+            -9223372036854775808
+            >>> NaturalSemiring(3, 4).sentinel() is None
+            True
+        '''
+        return self._sentinel
+
+    def to_ints(self, xs):
+        '''
+        A function to encode a sequence of elements of a semiring as 64-bit
+        integers, which can be stored in fixed width integer arrays.
+
+        Every finite element is encoded as itself, except that the elements of
+        the boolean semiring are encoded as 0 and 1, and infinity or minus
+        infinity is encoded as the :meth:`sentinel` of the semiring.
+
+        Args:
+            xs (list):  The elements to be encoded.
+
+        Returns:
+            list:   The integers encoding the elements of xs.
+
+        Raises:
+            TypeError:  If any element of xs is of the wrong type.
+            ValueError: If any element of xs is not in the semiring, or has no
+                        encoding since it is too large or too small.
+
+        Examples:
+            >>> from semigroups import MinPlusSemiring
+            >>> MinPlusSemiring().to_ints([3, float('inf')])
+            [3, 9223372036854775807]
+        '''
+        xs = list(xs)
+        self._check_elements(xs)
+        self._check_ints([x for x in xs if x != self._infinity])
+        return self._to_ints(xs)
+
+    def from_ints(self, xs):
+        '''
+        A function to decode a sequence of integers encoding elements of a
+        semiring, which is the inverse of :meth:`to_ints`.
+
+        Args:
+            xs (list):  The integers to be decoded.
+
+        Returns:
+            list:   The elements of the semiring encoded by xs.
+
+        Raises:
+            TypeError:  If any element of xs is not an int.
+            ValueError: If any element of xs does not encode an element of the
+                        semiring.
+
+        Examples:
+            >>> from semigroups import MinPlusSemiring
+            >>> MinPlusSemiring().from_ints([3, 9223372036854775807])
+            [3, inf]
+        '''
+        xs = list(xs)
+        if not all(issubclass(cls, int) for cls in set(map(type, xs))):
+            raise TypeError
+        self._check_ints([x for x in xs if x != self._sentinel])
+        return self._from_ints(xs)
+
+    def validate(self, xs):
+        '''
+        A function to check a sequence of elements of a semiring once, and
+        encode them as a buffer of 64-bit integers, see :meth:`to_ints`.
+
+        The sums and products of the entries of the buffer can then be found
+        by :meth:`plus_unchecked`, :meth:`prod_unchecked`,
+        :meth:`plus_many_unchecked` and :meth:`prod_many_unchecked`, which do
+        not check their arguments again.
+
+        Args:
+            xs (list):  The elements to be checked.
+
+        Returns:
+            array.array:    The integers encoding the elements of xs.
+
+        Raises:
+            TypeError:  If any element of xs is of the wrong type.
+            ValueError: If any element of xs is not in the semiring, or has no
+                        encoding since it is too large or too small.
+
+        Examples:
+            >>> from semigroups import MinPlusSemiring
+            >>> MinPlusSemiring().validate([3, float('inf')]).tolist()
+            [3, 9223372036854775807]
+        '''
+        return array(_INT64_TYPECODE, self.to_ints(xs))
+
+    def plus_unchecked(self, x, y):
+        '''
+        A function to find the encoding of the sum of two elements of a
+        semiring from their encodings, see :meth:`validate`, which are not
+        checked.
+
+        Args:
+            x (int):    The encoding of one of the elements to be added.
+            y (int):    The encoding of the other element to be added.
+
+        Returns:
+            int:    The encoding of the sum of the elements.
+
+        Raises:
+            ValueError: If the sum is not a 64-bit integer, or if it is a
+                        finite element encoded as the sentinel, see
+                        :meth:`to_ints`.
+
+        Examples:
+            >>> from semigroups import NaturalSemiring
+            >>> NaturalSemiring(3, 4).plus_unchecked(2, 6)
+            4
+        '''
+        return _check_int64(self._plus_ints(x, y))
+
+    def prod_unchecked(self, x, y):
+        '''
+        A function to find the encoding of the product of two elements of a
+        semiring from their encodings, see :meth:`validate`, which are not
+        checked.
+
+        Args:
+            x (int):    The encoding of the element to be multiplied on the
+                        left.
+            y (int):    The encoding of the element to be multiplied on the
+                        right.
+
+        Returns:
+            int:    The encoding of the product of the elements.
+
+        Raises:
+            ValueError: If the product is not a 64-bit integer, or if it is a
+                        finite element encoded as the sentinel, see
+                        :meth:`to_ints`.
+
+        Examples:
+            >>> from semigroups import MaxPlusSemiring
+            >>> S = MaxPlusSemiring()
+            >>> S.prod_unchecked(3, S.sentinel()) == S.sentinel()
+            True
+        '''
+        return _check_int64(self._prod_ints(x, y))
+
+    def plus_many_unchecked(self, xs, ys):
+        '''
+        A function to find the encodings of the sums of the pairs of elements
+        in the same positions of two buffers returned by :meth:`validate`,
+        which are not checked.
+
+        Args:
+            xs (array.array):   The encodings of the elements to be added.
+            ys (array.array):   The encodings of the elements to be added to
+                                those in xs.
+
+        Returns:
+            array.array:    The buffer whose i-th entry encodes the sum of the
+            elements encoded by xs[i] and ys[i].
+
+        Raises:
+            ValueError: If any sum is not a 64-bit integer, see
+                        :meth:`plus_unchecked`.
+
+        Examples:
+            >>> from semigroups import BooleanSemiring
+            >>> S = BooleanSemiring()
+            >>> xs, ys = S.validate([True, False]), S.validate([False, False])
+            >>> S.plus_many_unchecked(xs, ys).tolist()
+            [1, 0]
+        '''
+        return _int64_array(self._plus_many_ints(xs, ys))
+
+    def prod_many_unchecked(self, xs, ys):
+        '''
+        A function to find the encodings of the products of the pairs of
+        elements in the same positions of two buffers returned by
+        :meth:`validate`, which are not checked.
+
+        Args:
+            xs (array.array):   The encodings of the elements to be multiplied
+                                on the left.
+            ys (array.array):   The encodings of the elements to be multiplied
+                                on the right.
+
+        Returns:
+            array.array:    The buffer whose i-th entry encodes the product of
+            the elements encoded by xs[i] and ys[i].
+
+        Raises:
+            ValueError: If any product is not a 64-bit integer, see
+                        :meth:`prod_unchecked`.
+
+        Examples:
+            >>> from semigroups import TropicalMaxPlusSemiring
+            >>> S = TropicalMaxPlusSemiring(10)
+            >>> xs, ys = S.validate([3, 9]), S.validate([5, 4])
+            >>> S.prod_many_unchecked(xs, ys).tolist()
+            [8, 10]
+        '''
+        return _int64_array(self._prod_many_ints(xs, ys))
+
+    def _check_ints(self, xs):
+        '''
+        Checks that the list xs of ints consists of encodings of finite
+        elements of the semiring, which lie strictly between the least and
+        greatest 64-bit integers if they are used as a sentinel.
+        '''
+        if len(xs) == 0:
+            return
+        if self._sentinel is None:
+            lo, hi = _INT64_MIN, _INT64_MAX
+        else:
+            lo, hi = _INT64_MIN + 1, _INT64_MAX - 1
+        bounds = self._bounds()
+        if bounds is not None:
+            lo, hi = max(lo, bounds[0]), min(hi, bounds[1])
+        if min(xs) < lo or max(xs) > hi:
+            raise ValueError
+
+    def _to_ints(self, xs):
+        # the encodings of the elements in the list xs, which are not checked
+        if self._infinity is None:
+            return list(map(int, xs))
+        infinity, sentinel = self._infinity, self._sentinel
+        return [sentinel if x == infinity else x for x in xs]
+
+    def _from_ints(self, xs):
+        # the elements encoded by the ints in the list xs, which are not
+        # checked
+        if self._sentinel is not None:
+            infinity, sentinel = self._infinity, self._sentinel
+            xs = [infinity if x == sentinel else x for x in xs]
+        if self._element_type is not int:
+            xs = list(map(self._element_type, xs))
+        return xs
+
+    # The following methods are the operations on the encodings of elements,
+    # see to_ints, which are not checked. By default the elements are decoded
+    # and encoded again, and the methods are overridden by the subclasses.
+
+    def _plus_ints(self, x, y):
+        return self._to_ints([self.plus(*self._from_ints([x, y]))])[0]
+
+    def _prod_ints(self, x, y):
+        return self._to_ints([self.prod(*self._from_ints([x, y]))])[0]
+
+    def _plus_many_ints(self, xs, ys):
+        return list(map(self._plus_ints, xs, ys))
+
+    def _prod_many_ints(self, xs, ys):
+        return list(map(self._prod_ints, xs, ys))
+
+    # The following methods are the operations on lists of valid elements,
+    # and are overridden by the subclasses.
+
+    def _plus_many(self, xs, ys):
+        return list(map(self.plus, xs, ys))
+
+    def _prod_many(self, xs, ys):
+        return list(map(self.prod, xs, ys))
+
+    def _sum(self, xs):
+        return reduce(self.plus, xs)
+
+    def _product(self, xs):
+        return reduce(self.prod, xs)
 
 class Integers(SemiringABC):
     '''
@@ -49,6 +572,7 @@ class Integers(SemiringABC):
         >>> Integers().prod(3, 4)
         12
     '''
+    __slots__ = ()
 
     @staticmethod
     def plus(x, y):
@@ -140,6 +664,27 @@ class Integers(SemiringABC):
 
         return 1
 
+    def _plus_ints(self, x, y):
+        return x + y
+
+    def _prod_ints(self, x, y):
+        return x * y
+
+    def _plus_many(self, xs, ys):
+        return list(map(operator.add, xs, ys))
+
+    def _prod_many(self, xs, ys):
+        return list(map(operator.mul, xs, ys))
+
+    _plus_many_ints = _plus_many
+    _prod_many_ints = _prod_many
+
+    def _sum(self, xs):
+        return sum(xs)
+
+    def _product(self, xs):
+        return reduce(operator.mul, xs)
+
 
 class MaxPlusSemiring(SemiringABC):
     r'''
@@ -165,6 +710,9 @@ class MaxPlusSemiring(SemiringABC):
         >>> MaxPlusSemiring().prod(-float('inf'), -20)
         -inf
     '''
+    __slots__ = ()
+    _infinity = -float('inf')
+    _sentinel = _INT64_MIN
 
     @staticmethod
     def plus(x, y):
@@ -261,6 +809,30 @@ class MaxPlusSemiring(SemiringABC):
         '''
         return 0
 
+    def _plus_ints(self, x, y):
+        return max(x, y)
+
+    def _prod_ints(self, x, y):
+        if x == _INT64_MIN or y == _INT64_MIN:
+            return _INT64_MIN
+        elif x + y == _INT64_MIN:
+            raise ValueError('the finite product is encoded as the sentinel')
+        return x + y
+
+    def _plus_many(self, xs, ys):
+        return list(map(max, xs, ys))
+
+    _plus_many_ints = _plus_many
+
+    def _prod_many(self, xs, ys):
+        return list(map(operator.add, xs, ys))
+
+    def _sum(self, xs):
+        return max(xs)
+
+    def _product(self, xs):
+        return sum(xs)
+
 class MinPlusSemiring(SemiringABC):
     r'''
     The *min plus semiring* is a semiring comprising the set
@@ -285,6 +857,9 @@ class MinPlusSemiring(SemiringABC):
         >>> MinPlusSemiring().prod(3, float('inf'))
         inf
     '''
+    __slots__ = ()
+    _infinity = float('inf')
+    _sentinel = _INT64_MAX
 
     @staticmethod
     def plus(x, y):
@@ -384,6 +959,30 @@ class MinPlusSemiring(SemiringABC):
 
         return 0
 
+    def _plus_ints(self, x, y):
+        return min(x, y)
+
+    def _prod_ints(self, x, y):
+        if x == _INT64_MAX or y == _INT64_MAX:
+            return _INT64_MAX
+        elif x + y == _INT64_MAX:
+            raise ValueError('the finite product is encoded as the sentinel')
+        return x + y
+
+    def _plus_many(self, xs, ys):
+        return list(map(min, xs, ys))
+
+    _plus_many_ints = _plus_many
+
+    def _prod_many(self, xs, ys):
+        return list(map(operator.add, xs, ys))
+
+    def _sum(self, xs):
+        return min(xs)
+
+    def _product(self, xs):
+        return sum(xs)
+
 class BooleanSemiring(SemiringABC):
     r'''
     The *boolean semiring* is a semiring comprising the set containing
@@ -403,6 +1002,11 @@ class BooleanSemiring(SemiringABC):
         >>> BooleanSemiring().prod(True, False)
         False
     '''
+    __slots__ = ()
+    _element_type = type(True)
+
+    def _bounds(self):
+        return (False, True)
 
     @staticmethod
     def plus(x, y):
@@ -497,6 +1101,27 @@ class BooleanSemiring(SemiringABC):
 
         return True
 
+    def _plus_ints(self, x, y):
+        return x | y
+
+    def _prod_ints(self, x, y):
+        return x & y
+
+    def _plus_many(self, xs, ys):
+        return list(map(operator.or_, xs, ys))
+
+    def _prod_many(self, xs, ys):
+        return list(map(operator.and_, xs, ys))
+
+    _plus_many_ints = _plus_many
+    _prod_many_ints = _prod_many
+
+    def _sum(self, xs):
+        return any(xs)
+
+    def _product(self, xs):
+        return all(xs)
+
 class SemiringWithThresholdABC(SemiringABC):
     '''
     A *semiring with a threshold* is a semiring with a largest finite value,
@@ -510,6 +1135,10 @@ class SemiringWithThresholdABC(SemiringABC):
     Raises:
         TypeError:  If any argument is given.
     '''
+    __slots__ = ('_threshold', '_table_size', '_plus_table', '_prod_table')
+
+    def _args(self):
+        return (self._threshold,)
 
     def threshold(self):
         '''
@@ -531,6 +1160,72 @@ class SemiringWithThresholdABC(SemiringABC):
 
         return self._threshold
 
+    # The sums and products of the integer elements of a semiring with at
+    # most _MAX_TABLE_SIZE of them are looked up in tables, which are
+    # computed the first time they are needed, see _tables. The entry for x
+    # and y is in position x * _table_size + y.
+    _MAX_TABLE_SIZE = 64
+
+    def _nr_ints(self):
+        # the number of integer elements, which are 0, 1, ...
+        return self._threshold + 1
+
+    def _tables(self):
+        '''
+        Returns the number of rows of the tables of sums and products, or 0
+        if the semiring has too many elements to store them.
+        '''
+        try:
+            return self._table_size
+        except AttributeError:
+            pass
+        m = self._nr_ints()
+        if m > self._MAX_TABLE_SIZE:
+            m = 0
+        else:
+            self._plus_table = [self._plus_ints(x, y)
+                                for x in range(m) for y in range(m)]
+            self._prod_table = [self._prod_ints(x, y)
+                                for x in range(m) for y in range(m)]
+        self._table_size = m
+        return m
+
+    def _table_index(self, x, y):
+        '''
+        Returns the position of the entry for x and y in the tables, or -1 if
+        there are no tables, or x and y are not both integer elements.
+        '''
+        m = self._tables()
+        if type(x) is int and type(y) is int and 0 <= x < m and 0 <= y < m:
+            return x * m + y
+        return -1
+
+    def _table_many(self, prod, xs, ys):
+        '''
+        Returns the entries of the table of products, if prod is True, or of
+        sums, otherwise, for the pairs of valid elements, or of their
+        encodings, in the lists xs and ys, or None if they are not all in the
+        table.
+        '''
+        m = self._tables()
+        if (m == 0 or len(xs) == 0 or min(xs) < 0 or max(xs) >= m
+                or min(ys) < 0 or max(ys) >= m):
+            return None
+        table = self._prod_table if prod else self._plus_table
+        return [table[x * m + y] for x, y in zip(xs, ys)]
+
+    def _plus_many_ints(self, xs, ys):
+        out = self._table_many(False, xs, ys)
+        if out is not None:
+            return out
+        return list(map(self._plus_ints, xs, ys))
+
+    def _prod_many_ints(self, xs, ys):
+        out = self._table_many(True, xs, ys)
+        if out is not None:
+            return out
+        return list(map(self._prod_ints, xs, ys))
+
 class TropicalMaxPlusSemiring(SemiringWithThresholdABC):
     # pylint: disable = super-init-not-called
     r'''
@@ -566,6 +1261,9 @@ class TropicalMaxPlusSemiring(SemiringWithThresholdABC):
         >>> TropicalMaxPlusSemiring(26).threshold()
         26
     '''
+    __slots__ = ()
+    _infinity = -float('inf')
+    _sentinel = _INT64_MIN
 
     def __init__(self, threshold):
         if not isinstance(threshold, int):
@@ -599,7 +1297,9 @@ class TropicalMaxPlusSemiring(SemiringWithThresholdABC):
             >>> TropicalMaxPlusSemiring(72).plus(-float('inf'), 25)
             25
         '''
-
+        i = self._table_index(x, y)
+        if i >= 0:
+            return self._plus_table[i]
         if not ((isinstance(x, int) or x == -float('inf'))
                 and (isinstance(y, int) or y == -float('inf'))):
             raise TypeError
@@ -637,6 +1337,9 @@ class TropicalMaxPlusSemiring(SemiringWithThresholdABC):
             >>> TropicalMaxPlusSemiring(72).prod(-float('inf'), 25)
             -inf
         '''
+        i = self._table_index(x, y)
+        if i >= 0:
+            return self._prod_table[i]
         if not ((isinstance(x, int) or x == -float('inf'))
                 and (isinstance(y, int) or y == -float('inf'))):
             raise TypeError
@@ -687,6 +1390,35 @@ class TropicalMaxPlusSemiring(SemiringWithThresholdABC):
 
         return 0
 
+    def _bounds(self):
+        return (0, self._threshold)
+
+    def _plus_ints(self, x, y):
+        return max(x, y)
+
+    def _prod_ints(self, x, y):
+        if x == _INT64_MIN or y == _INT64_MIN:
+            return _INT64_MIN
+        return min(self._threshold, x + y)
+
+    def _plus_many(self, xs, ys):
+        return list(map(max, xs, ys))
+
+    def _prod_many(self, xs, ys):
+        out = self._table_many(True, xs, ys)
+        if out is not None:
+            return out
+        threshold = self._threshold
+        return [min(threshold, z) for z in map(operator.add, xs, ys)]
+
+    def _sum(self, xs):
+        return max(xs)
+
+    def _product(self, xs):
+        # the elements are non-negative, and so the threshold is only applied
+        # once
+        return min(self._threshold, sum(xs))
+
 class TropicalMinPlusSemiring(SemiringWithThresholdABC):
     # pylint: disable = super-init-not-called
     r'''
@@ -722,6 +1454,9 @@ class TropicalMinPlusSemiring(SemiringWithThresholdABC):
         >>> TropicalMinPlusSemiring(10).threshold()
         10
     '''
+    __slots__ = ()
+    _infinity = float('inf')
+    _sentinel = _INT64_MAX
 
     def __init__(self, threshold):
         if not isinstance(threshold, int):
@@ -755,7 +1490,9 @@ class TropicalMinPlusSemiring(SemiringWithThresholdABC):
             >>> TropicalMinPlusSemiring(7).plus(float('inf'), 3)
             3
         '''
-
+        i = self._table_index(x, y)
+        if i >= 0:
+            return self._plus_table[i]
         if not ((isinstance(x, int) or x == float('inf'))
                 and (isinstance(y, int) or y == float('inf'))):
             raise TypeError
@@ -796,7 +1533,9 @@ class TropicalMinPlusSemiring(SemiringWithThresholdABC):
             >>> TropicalMinPlusSemiring(7).prod(float('inf'), 3)
             inf
         '''
-
+        i = self._table_index(x, y)
+        if i >= 0:
+            return self._prod_table[i]
         if not ((isinstance(x, int) or x == float('inf'))
                 and (isinstance(y, int) or y == float('inf'))):
             raise TypeError
@@ -850,6 +1589,40 @@ class TropicalMinPlusSemiring(SemiringWithThresholdABC):
 
         return 0
 
+    def _bounds(self):
+        return (0, self._threshold)
+
+    def _plus_ints(self, x, y):
+        return min(x, y)
+
+    def _prod_ints(self, x, y):
+        if x == _INT64_MAX or y == _INT64_MAX:
+            return _INT64_MAX
+        return min(self._threshold, x + y)
+
+    def _plus_many(self, xs, ys):
+        return list(map(min, xs, ys))
+
+    def _prod_many(self, xs, ys):
+        out = self._table_many(True, xs, ys)
+        if out is not None:
+            return out
+        threshold = self._threshold
+        inf = self._infinity
+        return [z if z == inf else min(threshold, z)
+                for z in map(operator.add, xs, ys)]
+
+    def _sum(self, xs):
+        return min(xs)
+
+    def _product(self, xs):
+        # the elements are non-negative, and so the threshold is only applied
+        # once
+        total = sum(xs)
+        if total == self._infinity:
+            return total
+        return min(self._threshold, total)
+
 class NaturalSemiring(SemiringWithThresholdABC):
     # pylint: disable = super-init-not-called
     r'''
@@ -882,6 +1655,8 @@ class NaturalSemiring(SemiringWithThresholdABC):
         >>> NaturalSemiring(3, 4).period()
         4
     '''
+    __slots__ = ('_period',)
+
     def __init__(self, threshold, period):
         if not (isinstance(period, int) and isinstance(threshold, int)):
             raise TypeError
@@ -891,6 +1666,9 @@ class NaturalSemiring(SemiringWithThresholdABC):
         self._period = period
         self._threshold = threshold
 
+    def _args(self):
+        return (self._threshold, self._period)
+
     def plus(self, x, y):
         r'''
         A function to find the integer sum modulo :math:`\equiv`, of two
@@ -914,13 +1692,16 @@ class NaturalSemiring(SemiringWithThresholdABC):
             >>> NaturalSemiring(5, 7).plus(3, 10)
             6
         '''
+        i = self._table_index(x, y)
+        if i >= 0:
+            return self._plus_table[i]
         if not (isinstance(x, int) and isinstance(y, int)):
             raise TypeError
         if not ((0 <= x < self._threshold + self._period) and
                 (0 <= y < self._threshold + self._period)):
             raise ValueError
 
-        return (x + y - self._threshold) % self._period + self._threshold
+        return self._reduce(x + y)
 
     def prod(self, x, y):
         r'''
@@ -946,13 +1727,16 @@ class NaturalSemiring(SemiringWithThresholdABC):
             >>> NaturalSemiring(5, 7).prod(3, 10)
             9
         '''
+        i = self._table_index(x, y)
+        if i >= 0:
+            return self._prod_table[i]
         if not (isinstance(x, int) and isinstance(y, int)):
             raise TypeError
         if not ((0 <= x < self._threshold + self._period) and
                 (0 <= y < self._threshold + self._period)):
             raise ValueError
 
-        return (x * y - self._threshold) % self._period + self._threshold
+        return self._reduce(x * y)
 
     def period(self):
         '''
@@ -1008,3 +1792,47 @@ class NaturalSemiring(SemiringWithThresholdABC):
             1
         '''
         return 1
+
+    def _bounds(self):
+        return (0, self._threshold + self._period - 1)
+
+    def _nr_ints(self):
+        return self._threshold + self._period
+
+    def _reduce(self, x):
+        # the least natural number congruent to x, only numbers at least the
+        # threshold are identified with others
+        if x < self._threshold:
+            return x
+        return (x - self._threshold) % self._period + self._threshold
+
+    def _plus_ints(self, x, y):
+        return self._reduce(x + y)
+
+    def _prod_ints(self, x, y):
+        return self._reduce(x * y)
+
+    def _plus_many(self, xs, ys):
+        out = self._table_many(False, xs, ys)
+        if out is not None:
+            return out
+        return list(map(self._reduce, map(operator.add, xs, ys)))
+
+    def _prod_many(self, xs, ys):
+        out = self._table_many(True, xs, ys)
+        if out is not None:
+            return out
+        return list(map(self._reduce, map(operator.mul, xs, ys)))
+
+    def _sum(self, xs):
+        # the same as adding the elements one at a time, see plus
+        if len(xs) == 1:
+            return xs[0]
+        return self._reduce(sum(xs))
+
+    def _product(self, xs):
+        m = self._tables()
+        if m > 0:
+            table = self._prod_table
+            return reduce(lambda x, y: table[x * m + y], xs)
+        return reduce(self._prod_ints, xs)
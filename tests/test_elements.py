@@ -2,6 +2,10 @@ import unittest
 import sys
 import os
 from semigroups import Bipartition, Transformation, PartialPerm, BooleanMat, PBR
+from semigroups import (Matrix, Semigroup, Integers, MaxPlusSemiring,
+                        MinPlusSemiring, BooleanSemiring,
+                        TropicalMaxPlusSemiring, TropicalMinPlusSemiring,
+                        NaturalSemiring)
 
 path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if not path in sys.path:
@@ -373,6 +377,203 @@ class TestBooleanMat(unittest.TestCase):
                                     [False, True, False],
                                     [False, False, True]))
 
+    def test_packed(self):
+        def product(x, y):
+            n = len(x)
+            return [[any(x[i][k] and y[k][j] for k in range(n))
+                     for j in range(n)] for i in range(n)]
+        for n in (8, 64, 65):
+            x = [[(i * j + i) % 3 == 0 for j in range(n)] for i in range(n)]
+            y = [[(i + 2 * j) % 5 == 1 for j in range(n)] for i in range(n)]
+            X, Y = BooleanMat(x), BooleanMat(y)
+            self.assertEqual(X.rows(), x)
+            self.assertEqual((X * Y).rows(), product(x, y))
+            self.assertEqual((X * X).rows(), product(x, x))
+            self.assertEqual(X * X.identity(), X)
+            self.assertEqual(X < Y, x < y)
+            self.assertEqual(Y < X, y < x)
+            self.assertEqual(list(X), [a for row in x for a in row])
+
+        S = Semigroup(BooleanMat([0, 1, 0], [1, 0, 0], [0, 0, 1]),
+                      BooleanMat([0, 1, 0], [0, 0, 1], [1, 0, 0]),
+                      BooleanMat([1, 0, 0], [0, 1, 0], [1, 0, 1]),
+                      BooleanMat([1, 0, 0], [0, 1, 0], [0, 0, 0]))
+        self.assertEqual(S.size(), 506)
+
+    def test_power_closure(self):
+        for n in (5, 64, 65):
+            x = [[j == i + 1 for j in range(n)] for i in range(n)]
+            X = BooleanMat(x)
+            self.assertEqual(X.power(3), X * X * X)
+            self.assertEqual(X.power(0), X.identity())
+            self.assertEqual(X.closure().rows(),
+                             [[j >= i for j in range(n)] for i in range(n)])
+        X = BooleanMat([0, 1, 0], [1, 0, 0], [0, 0, 0])
+        self.assertEqual(X.closure(),
+                         BooleanMat([1, 1, 0], [1, 1, 0], [0, 0, 1]))
+
+        with self.assertRaises(TypeError):
+            X.closure(1)
+        with self.assertRaises(ValueError):
+            X.power(-1)
+
+    def test_index_period(self):
+        self.assertEqual(BooleanMat([0, 1, 0], [0, 0, 1],
+                                    [1, 0, 0]).index_period(), (1, 3))
+        self.assertEqual(BooleanMat([0, 1], [0, 0]).index_period(), (2, 1))
+        n = 70
+        x = BooleanMat([[j == (i + 1) % 10 or (i >= 10 and j == i - 1)
+                         for j in range(n)] for i in range(n)])
+        i, p = x.index_period()
+        self.assertEqual(x.power(i + p), x.power(i))
+        self.assertEqual((i, p), (60, 10))
+
+class TestMatrix(unittest.TestCase):
+    def test_init(self):
+        Matrix(Integers(), [[1, -2], [3, 4]])
+        Matrix(MaxPlusSemiring(), [[0, -float('inf')], [1, 2]])
+        Matrix(MinPlusSemiring(), [[float('inf')]])
+        Matrix(TropicalMaxPlusSemiring(4), [[4, 0], [-float('inf'), 2]])
+        Matrix(TropicalMinPlusSemiring(4), [[4, 0], [float('inf'), 2]])
+        Matrix(NaturalSemiring(2, 3), [[0, 1], [2, 4]])
+
+    def test_init_fail(self):
+        with self.assertRaises(TypeError):
+            Matrix(BooleanSemiring(), [[True]])
+        with self.assertRaises(TypeError):
+            Matrix(Integers(), [1, 2])
+        with self.assertRaises(TypeError):
+            Matrix(Integers(), [[1.0]])
+        with self.assertRaises(TypeError):
+            Matrix(MaxPlusSemiring(), [[float('inf')]])
+        with self.assertRaises(ValueError):
+            Matrix(Integers(), [])
+        with self.assertRaises(ValueError):
+            Matrix(Integers(), [[1, 2]])
+        with self.assertRaises(ValueError):
+            Matrix(TropicalMaxPlusSemiring(4), [[5]])
+        with self.assertRaises(ValueError):
+            Matrix(NaturalSemiring(2, 3), [[5]])
+        with self.assertRaises(ValueError):
+            Matrix(Integers(), [[2 ** 63]])
+        with self.assertRaises(ValueError):
+            Matrix(MaxPlusSemiring(), [[-2 ** 63]])
+
+    def test_mul(self):
+        S = TropicalMaxPlusSemiring(5)
+        x = Matrix(S, [[1, -float('inf')], [2, 0]])
+        y = Matrix(S, [[3, 1], [-float('inf'), 4]])
+        self.assertEqual((x * y).rows(), [[4, 2], [5, 4]])
+        self.assertEqual(x * x.identity(), x)
+        self.assertEqual(x.identity().rows(), [[0, -float('inf')],
+                                               [-float('inf'), 0]])
+        self.assertEqual((x ** 4)[1], [5, 0])
+        self.assertEqual((Matrix(Integers(), [[1, 2], [3, 4]]) *
+                          Matrix(Integers(), [[0, 1], [1, 0]])).rows(),
+                         [[2, 1], [4, 3]])
+        with self.assertRaises(TypeError):
+            x * Matrix(TropicalMaxPlusSemiring(6), [[1, 0], [0, 1]])
+        with self.assertRaises(TypeError):
+            x * Matrix(MaxPlusSemiring(), [[1, 0], [0, 1]])
+        with self.assertRaises(TypeError):
+            x * BooleanMat([True, False], [False, True])
+        x = Matrix(Integers(), [[2 ** 62]])
+        with self.assertRaises(OverflowError):
+            x * x
+        x = Matrix(MaxPlusSemiring(), [[-2 ** 62]])
+        with self.assertRaises(OverflowError):
+            x * x
+        x = Matrix(MinPlusSemiring(), [[2 ** 62 - 1, 0], [0, 1]])
+        self.assertEqual((x * x).rows(), [[0, 1], [1, 0]])
+        x = Matrix(MinPlusSemiring(), [[2 ** 62]])
+        with self.assertRaises(OverflowError):
+            x * x
+
+    def test_semigroup(self):
+        S = Semigroup(Matrix(TropicalMaxPlusSemiring(3), [[1]]))
+        self.assertEqual(S.size(), 3)
+        S = Semigroup(Matrix(NaturalSemiring(2, 3), [[2]]))
+        self.assertEqual(S.size(), 2)
+        with self.assertRaises(TypeError):
+            Semigroup(Matrix(TropicalMaxPlusSemiring(3), [[1]]),
+                      Matrix(TropicalMaxPlusSemiring(5), [[1]]))
+
+        inf = float('inf')
+        R = TropicalMaxPlusSemiring(5)
+        S = Semigroup(Matrix(R, [[0, 1, -inf], [-inf, 0, 2], [1, -inf, 0]]),
+                      Matrix(R, [[-inf, 0, -inf], [0, -inf, -inf],
+                                 [-inf, -inf, 1]]))
+        self.assertEqual(S.size(), 427)
+        R = TropicalMinPlusSemiring(3)
+        S = Semigroup(Matrix(R, [[1, inf, 0], [inf, 2, inf], [0, inf, 3]]),
+                      Matrix(R, [[inf, 1, inf], [inf, inf, 2], [1, inf, inf]]))
+        self.assertEqual(S.size(), 52)
+        R = NaturalSemiring(2, 3)
+        S = Semigroup(Matrix(R, [[1, 1], [0, 1]]), Matrix(R, [[0, 1], [1, 0]]),
+                      Matrix(R, [[2, 0], [0, 1]]))
+        self.assertEqual(S.size(), 314)
+
+    def test_power_closure(self):
+        inf = float('inf')
+        x = Matrix(TropicalMaxPlusSemiring(9), [[1, 2], [-inf, 3]])
+        self.assertEqual(x.power(5), x * x * x * x * x)
+        self.assertEqual(x.power(0).rows(), [[0, -inf], [-inf, 0]])
+        self.assertEqual(x.closure().rows(), [[9, 9], [-inf, 9]])
+
+        x = Matrix(MinPlusSemiring(), [[inf, 4, 1], [inf, inf, inf],
+                                       [inf, 2, inf]])
+        self.assertEqual(x.closure().rows(), [[0, 3, 1], [inf, 0, inf],
+                                              [inf, 2, 0]])
+        x = Matrix(MaxPlusSemiring(), [[-1, 4], [-5, -inf]])
+        self.assertEqual(x.closure().rows(), [[0, 4], [-5, 0]])
+        x = Matrix(TropicalMinPlusSemiring(3), [[2, 1], [0, 5]])
+        self.assertEqual(x.closure().rows(), [[0, 1], [0, 0]])
+
+        R = NaturalSemiring(3, 4)
+        for a in range(7):
+            for k in range(1, 6):
+                self.assertEqual(Matrix(R, [[a]]).power(k).rows(),
+                                 [[R.product([a] * k)]])
+        x = Matrix(R, [[0, 1], [2, 1]])
+        self.assertEqual((x * x).rows(),
+                         [[R.sum([R.prod(x[i][k], x[k][j]) for k in range(2)])
+                           for j in range(2)] for i in range(2)])
+
+        with self.assertRaises(ValueError):
+            Matrix(MaxPlusSemiring(), [[-1, 4], [-3, -inf]]).closure()
+        with self.assertRaises(ValueError):
+            Matrix(MinPlusSemiring(), [[-1]]).closure()
+        with self.assertRaises(TypeError):
+            Matrix(NaturalSemiring(2, 3), [[1]]).closure()
+        with self.assertRaises(TypeError):
+            Matrix(Integers(), [[1]]).closure()
+
+    def test_index_period(self):
+        self.assertEqual(Matrix(NaturalSemiring(2, 3), [[2]]).index_period(),
+                         (1, 2))
+        self.assertEqual(Matrix(NaturalSemiring(2, 3),
+                                [[0, 2], [1, 0]]).index_period(), (2, 4))
+        self.assertEqual(Matrix(TropicalMaxPlusSemiring(3),
+                                [[1]]).index_period(), (3, 1))
+        x = Matrix(TropicalMinPlusSemiring(5), [[float('inf'), 1], [2, 3]])
+        i, p = x.index_period()
+        self.assertEqual(x ** (i + p), x ** i)
+        self.assertNotEqual(x ** (i + p - 1), x ** (i - 1))
+
+        with self.assertRaises(TypeError):
+            Matrix(MaxPlusSemiring(), [[1]]).index_period()
+        with self.assertRaises(TypeError):
+            Matrix(Integers(), [[1]]).index_period()
+
+    def test_repr(self):
+        x = Matrix(MinPlusSemiring(), [[0, float('inf')], [1, 2]])
+        self.assertEqual(repr(x), 'Matrix(MinPlusSemiring(), [[0, inf], '
+                         + '[1, 2]])')
+        x = Matrix(NaturalSemiring(2, 3), [[0, 1], [2, 4]])
+        self.assertEqual(eval(repr(x)), x)
+        x = Matrix(TropicalMaxPlusSemiring(3), [[0, 1], [2, 3]])
+        self.assertEqual(eval(repr(x * x)), x * x)
+
 class TestPartialPerm(unittest.TestCase):
     def test_init(self):
         PartialPerm([1, 0, 2], [2, 0, 1], 3)
@@ -3,6 +3,7 @@ import unittest
 import sys
 import os
 from semigroups import FpSemigroup, FpMonoid
+from semigroups.semifp import _FPSOME
 
 path = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 if path not in sys.path:
@@ -45,6 +46,61 @@ class TestFpSemigroup(unittest.TestCase):
             S._parse_word("a^")
         with self.assertRaises(ValueError):
             S._parse_word("a^a")
+        with self.assertRaises(ValueError):
+            S._parse_word("a(^2)")
+        self.assertEqual(S._parse_word("aa^2"), "aaa")
+        self.assertEqual(S._parse_word("(ab)^2a^0()^3"), "abab")
+        self.assertEqual(S._parse_word("(a^2b)^2^3"), "aab" * 6)
+        self.assertEqual(len(S._parse_word("(ab^1000)^1000")), 1001000)
+
+    def test_compress_word(self):
+        S = FpSemigroup('ab', [])
+        self.assertEqual(S._compress_word("(ab)^2b"),
+                         [([("a", 1), ("b", 1)], 2), ("b", 1)])
+        self.assertEqual(S._compress_word("a^0"), [])
+        self.assertEqual(S._compress_word("(ab^1000)^1000"),
+                         [([("a", 1), ("b", 1000)], 1000)])
+        with self.assertRaises(ValueError):
+            S._compress_word("(ac)^2")
+        with self.assertRaises(ValueError):
+            S._compress_word("(ab")
+        self.assertEqual(FpMonoid('ab', [])._compress_word("a^0"), [2])
+        self.assertEqual(S._compress_word([0, 1, 0]), [0, 1, 0])
+        S = FpSemigroup('~a', [])
+        self.assertEqual(S._compress_word("a~"), "a~")
+        with self.assertRaises(ValueError):
+            S._compress_word("a~^2")
+
+    def test_non_letter_alphabet(self):
+        S = FpSemigroup('~a', [['~~', '~'], ['aa', 'a'], ['~a', 'a~']])
+        self.assertEqual(S.size(), 3)
+        self.assertEqual(S.word_to_class_index('a~'),
+                         S.word_to_class_index('~a'))
+        self.assertEqual(S.word_to_class_index_many(['a~', '~a', '~~']),
+                         [S.word_to_class_index('~a')] * 2
+                         + [S.word_to_class_index('~')])
+        self.assertTrue(S.equal('a~a', '~a'))
+        self.assertFalse(S.equal('a', '~'))
+        self.assertEqual(S.normal_form('a~a'), '~a')
+        x = _FPSOME(S, 'a') * _FPSOME(S, '~')
+        self.assertEqual(x, _FPSOME(S, '~a'))
+        self.assertEqual(x.word, '~a')
+
+    def test_large_powers(self):
+        S = FpSemigroup("ab", [["a^1000", "a"], ["b^2", "b"], ["ab", "ba"]])
+        self.assertEqual(S.relations[0], ["a^1000", "a"])
+        self.assertEqual(S.size(), 1999)
+        self.assertTrue(S.equal("a^1000000000000", "a"))
+        self.assertEqual(S.word_to_class_index("(a^999)^1000000001"),
+                         S.word_to_class_index("a^999"))
+        self.assertEqual(S.normal_form("(ba^1000)^123456789"),
+                         "a" * 369 + "b")
+        self.assertEqual(S.factorisation("b(a^10)^100000"), [0, 1])
+        with self.assertRaises(ValueError):
+            S.word_to_class_index("a^0")
+        M = FpMonoid("a", [["a^500", "1"]])
+        self.assertEqual(M.word_to_class_index("a^100000"),
+                         M.word_to_class_index(""))
 
     def test_alphabet(self):
         with self.assertRaises(ValueError):
@@ -54,6 +110,60 @@ class TestFpSemigroup(unittest.TestCase):
         with self.assertRaises(ValueError):
             FpSemigroup('aa', [['b', 'aa']])
 
+    def test_int_alphabet(self):
+        with self.assertRaises(ValueError):
+            FpSemigroup(-1, [])
+        with self.assertRaises(TypeError):
+            FpSemigroup(True, [])
+        with self.assertRaises(TypeError):
+            FpSemigroup(2, [["a", "b"]])
+        with self.assertRaises(ValueError):
+            FpSemigroup(2, [[[0, 2], [0]]])
+        with self.assertRaises(TypeError):
+            FpSemigroup(2, [[[0, "1"], [0]]])
+        S = FpSemigroup(2, [[[0, 0], [0]], [[1, 1, 1], [1]], [[0, 1], [1, 0]]])
+        self.assertEqual(S.size(), 5)
+        self.assertEqual(S.normal_form([1, 0, 1, 0]), [0, 1, 1])
+        self.assertTrue(S.equal([1, 0], [0, 1]))
+        self.assertTrue([1, 1] in S)
+        self.assertFalse([2] in S)
+        self.assertFalse("ab" in S)
+        self.assertEqual(S.rewrite([1, 0, 0]), [0, 1])
+        self.assertEqual(sorted(S.rules())[0], [[0, 0], [0]])
+        M = FpMonoid(1, [[[0, 0], []]])
+        self.assertEqual(M.size(), 2)
+        self.assertEqual(M.normal_form([]), [1])
+        self.assertEqual(repr(M),
+                         "<fp monoid with 1 generators and 1 relations>")
+
+    def test_list_words(self):
+        S = FpSemigroup("ab", [["a", "aa"], ["b", [1, 1]], ["ab", "ba"]])
+        self.assertEqual(S.word_to_class_index([0, 1]),
+                         S.word_to_class_index("ab"))
+        self.assertEqual(S.normal_form([1, 0, 1]), "ab")
+        self.assertTrue(S.equal([1, 0], "ab"))
+        with self.assertRaises(ValueError):
+            S.word_to_class_index([0, 2])
+        with self.assertRaises(ValueError):
+            S.word_to_class_index([])
+
+    def test_large_alphabet(self):
+        n = 1000
+        S = FpSemigroup(n, [[[0, 0], [0]]] + [[[i], [0]] for i in range(1, n)])
+        self.assertEqual(S.size(), 1)
+        self.assertEqual(S.word_to_class_index([n - 1, 1]),
+                         S.word_to_class_index([0]))
+        with self.assertRaises(ValueError):
+            S.knuth_bendix()
+        if sys.version_info[0] < 3:
+            return
+        alphabet = ''.join(chr(0x4e00 + i) for i in range(n))
+        S = FpSemigroup(alphabet, [[alphabet[0] * 2, alphabet[0]]]
+                        + [[a, alphabet[0]] for a in alphabet[1:]])
+        self.assertTrue(S._pure_letter_alphabet)
+        self.assertEqual(S._compress_word(alphabet[0] + '^3'),
+                         [(alphabet[0], 3)])
+
     def test_rels(self):
         with self.assertRaises(TypeError):
             FpSemigroup("ab", "[\"a\", \"aa\"]")
@@ -89,6 +199,63 @@ class TestFpSemigroup(unittest.TestCase):
         S = FpSemigroup("ab", [])
         self.assertEqual(S.size(), float("inf"))
 
+    def test_strategy(self):
+        rels = [["a^5", "a"], ["bb", "b"], ["ab", "ba"]]
+        with self.assertRaises(TypeError):
+            FpSemigroup("ab", rels, 1)
+        with self.assertRaises(ValueError):
+            FpSemigroup("ab", rels, "todd")
+        for strategy in ["race", "todd_coxeter", "todd_coxeter_prefill",
+                         "knuth_bendix", "p"]:
+            S = FpSemigroup("ab", rels, strategy)
+            self.assertEqual(S.strategy, strategy)
+            self.assertEqual(S.size(), 9)
+            self.assertEqual(S.stats()["strategy"], strategy)
+            self.assertGreaterEqual(S.stats()["congruence_time"], 0)
+            self.assertEqual(FpSemigroup("ab", rels).size(strategy), 9)
+        S = FpSemigroup("ab", rels)
+        with self.assertRaises(ValueError):
+            S.size("todd")
+        with self.assertRaises(TypeError):
+            S.size(0)
+        self.assertEqual(FpSemigroup("ab", []).size("todd_coxeter"),
+                         float("inf"))
+        M = FpMonoid("ab", rels, "knuth_bendix")
+        self.assertEqual(M.size(), 10)
+        self.assertEqual(M.size("todd_coxeter"), 10)
+
+    def test_size_memoised(self):
+        S = FpSemigroup("ab", [["a", "aa"], ["b", "bb"], ["ab", "ba"]])
+        self.assertIsNone(S._size)
+        self.assertTrue(S.is_finite())
+        self.assertEqual(S._size, 3)
+        S._size = 17
+        self.assertEqual(S.size(), 17)
+        self.assertEqual(S._obviously_infinite, False)
+        S = FpSemigroup("ab", [])
+        self.assertEqual(S.size(), float("inf"))
+        self.assertIsNone(S._size)
+        self.assertTrue(FpMonoid("ab", []).is_obviously_infinite())
+        self.assertFalse(FpMonoid("a", [["a", "aa"]]).is_obviously_infinite())
+
+    def test_lazy(self):
+        # the congruence is not computed by the constructor, and so an
+        # infinite semigroup which is not obviously infinite can be constructed
+        S = FpSemigroup("ab", [["aa", "a"], ["bb", "b"]])
+        self.assertFalse(S.is_obviously_infinite())
+        self.assertNotIn("nr_elements", S.stats())
+        self.assertTrue(S.knuth_bendix())
+        self.assertEqual(S.rewrite("aabba"), "aba")
+
+        S = FpSemigroup("ab", [["a^5", "a"], ["bb", "b"], ["ab", "ba"]])
+        x = _FPSOME(S, "ab")
+        self.assertNotIn("nr_elements", S.stats())
+        self.assertEqual(S.size("todd_coxeter"), 9)
+        self.assertNotIn("nr_elements", S.stats())
+        self.assertEqual(x, S[1] * S[0])
+        self.assertEqual(x.word, "ab")
+        self.assertIn("nr_elements", S.stats())
+
     def test_normal_form(self):
         S = FpSemigroup("a", [["a", "aa"]])
         self.assertEqual(S.normal_form("a^1000"), "a")
@@ -97,6 +264,82 @@ class TestFpSemigroup(unittest.TestCase):
         S = FpSemigroup("ab", [["a", "aaa"], ["b", "bb"], ["ab", "ba"]])
         self.assertEqual(S.normal_form("(ba)^10"), "aab")
 
+    def test_knuth_bendix(self):
+        S = FpSemigroup("ab", [["aa", "a"], ["bab", "ab"], ["ab", "ba"]])
+        self.assertFalse(S.is_confluent())
+        with self.assertRaises(TypeError):
+            S.knuth_bendix(max_rules="10")
+        with self.assertRaises(ValueError):
+            S.knuth_bendix(max_overlap=0)
+        with self.assertRaises(TypeError):
+            S.knuth_bendix(timeout=[])
+        with self.assertRaises(ValueError):
+            S.knuth_bendix(timeout=-1)
+        self.assertTrue(S.knuth_bendix(timeout=10))
+        self.assertTrue(S.is_confluent())
+        self.assertEqual(sorted(S.rules()),
+                         [["aa", "a"], ["abb", "ab"], ["ba", "ab"]])
+        self.assertTrue(S.knuth_bendix())
+
+    def test_add_relation(self):
+        S = FpSemigroup("ab", [["aa", "a"], ["bbb", "b"], ["ab", "ba"]])
+        self.assertEqual(S.size(), 5)
+        x = S[0]
+        self.assertIn("nr_elements", S.stats())
+        S.add_relation("bb", "b")
+        self.assertEqual(S.stats(), {"strategy": "race",
+                                     "congruence_time": 0})
+        self.assertEqual(S.size(), 3)
+        self.assertEqual(len(S.relations), 4)
+        self.assertTrue(S.equal("abb", "ab"))
+        self.assertEqual(S.normal_form("b^10"), "b")
+        with self.assertRaises(ValueError):
+            x * S[0]
+        S.add_relation([0], [1])
+        self.assertEqual(S.size(), 1)
+        with self.assertRaises(TypeError):
+            S.add_relation("a", 1)
+        with self.assertRaises(ValueError):
+            S.add_relation("a", "c")
+        with self.assertRaises(ValueError):
+            S.add_relation("a", "")
+
+        S = FpSemigroup("ab", [["aa", "a"]])
+        self.assertFalse(S.is_finite())
+        S.add_relation("bb", "b")
+        S.add_relation("ab", "ba")
+        self.assertEqual(S.size(), 3)
+        S = FpSemigroup("ab", [["aa", "a"], ["bab", "ab"], ["ab", "ba"]])
+        self.assertTrue(S.knuth_bendix())
+        S.add_relation("b^3", "b")
+        self.assertTrue(S.knuth_bendix())
+        self.assertEqual(S.rewrite("abbb"), "ab")
+        M = FpMonoid("a", [["aaa", "a"]])
+        self.assertEqual(M.size(), 3)
+        M.add_relation("aa", "1")
+        self.assertEqual(M.size(), 2)
+        self.assertEqual(repr(M),
+                         "<fp monoid with 1 generators and 2 relations>")
+
+    def test_rewrite(self):
+        S = FpSemigroup("ab", [["a", "aaa"], ["b", "bb"], ["ab", "ba"]])
+        S.knuth_bendix()
+        self.assertEqual(S.rewrite("(ba)^10"), "aab")
+        self.assertEqual(S.rewrite_many(["b^5", "ba", "aaaa"]),
+                         ["b", "ab", "aa"])
+        self.assertEqual(S.rewrite_many([]), [])
+        with self.assertRaises(TypeError):
+            S.rewrite(1)
+        with self.assertRaises(TypeError):
+            S.rewrite_many("ab")
+        with self.assertRaises(ValueError):
+            S.rewrite("abc")
+        S = FpSemigroup("ab", [])
+        self.assertEqual(S.rewrite("abba"), "abba")
+        self.assertEqual(S.normal_form("abba"), "abba")
+        S = FpMonoid("a", [["a", "aa"]])
+        self.assertEqual(S.rewrite_many(["", "1a1"]), ["1", "a"])
+
     def test_word_to_class_index(self):
         S = FpSemigroup("ab", [["a", "aa"], ["b", "bb"], ["ab", "ba"]])
         self.assertIsInstance(S.word_to_class_index("aba"), int)
@@ -110,6 +353,32 @@ class TestFpSemigroup(unittest.TestCase):
         with self.assertRaises(ValueError):
             S.word_to_class_index("aba")
 
+    def test_word_to_class_index_many(self):
+        S = FpSemigroup("ab", [["a", "aa"], ["b", "bb"], ["ab", "ba"]])
+        words = ["a", "b", "aba", "abaaabb", "(ab)^3", [0, 1, 0], "a^3b"]
+        self.assertEqual(S.word_to_class_index_many(words),
+                         [S.word_to_class_index(w) for w in words])
+        self.assertEqual(S.word_to_class_index_many([]), [])
+        with self.assertRaises(TypeError):
+            S.word_to_class_index_many("aba")
+        with self.assertRaises(TypeError):
+            S.word_to_class_index_many(["a", 1])
+        with self.assertRaises(ValueError):
+            S.word_to_class_index_many(["a", "c"])
+        S = FpSemigroup("ab", [])
+        with self.assertRaises(ValueError):
+            S.word_to_class_index_many(["a"])
+
+    def test_equal_many(self):
+        S = FpSemigroup("ab", [["a", "a^5"], ["b", "bb"], ["ab", "ba"]])
+        self.assertEqual(S.equal_many([("a", "a^5"), ("abb", "ba"),
+                                       ["a", "b"]]),
+                         [True, True, False])
+        with self.assertRaises(TypeError):
+            S.equal_many([("a", "a", "a")])
+        with self.assertRaises(ValueError):
+            S.equal_many([("a", "c")])
+
     def test_equal(self):
         S = FpSemigroup("ab",[["a", "a^5"],["b","bb"],["ab","ba"]])
         self.assertTrue(S.equal("a","a^5"))
@@ -150,6 +419,43 @@ class TestFpSemigroup(unittest.TestCase):
         with self.assertRaises(ValueError):
             S.factorisation("aba")
 
+    def test_right_cayley_graph(self):
+        S = FpSemigroup("ab", [["a^5", "a"], ["bb", "b"], ["ab", "ba"]])
+        G = S.right_cayley_graph()
+        self.assertEqual(G.nodes(), list(range(9)))
+        for word in ["a", "ab", "aab", "a^4"]:
+            for j, letter in enumerate("ab"):
+                self.assertEqual(
+                    G._adj_list[S.word_to_class_index(word)][j],
+                    S.word_to_class_index(word + letter))
+        with self.assertRaises(ValueError):
+            FpSemigroup("ab", []).right_cayley_graph()
+
+    def test_left_cayley_graph(self):
+        S = FpSemigroup("ab", [["a^5", "a"], ["bb", "b"], ["aba", "a"]])
+        G = S.left_cayley_graph()
+        self.assertEqual(G.nodes(), list(range(S.size())))
+        for word in ["a", "ab", "ba", "aab", "a^4"]:
+            for j, letter in enumerate("ab"):
+                self.assertEqual(
+                    G._adj_list[S.word_to_class_index(word)][j],
+                    S.word_to_class_index(letter + word))
+        with self.assertRaises(ValueError):
+            FpSemigroup("ab", []).left_cayley_graph()
+
+    def test_multiplication_table(self):
+        S = FpSemigroup("ab", [["a^5", "a"], ["bb", "b"], ["ab", "ba"]])
+        table = S.multiplication_table()
+        self.assertEqual(len(table), 9)
+        words = ["a", "aa", "aab", "ba^3", "b"]
+        for x in words:
+            for y in words:
+                self.assertEqual(table[S.word_to_class_index(x)]
+                                 [S.word_to_class_index(y)],
+                                 S.word_to_class_index(x + y))
+        with self.assertRaises(ValueError):
+            FpSemigroup("ab", []).multiplication_table()
+
     def test_repr(self):
         S = FpSemigroup("ab", [["aa", "a"], ["bbb", "ab"], ["ab", "ba"]])
         self.assertEqual(S.__repr__(),
@@ -262,27 +568,56 @@ class Test_FPSOME(unittest.TestCase):
 
     def test_identity(self):
         FpS = FpSemigroup("ab", [["a^10", "a"], ["bbb", "b"], ["ba", "ab"]])
-        a = FpS[0].get_value()
+        a = FpS[0]
         self.assertEqual(a.identity().word, "")
+        self.assertIsNone(a.identity().class_index())
+        self.assertEqual(a.identity() * a, a)
+        self.assertEqual(a ** 0 * a, a)
         FpS = FpMonoid("ab", [["a^10", "a"], ["bbb", "b"], ["ba", "ab"]])
-        a = FpS[1].get_value()
+        a = FpS[1]
         self.assertEqual(a.identity().word, "1")
+        self.assertEqual(a.identity() * a, a)
 
     def test_mul(self):
         FpS = FpSemigroup("ab", [["aa", "a"], ["bbb", "b"], ["ba", "ab"]])
         other = "aa"
-        a = FpS[1].get_value()
+        a = FpS[1]
         a * a
         self.assertEqual(a.word + a.word, (a * a).word)
+        self.assertEqual((a * a * a).word, "b")
+        self.assertEqual((FpS[1] * FpS[0]).word, "ab")
         with self.assertRaises(TypeError):
             a * other
         with self.assertRaises(TypeError):
-            FpSemigroup("a", [["aa", "a"]])[0].get_value() * a
+            FpSemigroup("a", [["aa", "a"]])[0] * a
+
+    def test_native(self):
+        FpS = FpSemigroup("ab", [["a^5", "a"], ["bb", "b"], ["ab", "ba"]])
+        self.assertEqual(FpS.size(), 9)
+        self.assertTrue(all(isinstance(x, FpS[0].__class__) for x in FpS))
+        self.assertEqual(sorted(x.class_index() for x in FpS),
+                         list(range(9)))
+        for x in FpS:
+            for y in FpS:
+                self.assertEqual((x * y).class_index(),
+                                 FpS.word_to_class_index(x.word + y.word))
+        self.assertEqual(FpS[0].representative(), [0])
+        self.assertEqual(hash(FpS[0]), hash(FpS[0] * FpS[0] ** 4))
+        with self.assertRaises(ValueError):
+            FpS[0].__class__(FpS, "")
+        with self.assertRaises(ValueError):
+            FpS[0].__class__(FpSemigroup("ab", []), "a")
+
+    def test_index_period(self):
+        FpS = FpSemigroup("ab", [["a^5", "a"], ["bb", "b"], ["ab", "ba"]])
+        self.assertEqual(FpS[0].index_period(), (1, 4))
+        self.assertEqual(FpS[1].index_period(), (1, 1))
+        self.assertEqual((FpS[0] * FpS[1]).index_period(), (1, 4))
 
     def test_repr(self):
         FpS = FpSemigroup("ab", [["aa", "a"], ["bbb", "b"], ["ab", "ba"]])
-        self.assertEqual(FpS[0].__repr__(), "'" + FpS[0].get_value().Repword + "'")
-
+        self.assertEqual(FpS[0].__repr__(), "'" + FpS[0].word + "'")
+        self.assertEqual((FpS[1] * FpS[0] * FpS[1]).__repr__(), "'abb'")
 
 if __name__ == "__main__":
     unittest.main()
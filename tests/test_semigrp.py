@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import gc
+import libsemigroups
 from semigroups import (Semigroup, Transformation, Bipartition,
                         full_transformation_monoid, CayleyGraph)
 
@@ -34,6 +36,264 @@ class TestSemigroup(unittest.TestCase):
         self.assertTrue(isinstance(Semigroup(-1).left_cayley_graph(),
                                    CayleyGraph))
 
+    def test_stats(self):
+        S = full_transformation_monoid(4)
+        stats = S.stats()
+        self.assertFalse(stats['is_done'])
+        self.assertIsNone(stats['nr_idempotents'])
+        self.assertEqual(stats['nr_elements'], 3)
+
+        S.enumerate(100)
+        stats = S.stats()
+        self.assertGreaterEqual(stats['nr_elements'], 100)
+        self.assertGreater(stats['element_bytes'], 0)
+        self.assertGreater(stats['cayley_graph_bytes'], 0)
+        self.assertEqual(stats['cayley_graph_bytes']
+                         % (2 * 3 * stats['nr_elements']), 0)
+
+        self.assertEqual(S.size(), 256)
+        stats = S.stats()
+        self.assertTrue(stats['is_done'])
+        self.assertEqual(stats['nr_elements'], 256)
+        self.assertIsNone(stats['nr_idempotents'])
+        nr_idempotents = S.nridempotents()
+        self.assertEqual(S.stats()['nr_idempotents'], nr_idempotents)
+        self.assertGreater(stats['nr_rules'], 0)
+        self.assertGreaterEqual(stats['enumerate_time'], 0)
+
+class Mod7(int):
+    nr_products = 0
+    nr_batches = 0
+
+    def __mul__(self, other):
+        Mod7.nr_products += 1
+        return Mod7(int(self) * int(other) % 7)
+
+    @staticmethod
+    def multiply_many(xs, ys):
+        Mod7.nr_batches += 1
+        return [Mod7(int(x) * int(y) % 7) for x, y in zip(xs, ys)]
+
+    @staticmethod
+    def hash_many(xs):
+        return [hash(x) for x in xs]
+
+class TestPythonBatch(unittest.TestCase):
+    def test_batch(self):
+        Mod7.nr_products, Mod7.nr_batches = 0, 0
+        S = Semigroup(Mod7(3), Mod7(0))
+        self.assertEqual(S.size(), 7)
+        self.assertEqual(sorted(int(x) for x in S), list(range(7)))
+        self.assertGreater(Mod7.nr_batches, 0)
+        # without batches there are 2 * 7 products during the enumeration
+        self.assertLess(Mod7.nr_products, 2 * 7)
+
+    def test_errors(self):
+        class Short(Mod7):
+            @staticmethod
+            def multiply_many(xs, ys):
+                raise TypeError
+
+        class Interrupted(Mod7):
+            @staticmethod
+            def multiply_many(xs, ys):
+                raise KeyboardInterrupt
+
+        # products are computed one at a time if multiply_many fails
+        self.assertEqual(Semigroup(Short(3), Short(0)).size(), 7)
+        with self.assertRaises(KeyboardInterrupt):
+            Semigroup(Interrupted(3), Interrupted(0)).size()
+
+    def test_init(self):
+        with self.assertRaises(TypeError):
+            libsemigroups.PythonBatchNC(1)
+        with self.assertRaises(TypeError):
+            libsemigroups.PythonBatchNC(Mod7.multiply_many, 1)
+
+class Tracked(object):
+    # an element of the cyclic group of order 6 which counts its live
+    # instances
+    live = 0
+
+    def __init__(self, value):
+        Tracked.live += 1
+        self.value = value
+
+    def __del__(self):
+        Tracked.live -= 1
+
+    def __mul__(self, other):
+        return Tracked((self.value + other.value) % 6)
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __ne__(self, other):
+        return self.value != other.value
+
+    def __lt__(self, other):
+        return self.value < other.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+class TrackedBatch(Tracked):
+    def __mul__(self, other):
+        return TrackedBatch((self.value + other.value) % 6)
+
+    @staticmethod
+    def multiply_many(xs, ys):
+        return [x * y for x, y in zip(xs, ys)]
+
+    @staticmethod
+    def hash_many(xs):
+        return [hash(x) for x in xs]
+
+class TestPythonElementRefcounts(unittest.TestCase):
+    def _check_no_leaks(self, cls):
+        gc.collect()
+        live = Tracked.live
+        x, y = cls(1), cls(2)
+        refcounts = sys.getrefcount(x), sys.getrefcount(y)
+        for _ in range(3):
+            S = Semigroup(x, y)
+            self.assertEqual(S.size(), 6)
+            self.assertEqual(len(list(S)), 6)
+            S.right_cayley_graph()
+            S[0] * S[1]
+            S[0] ** 5
+            S[0].identity()
+            del S
+        gc.collect()
+        self.assertEqual((sys.getrefcount(x), sys.getrefcount(y)), refcounts)
+        del x, y
+        gc.collect()
+        self.assertEqual(Tracked.live, live)
+
+    def test_no_leaks(self):
+        self._check_no_leaks(Tracked)
+
+    def test_no_leaks_batch(self):
+        self._check_no_leaks(TrackedBatch)
+
+    def test_no_leaks_batch_alive(self):
+        # the values of elements returned to Python are not kept by the batch
+        S = Semigroup(TrackedBatch(1), TrackedBatch(2))
+        self.assertEqual(S.size(), 6)
+        gc.collect()
+        live = Tracked.live
+        for _ in range(10):
+            S[0] * S[1]
+            S[0] ** 5
+            S[0].identity()
+        gc.collect()
+        self.assertEqual(Tracked.live, live)
+
+    def test_errors(self):
+        class Bad(Tracked):
+            def __mul__(self, other):
+                if self.value == 3:
+                    raise ValueError
+                return Bad((self.value + other.value) % 6)
+        S = Semigroup(Bad(1))
+        with self.assertRaises(ValueError):
+            S.size()
+        x = libsemigroups.PythonElementNC(Bad(3))
+        with self.assertRaises(ValueError):
+            x * x
+
+    def test_new_from_handle(self):
+        x = libsemigroups.PythonElementNC(Tracked(1))
+        self.assertEqual((x * x).get_value().value, 2)
+        self.assertEqual((x ** 3).get_value().value, 3)
+        y = libsemigroups.PythonElementNC(x)
+        self.assertIs(y.get_value(), x)
+        with self.assertRaises(TypeError):
+            x.index_period()
+
+class Expensive(Tracked):
+    nr_hints = 0
+
+    def __mul__(self, other):
+        return Expensive((self.value + other.value) % 6)
+
+    def semigroup_complexity(self):
+        Expensive.nr_hints += 1
+        return 1000
+
+class Unhinted(Tracked):
+    # complexity is not the opt-in attribute semigroup_complexity
+    complexity = 'not a hint'
+
+    def __mul__(self, other):
+        return Unhinted((self.value + other.value) % 6)
+
+class TestPythonElementComplexity(unittest.TestCase):
+    def test_complexity(self):
+        self.assertEqual(libsemigroups.PythonElementNC(1).complexity(), 1)
+        self.assertEqual(libsemigroups.PythonElementNC(
+            1, complexity=7).complexity(), 7)
+        nr_hints = Expensive.nr_hints
+        x = libsemigroups.PythonElementNC(
+            Expensive(1), complexity=Expensive.semigroup_complexity)
+        self.assertEqual(x.complexity(), 1000)
+        self.assertEqual((x * x).complexity(), 1000)
+        self.assertEqual(Expensive.nr_hints, nr_hints + 1)
+        with self.assertRaises(TypeError):
+            libsemigroups.PythonElementNC(1, complexity=-1)
+        with self.assertRaises(TypeError):
+            libsemigroups.PythonElementNC(1, complexity='a')
+        with self.assertRaises(TypeError):
+            libsemigroups.PythonElementNC(1, complexity=True)
+        with self.assertRaises(TypeError):
+            libsemigroups.PythonElementNC(1, complexity=str)
+
+    def test_semigroup(self):
+        nr_hints = Expensive.nr_hints
+        S = Semigroup(Expensive(1), Expensive(2))
+        self.assertEqual(S.size(), 6)
+        self.assertEqual(S[0].complexity(), 1000)
+        self.assertEqual(Expensive.nr_hints, nr_hints + 1)
+        S = Semigroup(Unhinted(1), Unhinted(2))
+        self.assertEqual(S.size(), 6)
+        self.assertEqual(S[0].complexity(), 1)
+
+class TestProfiling(unittest.TestCase):
+    def tearDown(self):
+        libsemigroups.set_profiling(False)
+        libsemigroups.reset_profiling_counters()
+
+    def test_disabled(self):
+        libsemigroups.reset_profiling_counters()
+        Transformation([1, 0]) * Transformation([0, 0])
+        self.assertEqual(libsemigroups.profiling_counters(),
+                         {'elements_allocated': 0, 'elements_deleted': 0})
+
+    def test_counters(self):
+        libsemigroups.reset_profiling_counters()
+        libsemigroups.set_profiling(True)
+        self.assertTrue(libsemigroups.is_profiling())
+        S = Semigroup(Transformation([1, 0, 2]), Transformation([0, 0, 2]))
+        S.enumerate(100)
+        S.factorisation(Transformation([0, 0, 2]))
+        S.right_cayley_graph()
+        Transformation([1, 0]) * Transformation([0, 0])
+        counters = libsemigroups.profiling_counters()
+        for name in ['enumerate', 'factorisation', 'right_cayley_graph',
+                     '__mul__', 'new_from_handle']:
+            self.assertGreaterEqual(counters[name]['calls'], 1)
+            self.assertGreaterEqual(counters[name]['time'], 0)
+        self.assertEqual(counters['__mul__']['calls'], 1)
+        self.assertGreater(counters['right_cayley_graph']['bytes_copied'], 0)
+        self.assertGreater(counters['elements_allocated'], 0)
+
+        libsemigroups.reset_profiling_counters()
+        self.assertEqual(libsemigroups.profiling_counters(),
+                         {'elements_allocated': 0, 'elements_deleted': 0})
+
+        with self.assertRaises(TypeError):
+            libsemigroups.set_profiling('True')
+
 class TestOtherFunctions(unittest.TestCase):
     def test_full_transformation_monoid(self):
         self.assertEqual(full_transformation_monoid(3)[7],
@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import copy
+import pickle
 from semigroups import (SemiringABC, Integers, MaxPlusSemiring,
                         MinPlusSemiring, BooleanSemiring,
                         TropicalMaxPlusSemiring, TropicalMinPlusSemiring,
@@ -58,6 +60,48 @@ class TestIntegers(unittest.TestCase):
         with self.assertRaises(TypeError):
             Integers().one(26)
 
+    def test_many(self):
+        S = Integers()
+        xs, ys = [7, -2000, 0], [3, 5, 20]
+        self.assertEqual(S.plus_many(xs, ys), list(map(S.plus, xs, ys)))
+        self.assertEqual(S.prod_many(xs, ys), list(map(S.prod, xs, ys)))
+        self.assertEqual(S.sum(xs), -1993)
+        self.assertEqual(S.product(ys), 300)
+        self.assertEqual(S.sum(iter([])), 0)
+        self.assertEqual(S.product([]), 1)
+
+        with self.assertRaises(TypeError):
+            S.plus_many([10.0], [1])
+        with self.assertRaises(TypeError):
+            S.sum([0, '2'])
+        with self.assertRaises(TypeError):
+            S.product([0, -float('inf')])
+
+    def test_unchecked(self):
+        S = Integers()
+        self.assertEqual(S.prod_many_unchecked(S.validate([3]),
+                                               S.validate([-3])).tolist(),
+                         [-9])
+        self.assertEqual(SemiringABC._plus_ints(S, 3, 4), 7)
+        self.assertEqual(SemiringABC._prod_ints(MinPlusSemiring(), 3,
+                                                MinPlusSemiring().sentinel()),
+                         MinPlusSemiring().sentinel())
+
+        xs = S.validate([2 ** 62, -3])
+        with self.assertRaises(ValueError):
+            S.plus_many_unchecked(xs, xs)
+        with self.assertRaises(ValueError):
+            S.prod_unchecked(2 ** 62, 2)
+
+    def test_interned(self):
+        self.assertIs(Integers(), Integers())
+        self.assertIsNot(Integers(), MaxPlusSemiring())
+        self.assertEqual(repr(Integers()), 'Integers()')
+        self.assertEqual(len(set([Integers(), Integers()])), 1)
+
+        with self.assertRaises(AttributeError):
+            Integers().__dict__
+
 class TestMaxPlusSemiring(unittest.TestCase):
     def test_init(self):
         MaxPlusSemiring()
@@ -108,6 +152,40 @@ class TestMaxPlusSemiring(unittest.TestCase):
         with self.assertRaises(TypeError):
             MaxPlusSemiring().one(26)
 
+    def test_many(self):
+        S = MaxPlusSemiring()
+        xs, ys = [7, -float('inf'), -3], [2, 5, -float('inf')]
+        self.assertEqual(S.plus_many(xs, ys), list(map(S.plus, xs, ys)))
+        self.assertEqual(S.prod_many(xs, ys), list(map(S.prod, xs, ys)))
+        self.assertEqual(S.sum(xs), 7)
+        self.assertEqual(S.product(ys), -float('inf'))
+        self.assertEqual(S.product([1, 2, 3]), 6)
+        self.assertEqual(S.sum([]), S.zero())
+        self.assertEqual(S.product([]), S.one())
+
+        with self.assertRaises(TypeError):
+            S.plus_many([0, 1.0], [0, 1])
+        with self.assertRaises(TypeError):
+            S.prod_many([0, float('inf')], [0, 1])
+        with self.assertRaises(ValueError):
+            S.plus_many([0, 1], [0])
+
+    def test_ints(self):
+        S = MaxPlusSemiring()
+        self.assertEqual(S.sentinel(), -2 ** 63)
+        xs = [-float('inf'), -2 ** 63 + 1, 2 ** 63 - 2, 0]
+        self.assertEqual(S.to_ints(xs),
+                         [-2 ** 63, -2 ** 63 + 1, 2 ** 63 - 2, 0])
+        self.assertEqual(S.from_ints(S.to_ints(xs)), xs)
+        self.assertEqual(Integers().to_ints([-2 ** 63]), [-2 ** 63])
+
+        with self.assertRaises(ValueError):
+            S.to_ints([-2 ** 63])
+        with self.assertRaises(ValueError):
+            S.to_ints([2 ** 63 - 1])
+        with self.assertRaises(TypeError):
+            S.to_ints([float('inf')])
+
 class TestMinPlusSemiring(unittest.TestCase):
     def test_init(self):
         MinPlusSemiring()
@@ -158,6 +236,40 @@ class TestMinPlusSemiring(unittest.TestCase):
         with self.assertRaises(TypeError):
             MinPlusSemiring().one(26)
 
+    def test_many(self):
+        S = MinPlusSemiring()
+        xs, ys = [7, float('inf'), -3], [2, 5, float('inf')]
+        self.assertEqual(S.plus_many(xs, ys), list(map(S.plus, xs, ys)))
+        self.assertEqual(S.prod_many(xs, ys), list(map(S.prod, xs, ys)))
+        self.assertEqual(S.sum(xs), -3)
+        self.assertEqual(S.product(ys), float('inf'))
+
+        with self.assertRaises(TypeError):
+            S.sum([-float('inf')])
+
+    def test_unchecked(self):
+        S = MinPlusSemiring()
+        inf = float('inf')
+        xs, ys = [7, inf, -3, inf], [2, 3, inf, inf]
+        vxs, vys = S.validate(xs), S.validate(ys)
+        self.assertEqual(vxs.itemsize, 8)
+        self.assertEqual(S.from_ints(S.plus_many_unchecked(vxs, vys)),
+                         S.plus_many(xs, ys))
+        self.assertEqual(S.from_ints(S.prod_many_unchecked(vxs, vys)),
+                         S.prod_many(xs, ys))
+        self.assertEqual(S.prod_unchecked(vxs[0], vxs[2]), 4)
+        self.assertEqual(S.plus_unchecked(vxs[1], vxs[3]), S.sentinel())
+
+        with self.assertRaises(TypeError):
+            S.validate([-inf])
+        with self.assertRaises(ValueError):
+            S.prod_many_unchecked(S.validate([2 ** 62]),
+                                  S.validate([2 ** 62 - 1]))
+        with self.assertRaises(ValueError):
+            S.prod_unchecked(2 ** 62, 2 ** 62)
+        with self.assertRaises(ValueError):
+            MaxPlusSemiring().prod_unchecked(-2 ** 62, -2 ** 62)
+
 class TestBooleanSemiring(unittest.TestCase):
     def test_init(self):
         BooleanSemiring()
@@ -189,6 +301,30 @@ class TestBooleanSemiring(unittest.TestCase):
         with self.assertRaises(TypeError):
             BooleanSemiring().prod(True)
 
+    def test_many(self):
+        S = BooleanSemiring()
+        xs, ys = [True, True, False, False], [True, False, True, False]
+        self.assertEqual(S.plus_many(xs, ys), list(map(S.plus, xs, ys)))
+        self.assertEqual(S.prod_many(xs, ys), list(map(S.prod, xs, ys)))
+        self.assertEqual(S.sum(ys), True)
+        self.assertEqual(S.product(ys), False)
+        self.assertEqual(S.product([]), True)
+
+        with self.assertRaises(TypeError):
+            S.plus_many([1], [True])
+
+    def test_ints(self):
+        S = BooleanSemiring()
+        self.assertEqual(S.sentinel(), None)
+        self.assertEqual(S.to_ints([True, False]), [1, 0])
+        self.assertEqual(S.from_ints([1, 0]), [True, False])
+        self.assertIs(S.from_ints([1])[0], True)
+
+        with self.assertRaises(ValueError):
+            S.from_ints([2])
+        with self.assertRaises(TypeError):
+            S.to_ints([1])
+
 class TestTropicalMaxPlusSemiring(unittest.TestCase):
     def test_init(self):
         TropicalMaxPlusSemiring(20)
@@ -256,6 +392,37 @@ class TestTropicalMaxPlusSemiring(unittest.TestCase):
         with self.assertRaises(TypeError):
             TropicalMaxPlusSemiring(83).threshold(1)
 
+    def test_many(self):
+        S = TropicalMaxPlusSemiring(26)
+        xs, ys = [7, -float('inf'), 25, 26], [25, 3, 0, 26]
+        self.assertEqual(S.plus_many(xs, ys), list(map(S.plus, xs, ys)))
+        self.assertEqual(S.prod_many(xs, ys), list(map(S.prod, xs, ys)))
+        self.assertEqual(S.sum(xs), 26)
+        self.assertEqual(S.product(ys), 26)
+        self.assertEqual(S.product([1, 2]), 3)
+        self.assertEqual(S.product(xs), -float('inf'))
+
+        with self.assertRaises(ValueError):
+            S.plus_many([27], [0])
+        with self.assertRaises(ValueError):
+            S.prod_many([0], [-1])
+
+    def test_unchecked(self):
+        for t in (4, 100):
+            S = TropicalMaxPlusSemiring(t)
+            xs = [0, 3, -float('inf'), 4, 2]
+            ys = [4, 1, 1, -float('inf'), 2]
+            vxs, vys = S.validate(xs), S.validate(ys)
+            self.assertEqual(S.from_ints(S.plus_many_unchecked(vxs, vys)),
+                             S.plus_many(xs, ys))
+            self.assertEqual(S.from_ints(S.prod_many_unchecked(vxs, vys)),
+                             S.prod_many(xs, ys))
+            self.assertEqual(list(map(S.prod_unchecked, vxs, vys)),
+                             S.prod_many_unchecked(vxs, vys).tolist())
+
+        with self.assertRaises(ValueError):
+            TropicalMaxPlusSemiring(4).validate([5])
+
 class TestTropicalMinPlusSemiring(unittest.TestCase):
     def test_init(self):
         TropicalMinPlusSemiring(20)
@@ -323,6 +490,49 @@ class TestTropicalMinPlusSemiring(unittest.TestCase):
         with self.assertRaises(TypeError):
             TropicalMinPlusSemiring(83).threshold(1)
 
+    def test_many(self):
+        S = TropicalMinPlusSemiring(12)
+        xs, ys = [7, float('inf'), 12, 0], [9, 3, 0, 12]
+        self.assertEqual(S.plus_many(xs, ys), list(map(S.plus, xs, ys)))
+        self.assertEqual(S.prod_many(xs, ys), list(map(S.prod, xs, ys)))
+        self.assertEqual(S.sum(xs), 0)
+        self.assertEqual(S.product(ys), 12)
+        self.assertEqual(S.product(xs), float('inf'))
+
+        with self.assertRaises(ValueError):
+            S.sum([13])
+        with self.assertRaises(TypeError):
+            S.sum([-float('inf')])
+
+    def test_tables(self):
+        S = TropicalMinPlusSemiring(5)
+        for x in range(6):
+            for y in range(6):
+                self.assertEqual(S.plus(x, y), min(x, y))
+                self.assertEqual(S.prod(x, y), min(5, x + y))
+        self.assertEqual(S.prod(float('inf'), 2), float('inf'))
+        self.assertEqual(S.prod_many([1, 4], [2, 3]), [3, 5])
+        self.assertEqual(TropicalMinPlusSemiring(64)._tables(), 0)
+
+        with self.assertRaises(ValueError):
+            S.plus(6, 0)
+
+    def test_ints(self):
+        S = TropicalMinPlusSemiring(5)
+        self.assertEqual(S.sentinel(), 2 ** 63 - 1)
+        self.assertEqual(S.to_ints([0, float('inf'), 5]), [0, 2 ** 63 - 1, 5])
+        self.assertEqual(S.from_ints([0, 2 ** 63 - 1, 5]),
+                         [0, float('inf'), 5])
+
+        with self.assertRaises(ValueError):
+            S.to_ints([6])
+        with self.assertRaises(ValueError):
+            S.from_ints([6])
+        with self.assertRaises(ValueError):
+            S.from_ints([-2 ** 63])
+        with self.assertRaises(TypeError):
+            S.from_ints([float('inf')])
+
 class TestNaturalSemiring(unittest.TestCase):
     def test_init(self):
         self.assertEqual(NaturalSemiring(23, 5).__init__(23, 5), None)
@@ -397,5 +607,86 @@ class TestNaturalSemiring(unittest.TestCase):
         with self.assertRaises(TypeError):
             NaturalSemiring(83, 6).threshold(1)
 
+    def test_many(self):
+        S = NaturalSemiring(5, 7)
+        xs, ys = [3, 0, 11, 6], [11, 9, 11, 5]
+        self.assertEqual(S.plus_many(xs, ys), list(map(S.plus, xs, ys)))
+        self.assertEqual(S.prod_many(xs, ys), list(map(S.prod, xs, ys)))
+        self.assertEqual(S.sum(ys), S.plus(S.plus(S.plus(11, 9), 11), 5))
+        self.assertEqual(S.product(ys), S.prod(S.prod(S.prod(11, 9), 11), 5))
+        self.assertEqual(S.sum([3]), 3)
+
+        with self.assertRaises(ValueError):
+            S.plus_many([12], [0])
+        with self.assertRaises(TypeError):
+            S.prod_many([0], [float('inf')])
+
+    def test_tables(self):
+        S = NaturalSemiring(3, 4)
+        for x in range(7):
+            self.assertEqual(S.plus(S.zero(), x), x)
+            self.assertEqual(S.prod(S.one(), x), x)
+            self.assertEqual(S.prod(S.zero(), x), S.zero())
+            for y in range(7):
+                self.assertEqual(S.plus(x, y), S.plus(y, x))
+                self.assertEqual(S.prod(x, y), S.prod(y, x))
+                for z in range(7):
+                    self.assertEqual(S.plus(S.plus(x, y), z),
+                                     S.plus(x, S.plus(y, z)))
+                    self.assertEqual(S.prod(S.prod(x, y), z),
+                                     S.prod(x, S.prod(y, z)))
+                    self.assertEqual(S.prod(x, S.plus(y, z)),
+                                     S.plus(S.prod(x, y), S.prod(x, z)))
+        self.assertEqual(S.plus(1, 1), 2)
+        self.assertEqual(S.prod(2, 5), 6)
+        self.assertEqual(S.plus(6, 1), 3)
+        self.assertEqual(S.plus_many([2, 6], [2, 6]), [4, 4])
+        self.assertEqual(S.product([2, 3, 6]), 4)
+        self.assertEqual(NaturalSemiring(60, 5)._tables(), 0)
+        self.assertEqual(NaturalSemiring(60, 5).prod(60, 64), 60)
+        self.assertEqual(S.prod(True, 1), S.prod(1, 1))
+
+        with self.assertRaises(ValueError):
+            S.plus(7, 0)
+
+    def test_interned(self):
+        S = NaturalSemiring(3, 4)
+        self.assertIs(S, NaturalSemiring(3, 4))
+        self.assertIsNot(S, NaturalSemiring(4, 3))
+        self.assertIs(copy.deepcopy(S), S)
+        self.assertIs(pickle.loads(pickle.dumps(S)), S)
+        self.assertEqual(repr(S), 'NaturalSemiring(3, 4)')
+        self.assertEqual({S: 1}[NaturalSemiring(3, 4)], 1)
+        self.assertIs(NaturalSemiring(threshold=3, period=4), S)
+        self.assertIs(NaturalSemiring(3, period=4), S)
+        self.assertIs(NaturalSemiring(period=4, threshold=3), S)
+        self.assertIs(TropicalMaxPlusSemiring(threshold=3),
+                      TropicalMaxPlusSemiring(3))
+
+        with self.assertRaises(AttributeError):
+            S._period = 5
+        with self.assertRaises(AttributeError):
+            S.name = 'S'
+        with self.assertRaises(TypeError):
+            NaturalSemiring(3.0, 4)
+        with self.assertRaises(TypeError):
+            NaturalSemiring([3], 4)
+        with self.assertRaises(TypeError):
+            NaturalSemiring(3, 4, threshold=3)
+        with self.assertRaises(TypeError):
+            NaturalSemiring(3, 4, size=3)
+
+    def test_unchecked(self):
+        S = NaturalSemiring(3, 4)
+        xs, ys = list(range(7)), [6, 5, 4, 3, 2, 1, 0]
+        vxs, vys = S.validate(xs), S.validate(ys)
+        self.assertEqual(S.plus_many_unchecked(vxs, vys).tolist(),
+                         S.plus_many(xs, ys))
+        self.assertEqual(S.prod_many_unchecked(vxs, vys).tolist(),
+                         S.prod_many(xs, ys))
+        self.assertEqual(S.plus_unchecked(2, 6), S.plus(2, 6))
+        self.assertEqual(BooleanSemiring().prod_unchecked(1, 0), 0)
+        self.assertEqual(Integers().validate([2 ** 40]).tolist(), [2 ** 40])
+
 if __name__ == '__main__':
     unittest.main()